@@ -0,0 +1,264 @@
+"""Initial schema
+
+Tables as they stood before migrations were introduced; previously created
+by Base.metadata.create_all() at import time.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Shared enum types are created once up front; on PostgreSQL, binding them to a
+# MetaData stops every create_table() from emitting its own CREATE TYPE.
+_enum_metadata = sa.MetaData()
+subject_enum = sa.Enum('MATHEMATICS', 'ENGLISH', 'SCIENCE', 'SOCIAL_STUDIES', 'ARTS', name='subject', metadata=_enum_metadata)
+masterylevel_enum = sa.Enum('BEGINNER', 'DEVELOPING', 'PROFICIENT', 'ADVANCED', name='masterylevel', metadata=_enum_metadata)
+resourcetype_enum = sa.Enum('VIDEO', 'WORKSHEET', 'INTERACTIVE', 'READING', 'PRACTICE', name='resourcetype', metadata=_enum_metadata)
+difficulty_enum = sa.Enum('BEGINNER', 'INTERMEDIATE', 'ADVANCED', name='difficulty', metadata=_enum_metadata)
+ENUMS = (subject_enum, masterylevel_enum, resourcetype_enum, difficulty_enum)
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for enum in ENUMS:
+        enum.create(bind, checkfirst=True)
+
+    op.create_table('assessment_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject', subject_enum, nullable=False),
+    sa.Column('learning_style', sa.String(), nullable=False),
+    sa.Column('mastery_level', masterylevel_enum, nullable=False),
+    sa.Column('grade', sa.Integer(), nullable=True),
+    sa.Column('assessment_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('subject', 'learning_style', 'mastery_level', 'grade', name='uq_assessment_rollups_key')
+    )
+    op.create_index(op.f('ix_assessment_rollups_id'), 'assessment_rollups', ['id'], unique=False)
+
+    op.create_table('student_cluster_models',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('n_clusters', sa.Integer(), nullable=False),
+    sa.Column('features', sa.JSON(), nullable=True),
+    sa.Column('centroids', sa.JSON(), nullable=True),
+    sa.Column('counts', sa.JSON(), nullable=True),
+    sa.Column('last_assessment_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('n_clusters')
+    )
+    op.create_index(op.f('ix_student_cluster_models_id'), 'student_cluster_models', ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    op.create_table('students',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('grade', sa.Integer(), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_students_id'), 'students', ['id'], unique=False)
+    op.create_index(op.f('ix_students_name'), 'students', ['name'], unique=False)
+
+    op.create_table('assessments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('subject', subject_enum, nullable=True),
+    sa.Column('score', sa.Integer(), nullable=True),
+    sa.Column('total_questions', sa.Integer(), nullable=True),
+    sa.Column('completed_date', sa.DateTime(), nullable=True),
+    sa.Column('skill_breakdown', sa.JSON(), nullable=True),
+    sa.Column('recommendations', sa.JSON(), nullable=True),
+    sa.Column('learning_style', sa.String(), nullable=True),
+    sa.Column('mastery_level', masterylevel_enum, nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assessments_id'), 'assessments', ['id'], unique=False)
+
+    op.create_table('learning_plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('target_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_learning_plans_id'), 'learning_plans', ['id'], unique=False)
+
+    op.create_table('learning_goals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('learning_plan_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('target_date', sa.DateTime(), nullable=True),
+    sa.Column('progress', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['learning_plan_id'], ['learning_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_learning_goals_id'), 'learning_goals', ['id'], unique=False)
+
+    op.create_table('learning_resources',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('learning_plan_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('type', resourcetype_enum, nullable=True),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.Column('subject', subject_enum, nullable=True),
+    sa.Column('difficulty', difficulty_enum, nullable=True),
+    sa.ForeignKeyConstraint(['learning_plan_id'], ['learning_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_learning_resources_id'), 'learning_resources', ['id'], unique=False)
+
+    op.create_table('questions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assessment_id', sa.Integer(), nullable=True),
+    sa.Column('text', sa.String(), nullable=True),
+    sa.Column('options', sa.JSON(), nullable=True),
+    sa.Column('correct_answer', sa.Integer(), nullable=True),
+    sa.Column('explanation', sa.String(), nullable=True),
+    sa.Column('difficulty', difficulty_enum, nullable=True),
+    sa.Column('skill_category', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_questions_id'), 'questions', ['id'], unique=False)
+
+    op.create_table('student_clusters',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('n_clusters', sa.Integer(), nullable=False),
+    sa.Column('cluster_id', sa.Integer(), nullable=False),
+    sa.Column('assessment_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'n_clusters')
+    )
+
+    op.create_table('subject_plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('learning_plan_id', sa.Integer(), nullable=True),
+    sa.Column('subject', subject_enum, nullable=True),
+    sa.Column('progress', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['learning_plan_id'], ['learning_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_subject_plans_id'), 'subject_plans', ['id'], unique=False)
+
+    op.create_table('focus_areas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject_plan_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('mastery_level', masterylevel_enum, nullable=True),
+    sa.ForeignKeyConstraint(['subject_plan_id'], ['subject_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_focus_areas_id'), 'focus_areas', ['id'], unique=False)
+
+    op.create_table('milestones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('learning_goal_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('is_completed', sa.Integer(), nullable=True),
+    sa.Column('target_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['learning_goal_id'], ['learning_goals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_milestones_id'), 'milestones', ['id'], unique=False)
+
+    op.create_table('weekly_goals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject_plan_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('is_completed', sa.Integer(), nullable=True),
+    sa.Column('target_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['subject_plan_id'], ['subject_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_weekly_goals_id'), 'weekly_goals', ['id'], unique=False)
+
+    op.create_table('learning_activities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('focus_area_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('duration', sa.Integer(), nullable=True),
+    sa.Column('difficulty', difficulty_enum, nullable=True),
+    sa.Column('resource_type', resourcetype_enum, nullable=True),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['focus_area_id'], ['focus_areas.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_learning_activities_id'), 'learning_activities', ['id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_learning_activities_id'), table_name='learning_activities')
+    op.drop_table('learning_activities')
+
+    op.drop_index(op.f('ix_weekly_goals_id'), table_name='weekly_goals')
+    op.drop_table('weekly_goals')
+
+    op.drop_index(op.f('ix_milestones_id'), table_name='milestones')
+    op.drop_table('milestones')
+
+    op.drop_index(op.f('ix_focus_areas_id'), table_name='focus_areas')
+    op.drop_table('focus_areas')
+
+    op.drop_index(op.f('ix_subject_plans_id'), table_name='subject_plans')
+    op.drop_table('subject_plans')
+
+    op.drop_table('student_clusters')
+    op.drop_index(op.f('ix_questions_id'), table_name='questions')
+    op.drop_table('questions')
+
+    op.drop_index(op.f('ix_learning_resources_id'), table_name='learning_resources')
+    op.drop_table('learning_resources')
+
+    op.drop_index(op.f('ix_learning_goals_id'), table_name='learning_goals')
+    op.drop_table('learning_goals')
+
+    op.drop_index(op.f('ix_learning_plans_id'), table_name='learning_plans')
+    op.drop_table('learning_plans')
+
+    op.drop_index(op.f('ix_assessments_id'), table_name='assessments')
+    op.drop_table('assessments')
+
+    op.drop_index(op.f('ix_students_name'), table_name='students')
+    op.drop_index(op.f('ix_students_id'), table_name='students')
+    op.drop_table('students')
+
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+
+    op.drop_index(op.f('ix_student_cluster_models_id'), table_name='student_cluster_models')
+    op.drop_table('student_cluster_models')
+
+    op.drop_index(op.f('ix_assessment_rollups_id'), table_name='assessment_rollups')
+    op.drop_table('assessment_rollups')
+
+    bind = op.get_bind()
+    for enum in ENUMS:
+        enum.drop(bind, checkfirst=True)
@@ -0,0 +1,41 @@
+"""Hot-path indexes
+
+Composite indexes for the assessment listings (per student newest-first, per
+subject joined to the owning student) and indexes on every foreign key walked
+by ownership checks, question loading and the learning-plan tree.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = (
+    ('ix_students_user_id', 'students', ['user_id']),
+    ('ix_assessments_student_id_completed_date', 'assessments', ['student_id', 'completed_date', 'id']),
+    ('ix_assessments_subject_student_id', 'assessments', ['subject', 'student_id']),
+    ('ix_questions_assessment_id', 'questions', ['assessment_id']),
+    ('ix_student_clusters_n_clusters_student_id', 'student_clusters', ['n_clusters', 'student_id']),
+    ('ix_learning_plans_student_id', 'learning_plans', ['student_id']),
+    ('ix_subject_plans_learning_plan_id', 'subject_plans', ['learning_plan_id']),
+    ('ix_focus_areas_subject_plan_id', 'focus_areas', ['subject_plan_id']),
+    ('ix_learning_activities_focus_area_id', 'learning_activities', ['focus_area_id']),
+    ('ix_weekly_goals_subject_plan_id', 'weekly_goals', ['subject_plan_id']),
+    ('ix_learning_goals_learning_plan_id', 'learning_goals', ['learning_plan_id']),
+    ('ix_milestones_learning_goal_id', 'milestones', ['learning_goal_id']),
+    ('ix_learning_resources_learning_plan_id', 'learning_resources', ['learning_plan_id']),
+)
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
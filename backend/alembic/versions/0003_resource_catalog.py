@@ -0,0 +1,30 @@
+"""Resource catalog
+
+Learning resources gain a skill_category, and rows without a learning plan
+form the catalog served by the in-memory resource index. The composite index
+backs the equivalent SQL lookup.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('learning_resources', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('skill_category', sa.String(), nullable=True))
+    op.create_index(
+        'ix_learning_resources_catalog', 'learning_resources',
+        ['subject', 'difficulty', 'skill_category', 'type'], unique=False
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_learning_resources_catalog', table_name='learning_resources')
+    with op.batch_alter_table('learning_resources', schema=None) as batch_op:
+        batch_op.drop_column('skill_category')
@@ -0,0 +1,39 @@
+"""Student progress series
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# The enum types already exist (0001); don't emit CREATE TYPE again
+_enum_metadata = sa.MetaData()
+subject_enum = sa.Enum('MATHEMATICS', 'ENGLISH', 'SCIENCE', 'SOCIAL_STUDIES', 'ARTS', name='subject', metadata=_enum_metadata)
+masterylevel_enum = sa.Enum('BEGINNER', 'DEVELOPING', 'PROFICIENT', 'ADVANCED', name='masterylevel', metadata=_enum_metadata)
+
+def upgrade() -> None:
+    op.create_table('student_progress',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('subject', subject_enum, nullable=False),
+    sa.Column('bucket_date', sa.Date(), nullable=False),
+    sa.Column('assessment_count', sa.Integer(), nullable=False),
+    sa.Column('mean_score', sa.Float(), nullable=False),
+    sa.Column('ewma_score', sa.Float(), nullable=False),
+    sa.Column('last_mastery_level', masterylevel_enum, nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('student_id', 'subject', 'bucket_date', name='uq_student_progress_key')
+    )
+    op.create_index(op.f('ix_student_progress_id'), 'student_progress', ['id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_student_progress_id'), table_name='student_progress')
+    op.drop_table('student_progress')
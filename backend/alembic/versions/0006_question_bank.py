@@ -0,0 +1,157 @@
+"""Shared question bank
+
+Replaces the per-assessment questions table with question_bank, one row per
+distinct question keyed by content hash, and assessment_responses, one
+compact row per question asked (bank id, chosen option, correctness).
+Existing questions are folded into the bank in batches; their chosen option
+was never recorded, so it stays NULL.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:00:00
+"""
+from datetime import datetime
+import hashlib
+import json
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+# The enum types already exist (0001); don't emit CREATE TYPE again
+_enum_metadata = sa.MetaData()
+subject_enum = sa.Enum('MATHEMATICS', 'ENGLISH', 'SCIENCE', 'SOCIAL_STUDIES', 'ARTS', name='subject', metadata=_enum_metadata)
+difficulty_enum = sa.Enum('BEGINNER', 'INTERMEDIATE', 'ADVANCED', name='difficulty', metadata=_enum_metadata)
+
+# Untyped enum columns read and write the stored enum names
+questions = sa.table('questions',
+    sa.column('id', sa.Integer), sa.column('assessment_id', sa.Integer), sa.column('text', sa.String),
+    sa.column('options', sa.JSON), sa.column('correct_answer', sa.Integer), sa.column('explanation', sa.String),
+    sa.column('difficulty'), sa.column('skill_category', sa.String),
+)
+assessments = sa.table('assessments', sa.column('id', sa.Integer), sa.column('subject'))
+question_bank = sa.table('question_bank',
+    sa.column('id', sa.Integer), sa.column('content_hash', sa.String), sa.column('subject'),
+    sa.column('text', sa.String), sa.column('options', sa.JSON), sa.column('correct_answer', sa.Integer),
+    sa.column('explanation', sa.String), sa.column('difficulty'), sa.column('skill_category', sa.String),
+    sa.column('created_at', sa.DateTime),
+)
+assessment_responses = sa.table('assessment_responses',
+    sa.column('assessment_id', sa.Integer), sa.column('position', sa.Integer), sa.column('question_id', sa.Integer),
+    sa.column('chosen_option', sa.Integer), sa.column('is_correct', sa.Boolean),
+)
+
+CONTENT_FIELDS = ('text', 'options', 'correct_answer', 'explanation', 'difficulty', 'skill_category')
+
+def content_hash(subject, row) -> str:
+    # Must match app.services.question_bank.content_hash, which hashes the
+    # same fields with enums by name
+    content = [subject] + [row[field] for field in CONTENT_FIELDS]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode()).hexdigest()
+
+def upgrade() -> None:
+    op.create_table('question_bank',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('subject', subject_enum, nullable=False),
+    sa.Column('text', sa.String(), nullable=True),
+    sa.Column('options', sa.JSON(), nullable=True),
+    sa.Column('correct_answer', sa.Integer(), nullable=True),
+    sa.Column('explanation', sa.String(), nullable=True),
+    sa.Column('difficulty', difficulty_enum, nullable=True),
+    sa.Column('skill_category', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_question_bank_id'), 'question_bank', ['id'], unique=False)
+    op.create_index(op.f('ix_question_bank_content_hash'), 'question_bank', ['content_hash'], unique=True)
+    op.create_index('ix_question_bank_subject_difficulty_id', 'question_bank', ['subject', 'difficulty', 'id'], unique=False)
+
+    op.create_table('assessment_responses',
+    sa.Column('assessment_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('chosen_option', sa.Integer(), nullable=True),
+    sa.Column('is_correct', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.ForeignKeyConstraint(['question_id'], ['question_bank.id'], ),
+    sa.PrimaryKeyConstraint('assessment_id', 'position')
+    )
+    op.create_index(op.f('ix_assessment_responses_question_id'), 'assessment_responses', ['question_id'], unique=False)
+
+    _move_questions(op.get_bind())
+
+    op.drop_index('ix_questions_assessment_id', table_name='questions')
+    op.drop_index(op.f('ix_questions_id'), table_name='questions')
+    op.drop_table('questions')
+
+def _move_questions(conn) -> None:
+    """Fold the questions rows into the bank, in (assessment, id) order so positions follow the old order."""
+    bank_ids = {}
+    assessment_id, position = None, 0
+    created_at = datetime.utcnow()
+    result = conn.execution_options(yield_per=BATCH_SIZE).execute(
+        sa.select(questions, assessments.c.subject)
+        .join_from(questions, assessments, questions.c.assessment_id == assessments.c.id)
+        .order_by(questions.c.assessment_id, questions.c.id)
+    )
+    for batch in result.mappings().partitions():
+        new_items, responses = {}, []
+        for row in batch:
+            digest = content_hash(row['subject'], row)
+            if digest not in bank_ids and digest not in new_items:
+                new_items[digest] = {
+                    'content_hash': digest, 'subject': row['subject'], 'created_at': created_at,
+                    **{field: row[field] for field in CONTENT_FIELDS},
+                }
+            if row['assessment_id'] != assessment_id:
+                assessment_id, position = row['assessment_id'], 0
+            responses.append({
+                'assessment_id': assessment_id, 'position': position, 'question_id': digest,
+                'chosen_option': None, 'is_correct': None,
+            })
+            position += 1
+        if new_items:
+            conn.execute(question_bank.insert(), list(new_items.values()))
+            bank_ids.update(conn.execute(
+                sa.select(question_bank.c.content_hash, question_bank.c.id)
+                .where(question_bank.c.content_hash.in_(list(new_items)))
+            ).all())
+        for response in responses:
+            response['question_id'] = bank_ids[response['question_id']]
+        conn.execute(assessment_responses.insert(), responses)
+
+def downgrade() -> None:
+    op.create_table('questions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assessment_id', sa.Integer(), nullable=True),
+    sa.Column('text', sa.String(), nullable=True),
+    sa.Column('options', sa.JSON(), nullable=True),
+    sa.Column('correct_answer', sa.Integer(), nullable=True),
+    sa.Column('explanation', sa.String(), nullable=True),
+    sa.Column('difficulty', difficulty_enum, nullable=True),
+    sa.Column('skill_category', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_questions_id'), 'questions', ['id'], unique=False)
+    op.create_index('ix_questions_assessment_id', 'questions', ['assessment_id'], unique=False)
+
+    columns = ['assessment_id', *CONTENT_FIELDS]
+    op.execute(questions.insert().from_select(columns,
+        sa.select(assessment_responses.c.assessment_id, *(question_bank.c[field] for field in CONTENT_FIELDS))
+        .join_from(assessment_responses, question_bank, assessment_responses.c.question_id == question_bank.c.id)
+        .order_by(assessment_responses.c.assessment_id, assessment_responses.c.position)
+    ))
+
+    op.drop_index(op.f('ix_assessment_responses_question_id'), table_name='assessment_responses')
+    op.drop_table('assessment_responses')
+    op.drop_index('ix_question_bank_subject_difficulty_id', table_name='question_bank')
+    op.drop_index(op.f('ix_question_bank_content_hash'), table_name='question_bank')
+    op.drop_index(op.f('ix_question_bank_id'), table_name='question_bank')
+    op.drop_table('question_bank')
@@ -0,0 +1,27 @@
+"""Item response parameters on the question bank
+
+Location and discrimination of each bank item for adaptive testing. Both
+stay NULL until `app.cli calibrate-items` estimates them; until then the
+difficulty label stands in.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 20:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('question_bank', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('irt_difficulty', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('irt_discrimination', sa.Float(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('question_bank', schema=None) as batch_op:
+        batch_op.drop_column('irt_discrimination')
+        batch_op.drop_column('irt_difficulty')
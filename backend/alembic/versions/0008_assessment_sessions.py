@@ -0,0 +1,44 @@
+"""In-progress assessment sessions
+
+Durable copy of the session store in services.assessment_sessions: one row
+per assessment in progress, updated in batches by the write-behind flush
+and deleted when the assessment is finished or expires.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 21:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# The subject type already exists (0001); don't emit CREATE TYPE again
+_enum_metadata = sa.MetaData()
+subject_enum = sa.Enum('MATHEMATICS', 'ENGLISH', 'SCIENCE', 'SOCIAL_STUDIES', 'ARTS', name='subject', metadata=_enum_metadata)
+
+def upgrade() -> None:
+    op.create_table('assessment_sessions',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('subject', subject_enum, nullable=False),
+    sa.Column('question_ids', sa.JSON(), nullable=False),
+    sa.Column('answers', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assessment_sessions_student_id'), 'assessment_sessions', ['student_id'], unique=False)
+    op.create_index(op.f('ix_assessment_sessions_expires_at'), 'assessment_sessions', ['expires_at'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_assessment_sessions_expires_at'), table_name='assessment_sessions')
+    op.drop_index(op.f('ix_assessment_sessions_student_id'), table_name='assessment_sessions')
+    op.drop_table('assessment_sessions')
@@ -0,0 +1,49 @@
+"""Background job queue
+
+One row per job submitted through POST /jobs, claimed and run by
+`app.cli run-jobs`.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 22:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# Created and dropped explicitly, like the enum types of 0001
+_enum_metadata = sa.MetaData()
+jobstatus_enum = sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', 'CANCELLED', name='jobstatus', metadata=_enum_metadata)
+
+def upgrade() -> None:
+    jobstatus_enum.create(op.get_bind(), checkfirst=True)
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_type', sa.String(length=64), nullable=False),
+    sa.Column('status', jobstatus_enum, nullable=False),
+    sa.Column('params', sa.JSON(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('progress', sa.Float(), nullable=False),
+    sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=False)
+    op.create_index('ix_jobs_status_job_type_id', 'jobs', ['status', 'job_type', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_status_job_type_id', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
+    jobstatus_enum.drop(op.get_bind(), checkfirst=True)
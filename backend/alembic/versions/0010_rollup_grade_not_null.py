@@ -0,0 +1,36 @@
+"""Count ungraded students under rollup grade -1
+
+NULL grades never conflict in uq_assessment_rollups_key, so the rollup
+upsert inserted a new row for every assessment of a student without a
+grade. Those rows are merged into one per key under grade -1 and the
+column becomes NOT NULL.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+NO_GRADE = -1
+
+def upgrade() -> None:
+    op.execute(
+        "INSERT INTO assessment_rollups (subject, learning_style, mastery_level, grade, assessment_count) "
+        f"SELECT subject, learning_style, mastery_level, {NO_GRADE}, SUM(assessment_count) "
+        "FROM assessment_rollups WHERE grade IS NULL "
+        "GROUP BY subject, learning_style, mastery_level"
+    )
+    op.execute("DELETE FROM assessment_rollups WHERE grade IS NULL")
+    with op.batch_alter_table('assessment_rollups', schema=None) as batch_op:
+        batch_op.alter_column('grade', existing_type=sa.Integer(), nullable=False)
+
+def downgrade() -> None:
+    with op.batch_alter_table('assessment_rollups', schema=None) as batch_op:
+        batch_op.alter_column('grade', existing_type=sa.Integer(), nullable=True)
+    op.execute(f"UPDATE assessment_rollups SET grade = NULL WHERE grade = {NO_GRADE}")
@@ -0,0 +1,24 @@
+"""Track assessment ids skipped by the cluster model watermark
+
+Ranges of ids below last_assessment_id whose assessments had not committed
+yet when the watermark passed them, re-checked by later updates.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('student_cluster_models', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('id_gaps', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('student_cluster_models', schema=None) as batch_op:
+        batch_op.drop_column('id_gaps')
@@ -0,0 +1,53 @@
+import json
+from fastapi import HTTPException, Request
+from typing import Any, AsyncIterator, List
+from ..schemas import BulkAssessmentItemResult, BulkAssessmentResult
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+async def iter_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """Yield raw items from a JSON array body or, incrementally, from an NDJSON stream.
+
+    Malformed NDJSON lines are yielded as their raw text so they fail
+    validation individually instead of aborting the whole upload.
+    """
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPES):
+        buffer = b""
+        async for data in request.stream():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_line(line)
+        if buffer.strip():
+            yield _parse_line(buffer)
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of assessments")
+    for item in items:
+        yield item
+
+async def iter_chunks(items: AsyncIterator[Any], size: int) -> AsyncIterator[List[Any]]:
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def bulk_result(items: List[BulkAssessmentItemResult]) -> BulkAssessmentResult:
+    created = sum(1 for item in items if item.status == "created")
+    return BulkAssessmentResult(created=created, failed=len(items) - created, items=items)
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode(errors="replace")
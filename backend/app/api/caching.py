@@ -0,0 +1,40 @@
+import json
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from typing import Any, Callable, Hashable
+from ..core.config import settings
+from ..core.request_profiling import timed
+from ..services.analytics_cache import VersionedResponseCache, make_etag
+
+analytics_cache = VersionedResponseCache(settings.ANALYTICS_CACHE_MAX_ENTRIES)
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def versioned_response(request: Request, key: Hashable, version: str, compute: Callable[[], Any]) -> Response:
+    """Serve a JSON response cached under (key, version) with ETag revalidation.
+
+    Returns 304 when If-None-Match carries the current ETag. compute() only
+    runs on a cache miss; HTTP errors it raises are not cached.
+    """
+    etag = make_etag(key, version)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.ANALYTICS_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if _etag_matches(request, etag):
+        analytics_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    cache_key = (key, version)
+    body = analytics_cache.get(cache_key)
+    if body is None:
+        content = compute()
+        with timed("serialization"):
+            body = json.dumps(jsonable_encoder(content)).encode()
+        analytics_cache.put(cache_key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
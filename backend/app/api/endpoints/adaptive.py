@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from ...database import get_db
+from ...models import Assessment, Student, User, ASSESSMENT_LOAD_OPTIONS
+from ...schemas import (
+    AdaptiveAnswer, AdaptiveSessionCreate, AdaptiveSessionState, Assessment as AssessmentSchema,
+    BulkAssessmentItemResult
+)
+from ...core.auth import get_current_active_user
+from ...core.request_profiling import ProfiledRoute
+from ...services.adaptive_testing import AdaptiveSession, adaptive_items, adaptive_tester
+from .assessments import ingester
+
+# Sessions live in this worker's memory: behind several workers, route a
+# session's requests to the worker that started it (sticky sessions).
+router = APIRouter(route_class=ProfiledRoute)
+
+def _owned_session(session_id: str, user: User) -> AdaptiveSession:
+    session = adaptive_tester.get(session_id, user.id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Adaptive session not found")
+    return session
+
+def _finish(db: Session, session: AdaptiveSession) -> BulkAssessmentItemResult:
+    result = adaptive_tester.finish(db, session, ingester)
+    if result is None:
+        raise HTTPException(status_code=409, detail="No answered questions to submit")
+    if result.status != "created":
+        headers = {"Retry-After": "1"} if result.status_code == 503 else None
+        raise HTTPException(status_code=result.status_code, detail=result.detail, headers=headers)
+    return result
+
+@router.post("/adaptive-sessions", response_model=AdaptiveSessionState, status_code=201)
+def start_adaptive_session(
+    adaptive_session: AdaptiveSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start an adaptive test for a student and get its first question."""
+    student = db.query(Student.id).filter(
+        Student.id == adaptive_session.student_id,
+        Student.user_id == current_user.id
+    ).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    index = adaptive_items.current(db)
+    if not index.has_items(adaptive_session.subject, adaptive_session.skill_category):
+        raise HTTPException(status_code=404, detail="No questions for this subject and skill")
+    session = adaptive_tester.start(
+        index, current_user.id, adaptive_session.student_id, adaptive_session.subject,
+        adaptive_session.skill_category, adaptive_session.max_items
+    )
+    if session is None:
+        raise HTTPException(
+            status_code=503, detail="Too many adaptive sessions, please retry", headers={"Retry-After": "1"}
+        )
+    return ORJSONResponse(adaptive_tester.state(session), status_code=201)
+
+@router.get("/adaptive-sessions/{session_id}", response_model=AdaptiveSessionState)
+def get_adaptive_session(
+    session_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the state of an adaptive test, including the pending question."""
+    return ORJSONResponse(adaptive_tester.state(_owned_session(session_id, current_user)))
+
+@router.post("/adaptive-sessions/{session_id}/answers", response_model=AdaptiveSessionState)
+def answer_adaptive_question(
+    session_id: str,
+    answer: AdaptiveAnswer,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Answer the pending question and get the next one, chosen for the updated ability estimate.
+
+    Served from memory without a database read, except for the answer that
+    finishes the test: that one records the test as an assessment. If
+    recording fails, retry with the finish endpoint.
+    """
+    session = _owned_session(session_id, current_user)
+    correct = adaptive_tester.answer(session, answer.question_id, answer.chosen_option)
+    if correct is None:
+        raise HTTPException(status_code=409, detail="Question is not the pending question of this session")
+    state = {**adaptive_tester.state(session), "last_correct": correct}
+    if state["finished"]:
+        state["assessment_id"] = _finish(db, session).assessment_id
+    return ORJSONResponse(state)
+
+@router.post("/adaptive-sessions/{session_id}/finish", response_model=AssessmentSchema)
+def finish_adaptive_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """End the test, if still running, and record the answered questions as an assessment."""
+    result = _finish(db, _owned_session(session_id, current_user))
+    return db.query(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).filter(
+        Assessment.id == result.assessment_id
+    ).one()
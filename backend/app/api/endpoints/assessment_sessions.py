@@ -0,0 +1,120 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List
+from ...database import get_db
+from ...models import Assessment, AssessmentSession, Student, User, ASSESSMENT_LOAD_OPTIONS
+from ...schemas import (
+    Assessment as AssessmentSchema, AssessmentSessionAnswers, AssessmentSessionCreate, AssessmentSessionState
+)
+from ...core.auth import get_current_active_user
+from ...core.request_profiling import ProfiledRoute
+from ...services.assessment_sessions import SessionRecord, assessment_sessions
+from .assessments import ingester
+
+# Answers are served from this worker's memory and written to the database
+# in batches; see AssessmentSessionStore for the consistency this gives.
+router = APIRouter(route_class=ProfiledRoute)
+
+def _owned_student(db: Session, student_id: int, user: User) -> None:
+    student = db.query(Student.id).filter(
+        Student.id == student_id,
+        Student.user_id == user.id
+    ).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+def _owned_session(db: Session, session_id: str, user: User) -> SessionRecord:
+    session = assessment_sessions.get(db, session_id, user.id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Assessment session not found")
+    return session
+
+@router.post("/assessment-sessions", response_model=AssessmentSessionState, status_code=201)
+def start_assessment_session(
+    assessment_session: AssessmentSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start an assessment over bank questions, to be answered one request at a time."""
+    _owned_student(db, assessment_session.student_id, current_user)
+    session = assessment_sessions.start(
+        db, current_user.id, assessment_session.student_id, assessment_session.subject,
+        assessment_session.question_ids
+    )
+    if session is None:
+        raise HTTPException(status_code=422, detail="Unknown question for this subject")
+    return ORJSONResponse(assessment_sessions.state(session), status_code=201)
+
+@router.get("/students/{student_id}/assessment-sessions", response_model=List[AssessmentSessionState])
+def get_student_assessment_sessions(
+    student_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Assessments a student can resume, oldest first.
+
+    Reads the table, so a session started on another worker in the last
+    flush interval shows its answers as of that worker's last flush.
+    """
+    _owned_student(db, student_id, current_user)
+    session_ids = db.execute(
+        select(AssessmentSession.id).where(
+            AssessmentSession.student_id == student_id,
+            AssessmentSession.expires_at > datetime.utcnow()
+        ).order_by(AssessmentSession.created_at)
+    ).scalars().all()
+    sessions = (assessment_sessions.get(db, session_id, current_user.id) for session_id in session_ids)
+    return ORJSONResponse([assessment_sessions.state(session) for session in sessions if session is not None])
+
+@router.get("/assessment-sessions/{session_id}", response_model=AssessmentSessionState)
+def get_assessment_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get an assessment in progress to resume it."""
+    return ORJSONResponse(assessment_sessions.state(_owned_session(db, session_id, current_user)))
+
+@router.post("/assessment-sessions/{session_id}/answers", response_model=AssessmentSessionState)
+def answer_assessment_session(
+    session_id: str,
+    answers: AssessmentSessionAnswers,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Record one or more answers; answering a position again replaces its answer.
+
+    Served from memory once the session is loaded; answers reach the
+    database with the next write-behind flush.
+    """
+    session = _owned_session(db, session_id, current_user)
+    try:
+        recorded = assessment_sessions.answer(
+            session, [(answer.position, answer.chosen_option) for answer in answers.answers]
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if not recorded:
+        raise HTTPException(status_code=404, detail="Assessment session not found")
+    return ORJSONResponse(assessment_sessions.state(session))
+
+@router.post("/assessment-sessions/{session_id}/finish", response_model=AssessmentSchema)
+def finish_assessment_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Submit the session as an assessment and get analysis results; unanswered questions count as wrong."""
+    session = _owned_session(db, session_id, current_user)
+    result = assessment_sessions.finish(db, session, ingester)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Assessment session not found")
+    if result.status != "created":
+        headers = {"Retry-After": "1"} if result.status_code == 503 else None
+        raise HTTPException(status_code=result.status_code, detail=result.detail, headers=headers)
+    return db.query(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).filter(
+        Assessment.id == result.assessment_id
+    ).one()
@@ -1,14 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ...database import get_db
-from ...models import Assessment, Student, Subject, User
-from ...schemas import AssessmentCreate, Assessment as AssessmentSchema
+from ...models import Assessment, Difficulty, Student, Subject, User, ASSESSMENT_LOAD_OPTIONS
+from ...schemas import (
+    AssessmentCreate, Assessment as AssessmentSchema, BulkAssessmentResult, QuestionBankItem as QuestionBankItemSchema,
+    StudentProgress as StudentProgressSchema
+)
 from ...services.assessment_analyzer import AssessmentAnalyzer
+from ...services import assessment_rollup, student_progress
+from ...services.student_clustering import StudentClusterer
+from ...services.assessment_ingest import AssessmentIngester
+from ...services.analytics_cache import cluster_version, distribution_version
+from ...services.question_bank import question_bank
 from ...core.auth import get_current_active_user, get_current_admin_user
+from ...core.config import settings
+from ...core.request_profiling import ProfiledRoute
+from ..pagination import paginate, stream_ndjson
+from ..bulk import bulk_result, iter_bulk_items, iter_chunks
+from ..caching import versioned_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 analyzer = AssessmentAnalyzer()
+clusterer = StudentClusterer(analyzer, batch_size=settings.CLUSTER_BATCH_SIZE)
+ingester = AssessmentIngester(analyzer, clusterer, settings.CLUSTER_COUNTS, settings.PROGRESS_EWMA_ALPHA)
 
 @router.post("/assessments/", response_model=AssessmentSchema)
 def create_assessment(
@@ -43,10 +61,33 @@ def create_assessment(
     )
     
     db.add(db_assessment)
+    assessment_rollup.record_assessment(db, db_assessment, student.grade)
+    db.flush()
+    question_bank.record_responses(db, db_assessment.id, assessment.subject, assessment.questions)
+    clusterer.assign(db, db_assessment, settings.CLUSTER_COUNTS)
+    student_progress.record_assessment(db, db_assessment, settings.PROGRESS_EWMA_ALPHA)
     db.commit()
-    db.refresh(db_assessment)
     
-    return db_assessment
+    return db.query(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).populate_existing().filter(
+        Assessment.id == db_assessment.id
+    ).one()
+
+@router.post("/assessments/bulk", response_model=BulkAssessmentResult)
+async def create_assessments_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Submit many assessments as a JSON array or an NDJSON stream (application/x-ndjson).
+
+    Items are ingested in chunks of BULK_INGEST_CHUNK_SIZE, each in its own
+    transaction, and the response reports a status per item in input order.
+    """
+    user_id = current_user.id
+    results = []
+    async for chunk in iter_chunks(iter_bulk_items(request), settings.BULK_INGEST_CHUNK_SIZE):
+        results.extend(await run_in_threadpool(ingester.ingest_chunk, db, user_id, chunk, len(results)))
+    return bulk_result(results)
 
 @router.get("/assessments/{assessment_id}", response_model=AssessmentSchema)
 def get_assessment(
@@ -55,7 +96,7 @@ def get_assessment(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get assessment details by ID."""
-    assessment = db.query(Assessment).join(Student).filter(
+    assessment = db.query(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).join(Student).filter(
         Assessment.id == assessment_id,
         Student.user_id == current_user.id
     ).first()
@@ -66,10 +107,19 @@ def get_assessment(
 @router.get("/students/{student_id}/assessments", response_model=List[AssessmentSchema])
 def get_student_assessments(
     student_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all assessments for a specific student."""
+    """Get assessments for a specific student, newest first.
+
+    Pages are keyed on (completed_date, id); pass the X-Next-Cursor response
+    header back as `cursor` for the next page. With `stream=true` every
+    remaining assessment is streamed as NDJSON and `limit` is ignored. Rows
+    are encoded straight to JSON; response_model only documents the shape.
+    """
     # Verify student belongs to the current user
     student = db.query(Student).filter(
         Student.id == student_id,
@@ -78,75 +128,123 @@ def get_student_assessments(
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    assessments = db.query(Assessment).filter(Assessment.student_id == student_id).all()
-    return assessments
+    stmt = select(Assessment).where(Assessment.student_id == student_id)
+    if stream:
+        return stream_ndjson(db, stmt, cursor)
+    return paginate(db, stmt, limit, cursor)
+
+@router.get("/students/{student_id}/progress", response_model=StudentProgressSchema)
+def get_student_progress(
+    student_id: int,
+    subject: Optional[Subject] = None,
+    since: Optional[date] = None,
+    period: str = Query("day", pattern="^(day|week|month)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get a student's score history per subject as daily, weekly or monthly points.
+
+    Served from the progress table maintained as assessments are created, so
+    the cost follows the number of points returned, not of assessments taken.
+    """
+    student = db.query(Student).filter(
+        Student.id == student_id,
+        Student.user_id == current_user.id
+    ).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    buckets = student_progress.get_progress(db, student_id, subject, since)
+    return student_progress.progress_series(student_id, buckets, period)
 
 @router.get("/assessments/subject/{subject}", response_model=List[AssessmentSchema])
 def get_subject_assessments(
     subject: Subject,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all assessments for a specific subject."""
-    assessments = db.query(Assessment).join(Student).filter(
+    """Get assessments for a specific subject, newest first.
+
+    Supports the same cursor pagination and NDJSON streaming as the student listing.
+    """
+    stmt = select(Assessment).join(Student).where(
         Assessment.subject == subject,
         Student.user_id == current_user.id
-    ).all()
-    return assessments
+    )
+    if stream:
+        return stream_ndjson(db, stmt, cursor)
+    return paginate(db, stmt, limit, cursor)
+
+@router.get("/question-sets/{subject}/{difficulty}", response_model=List[QuestionBankItemSchema])
+def get_question_set(
+    subject: Subject,
+    difficulty: Difficulty,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the questions of a test in one subject and difficulty from the shared question bank.
+
+    Served from this worker's pre-encoded copy of the set, which is only
+    read from the database when missing or older than QUESTION_SET_REFRESH_SECONDS.
+    """
+    return Response(question_bank.question_set(db, subject, difficulty), media_type="application/json")
+
+def load_clusters(db: Session, n_clusters: int) -> Dict[int, List[int]]:
+    clusters = clusterer.get_clusters(db, n_clusters)
+    if clusters is None:
+        raise HTTPException(status_code=404, detail="No cluster model found")
+    return clusters
+
+def load_distribution(db: Session, column: str, subject: Optional[Subject], grade: Optional[int]) -> Dict:
+    distribution = assessment_rollup.get_distribution(db, column, subject, grade)
+    if not distribution:
+        raise HTTPException(status_code=404, detail="No assessments found")
+    return distribution
 
 @router.get("/assessments/analysis/clusters", response_model=Dict[int, List[int]])
 def get_student_clusters(
+    request: Request,
     n_clusters: int = 3,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """Get student clusters based on assessment performance (admin only)."""
-    assessments = db.query(Assessment).all()
-    if not assessments:
-        raise HTTPException(status_code=404, detail="No assessments found")
-    
-    assessment_data = [
-        AssessmentCreate(
-            student_id=assessment.student_id,
-            subject=assessment.subject,
-            score=assessment.score,
-            questions=assessment.questions
-        ) for assessment in assessments
-    ]
-    
-    clusters = analyzer.cluster_students(assessment_data, n_clusters)
-    return clusters
+    """Get student clusters based on assessment performance (admin only).
+
+    Reads assignments precomputed by the incremental clustering model. The
+    response is cached per data version and revalidated with ETag.
+    """
+    return versioned_response(
+        request, ("clusters", n_clusters), cluster_version(db, n_clusters),
+        lambda: load_clusters(db, n_clusters)
+    )
 
 @router.get("/assessments/analysis/learning-styles")
 def get_learning_style_distribution(
+    request: Request,
+    subject: Optional[Subject] = None,
+    grade: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get distribution of learning styles across all students (admin only)."""
-    assessments = db.query(Assessment).all()
-    if not assessments:
-        raise HTTPException(status_code=404, detail="No assessments found")
-    
-    learning_styles = {}
-    for assessment in assessments:
-        style = assessment.learning_style
-        learning_styles[style] = learning_styles.get(style, 0) + 1
-    
-    return learning_styles
+    return versioned_response(
+        request, ("learning_style", subject, grade), distribution_version(db),
+        lambda: load_distribution(db, "learning_style", subject, grade)
+    )
 
 @router.get("/assessments/analysis/mastery-levels")
 def get_mastery_level_distribution(
+    request: Request,
+    subject: Optional[Subject] = None,
+    grade: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get distribution of mastery levels across all students (admin only)."""
-    assessments = db.query(Assessment).all()
-    if not assessments:
-        raise HTTPException(status_code=404, detail="No assessments found")
-    
-    mastery_levels = {}
-    for assessment in assessments:
-        level = assessment.mastery_level
-        mastery_levels[level] = mastery_levels.get(level, 0) + 1
-    
-    return mastery_levels 
\ No newline at end of file
+    return versioned_response(
+        request, ("mastery_level", subject, grade), distribution_version(db),
+        lambda: load_distribution(db, "mastery_level", subject, grade)
+    )
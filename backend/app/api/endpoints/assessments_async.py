@@ -0,0 +1,214 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional
+from ...database import get_async_db
+from ...models import Assessment, Difficulty, Student, Subject, User, ASSESSMENT_LOAD_OPTIONS
+from ...schemas import (
+    AssessmentCreate, Assessment as AssessmentSchema, BulkAssessmentResult, QuestionBankItem as QuestionBankItemSchema,
+    StudentProgress as StudentProgressSchema
+)
+from ...services import assessment_rollup, student_progress
+from ...services.analytics_cache import cluster_version, distribution_version
+from ...services.question_bank import question_bank
+from ...core.auth import get_current_active_user_async, get_current_admin_user_async
+from ...core.config import settings
+from ...core.request_profiling import ProfiledRoute
+from ..pagination import paginate_async, stream_ndjson_async
+from ..bulk import bulk_result, iter_bulk_items, iter_chunks
+from ..caching import versioned_response
+from .assessments import analyzer, clusterer, ingester, load_clusters, load_distribution
+
+# AsyncSession versions of the routes in assessments.py, mounted at the same
+# paths when settings.DATABASE_ASYNC is enabled. Sync-only services run on
+# the session's greenlet through AsyncSession.run_sync.
+router = APIRouter(route_class=ProfiledRoute)
+
+async def _get_owned_student(db: AsyncSession, student_id: int, user_id: int) -> Optional[Student]:
+    return await db.scalar(select(Student).where(
+        Student.id == student_id,
+        Student.user_id == user_id
+    ))
+
+@router.post("/assessments/", response_model=AssessmentSchema)
+async def create_assessment(
+    assessment: AssessmentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Submit a new assessment and get analysis results."""
+    student = await _get_owned_student(db, assessment.student_id, current_user.id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    # Analyze assessment
+    skill_breakdown, recommendations = analyzer.analyze_assessment(assessment)
+    learning_style = analyzer.predict_learning_style(assessment)
+    mastery_level = analyzer.calculate_mastery_level(assessment.score)
+    
+    # Create assessment record
+    db_assessment = Assessment(
+        student_id=assessment.student_id,
+        subject=assessment.subject,
+        score=assessment.score,
+        total_questions=len(assessment.questions),
+        skill_breakdown=skill_breakdown,
+        recommendations=recommendations,
+        learning_style=learning_style,
+        mastery_level=mastery_level
+    )
+    
+    db.add(db_assessment)
+    await db.run_sync(lambda session: assessment_rollup.record_assessment(session, db_assessment, student.grade))
+    await db.flush()
+    await db.run_sync(lambda session: question_bank.record_responses(
+        session, db_assessment.id, assessment.subject, assessment.questions
+    ))
+    await db.run_sync(lambda session: clusterer.assign(session, db_assessment, settings.CLUSTER_COUNTS))
+    await db.run_sync(lambda session: student_progress.record_assessment(
+        session, db_assessment, settings.PROGRESS_EWMA_ALPHA
+    ))
+    await db.commit()
+    
+    return await db.scalar(
+        select(Assessment).options(*ASSESSMENT_LOAD_OPTIONS)
+        .where(Assessment.id == db_assessment.id)
+        .execution_options(populate_existing=True)
+    )
+
+@router.post("/assessments/bulk", response_model=BulkAssessmentResult)
+async def create_assessments_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Submit many assessments as a JSON array or an NDJSON stream (application/x-ndjson)."""
+    user_id = current_user.id
+    results = []
+    async for chunk in iter_chunks(iter_bulk_items(request), settings.BULK_INGEST_CHUNK_SIZE):
+        results.extend(await db.run_sync(ingester.ingest_chunk, user_id, chunk, len(results)))
+    return bulk_result(results)
+
+@router.get("/assessments/{assessment_id}", response_model=AssessmentSchema)
+async def get_assessment(
+    assessment_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Get assessment details by ID."""
+    assessment = await db.scalar(select(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).join(Student).where(
+        Assessment.id == assessment_id,
+        Student.user_id == current_user.id
+    ))
+    if not assessment:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return assessment
+
+@router.get("/students/{student_id}/assessments", response_model=List[AssessmentSchema])
+async def get_student_assessments(
+    student_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Get assessments for a specific student, newest first."""
+    student = await _get_owned_student(db, student_id, current_user.id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    stmt = select(Assessment).where(Assessment.student_id == student_id)
+    if stream:
+        return stream_ndjson_async(db, stmt, cursor)
+    return await paginate_async(db, stmt, limit, cursor)
+
+@router.get("/students/{student_id}/progress", response_model=StudentProgressSchema)
+async def get_student_progress(
+    student_id: int,
+    subject: Optional[Subject] = None,
+    since: Optional[date] = None,
+    period: str = Query("day", pattern="^(day|week|month)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Get a student's score history per subject as daily, weekly or monthly points."""
+    student = await _get_owned_student(db, student_id, current_user.id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    buckets = await db.run_sync(lambda session: student_progress.get_progress(session, student_id, subject, since))
+    return student_progress.progress_series(student_id, buckets, period)
+
+@router.get("/assessments/subject/{subject}", response_model=List[AssessmentSchema])
+async def get_subject_assessments(
+    subject: Subject,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Get assessments for a specific subject, newest first."""
+    stmt = select(Assessment).join(Student).where(
+        Assessment.subject == subject,
+        Student.user_id == current_user.id
+    )
+    if stream:
+        return stream_ndjson_async(db, stmt, cursor)
+    return await paginate_async(db, stmt, limit, cursor)
+
+@router.get("/question-sets/{subject}/{difficulty}", response_model=List[QuestionBankItemSchema])
+async def get_question_set(
+    subject: Subject,
+    difficulty: Difficulty,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Get the questions of a test in one subject and difficulty from the shared question bank."""
+    body = question_bank.cached_set(subject, difficulty)
+    if body is None:
+        body = await db.run_sync(question_bank.load_set, subject, difficulty)
+    return Response(body, media_type="application/json")
+
+@router.get("/assessments/analysis/clusters", response_model=Dict[int, List[int]])
+async def get_student_clusters(
+    request: Request,
+    n_clusters: int = 3,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_user_async)
+):
+    """Get student clusters based on assessment performance (admin only)."""
+    return await db.run_sync(lambda session: versioned_response(
+        request, ("clusters", n_clusters), cluster_version(session, n_clusters),
+        lambda: load_clusters(session, n_clusters)
+    ))
+
+@router.get("/assessments/analysis/learning-styles")
+async def get_learning_style_distribution(
+    request: Request,
+    subject: Optional[Subject] = None,
+    grade: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_user_async)
+):
+    """Get distribution of learning styles across all students (admin only)."""
+    return await db.run_sync(lambda session: versioned_response(
+        request, ("learning_style", subject, grade), distribution_version(session),
+        lambda: load_distribution(session, "learning_style", subject, grade)
+    ))
+
+@router.get("/assessments/analysis/mastery-levels")
+async def get_mastery_level_distribution(
+    request: Request,
+    subject: Optional[Subject] = None,
+    grade: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_user_async)
+):
+    """Get distribution of mastery levels across all students (admin only)."""
+    return await db.run_sync(lambda session: versioned_response(
+        request, ("mastery_level", subject, grade), distribution_version(session),
+        lambda: load_distribution(session, "mastery_level", subject, grade)
+    ))
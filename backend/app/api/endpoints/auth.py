@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Any
 from ...core import security
-from ...core.auth import get_current_active_user
+from ...core.user_cache import user_cache
+from ...core.auth import get_current_active_user, oauth2_scheme
+from ...core.token_cache import token_digest, token_revocations
 from ...database import get_db
 from ...models import User
-from ...schemas.auth import Token, UserCreate, User as UserSchema
+from ...schemas.auth import Token, UserCreate, UserUpdate, User as UserSchema
 from ...core.config import settings
+from ...core.request_profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 @router.post("/login", response_model=Token)
 def login(
@@ -18,7 +21,12 @@ def login(
 ) -> Any:
     """OAuth2 compatible token login."""
     user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = security.password_hasher.run_sync(
+            security.verify_and_update_password, form_data.password, user.hashed_password
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -30,9 +38,28 @@ def login(
             detail="Inactive user"
         )
     
-    access_token = security.create_access_token(data={"sub": user.id})
+    if new_hash:
+        # Stored hash was made with a different bcrypt cost; upgrade it in place
+        user.hashed_password = new_hash
+        db.commit()
+    
+    access_token = security.create_access_token(data={"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    """Revoke the presented access token before it expires."""
+    payload = security.verify_token(token)
+    # A token that expired since authenticating needs no revocation
+    if payload is not None:
+        token_revocations.revoke_token(db, token_digest(token), payload["exp"])
+        db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @router.post("/register", response_model=UserSchema)
 def register(
     *,
@@ -49,7 +76,7 @@ def register(
     
     user = User(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=security.password_hasher.run_sync(security.get_password_hash, user_in.password),
         full_name=user_in.full_name,
         is_active=user_in.is_active,
         is_admin=user_in.is_admin
@@ -75,7 +102,11 @@ def update_user_me(
 ) -> Any:
     """Update current user."""
     if user_in.password is not None:
-        current_user.hashed_password = security.get_password_hash(user_in.password)
+        current_user.hashed_password = security.password_hasher.run_sync(
+            security.get_password_hash, user_in.password
+        )
+        # Sign out every session that authenticated with the old password
+        token_revocations.revoke_user(db, current_user.id)
     if user_in.email is not None:
         current_user.email = user_in.email
     if user_in.full_name is not None:
@@ -83,5 +114,6 @@ def update_user_me(
     
     db.add(current_user)
     db.commit()
+    user_cache.invalidate(current_user.id)
     db.refresh(current_user)
     return current_user 
\ No newline at end of file
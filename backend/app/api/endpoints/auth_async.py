@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any
+from ...core import security
+from ...core.user_cache import user_cache
+from ...core.auth import get_current_active_user_async, oauth2_scheme
+from ...core.request_profiling import ProfiledRoute
+from ...core.token_cache import token_digest, token_revocations
+from ...database import get_async_db
+from ...models import User
+from ...schemas.auth import Token, UserCreate, UserUpdate, User as UserSchema
+
+# AsyncSession versions of the routes in auth.py. bcrypt runs on the
+# dedicated password hashing pool, off the event loop.
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.post("/login", response_model=Token)
+async def login(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends()
+) -> Any:
+    """OAuth2 compatible token login."""
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await security.password_hasher.run(
+            security.verify_and_update_password, form_data.password, user.hashed_password
+        )
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    if new_hash:
+        # Stored hash was made with a different bcrypt cost; upgrade it in place
+        user.hashed_password = new_hash
+        await db.commit()
+    
+    access_token = security.create_access_token(data={"sub": str(user.id)})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
+) -> Response:
+    """Revoke the presented access token before it expires."""
+    payload = security.verify_token(token)
+    # A token that expired since authenticating needs no revocation
+    if payload is not None:
+        token_revocations.revoke_token(db, token_digest(token), payload["exp"])
+        await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/register", response_model=UserSchema)
+async def register(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_in: UserCreate
+) -> Any:
+    """Register new user."""
+    user = await db.scalar(select(User).where(User.email == user_in.email))
+    if user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    user = User(
+        email=user_in.email,
+        hashed_password=await security.password_hasher.run(security.get_password_hash, user_in.password),
+        full_name=user_in.full_name,
+        is_active=user_in.is_active,
+        is_admin=user_in.is_admin
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+@router.get("/me", response_model=UserSchema)
+async def read_users_me(
+    current_user: User = Depends(get_current_active_user_async)
+) -> Any:
+    """Get current user."""
+    return current_user
+
+@router.put("/me", response_model=UserSchema)
+async def update_user_me(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_in: UserUpdate,
+    current_user: User = Depends(get_current_active_user_async)
+) -> Any:
+    """Update current user."""
+    if user_in.password is not None:
+        current_user.hashed_password = await security.password_hasher.run(security.get_password_hash, user_in.password)
+        # Sign out every session that authenticated with the old password
+        token_revocations.revoke_user(db, current_user.id)
+    if user_in.email is not None:
+        current_user.email = user_in.email
+    if user_in.full_name is not None:
+        current_user.full_name = user_in.full_name
+    
+    db.add(current_user)
+    await db.commit()
+    user_cache.invalidate(current_user.id)
+    await db.refresh(current_user)
+    return current_user
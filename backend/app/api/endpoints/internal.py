@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from typing import Dict
+from ...core.auth import get_current_admin_user
+from ...core.pool_metrics import async_pool_metrics, sync_pool_metrics
+from ...core.security import password_hasher
+from ...core.token_cache import token_cache, token_revocations
+from ...core.user_cache import user_cache
+from ...core.request_profiling import ProfiledRoute, request_metrics, slow_request_sampler
+from ...services.adaptive_testing import adaptive_items, adaptive_tester
+from ...services.assessment_sessions import assessment_sessions
+from ...services.question_bank import question_bank
+from ...services.recommendation_rules import recommendation_rules
+from ...services.resource_catalog import resource_catalog
+from ..caching import analytics_cache
+
+# Operational endpoints for the deployment's own monitoring. Some expose
+# request paths and stacks, so every route needs an admin token; scrapers
+# send one as a bearer credential.
+router = APIRouter(route_class=ProfiledRoute, dependencies=[Depends(get_current_admin_user)])
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics() -> Dict:
+    """Connection pool occupancy, overflow and checkout wait statistics per engine."""
+    metrics = {"sync": sync_pool_metrics.snapshot()}
+    if async_pool_metrics.engine is not None:
+        metrics["async"] = async_pool_metrics.snapshot()
+    return metrics
+
+@router.get("/metrics/user-cache")
+def get_user_cache_metrics() -> Dict:
+    """Hit/miss counters and occupancy of the authenticated-user cache."""
+    return user_cache.stats()
+
+@router.get("/metrics/token-cache")
+def get_token_cache_metrics() -> Dict:
+    """Verified-token cache counters and revocation filter size and hit statistics."""
+    return {"cache": token_cache.stats(), "revocations": token_revocations.stats()}
+
+@router.get("/metrics/password-hasher")
+def get_password_hasher_metrics() -> Dict:
+    """Queue depth and rejection counters of the password hashing pool."""
+    return password_hasher.stats()
+
+@router.get("/metrics/analytics-cache")
+def get_analytics_cache_metrics() -> Dict:
+    """Hit, miss and 304 counters of the analytics response cache."""
+    return analytics_cache.stats()
+
+@router.get("/metrics/resource-catalog")
+def get_resource_catalog_metrics() -> Dict:
+    """Size, posting keys and age of the in-memory resource catalog index."""
+    return resource_catalog.stats()
+
+@router.get("/metrics/question-bank")
+def get_question_bank_metrics() -> Dict:
+    """Id cache hit ratio, inserted items and cached question set counters of the question bank."""
+    return question_bank.stats()
+
+@router.get("/metrics/adaptive-testing")
+def get_adaptive_testing_metrics() -> Dict:
+    """Live session counts of the adaptive tester and size and age of its item index."""
+    return {"sessions": adaptive_tester.stats(), "items": adaptive_items.stats()}
+
+@router.get("/metrics/assessment-sessions")
+def get_assessment_session_metrics() -> Dict:
+    """In-memory and dirty session counts and write-behind flush counters of the session store."""
+    return assessment_sessions.stats()
+
+@router.get("/metrics/recommendation-rules")
+def get_recommendation_rule_metrics() -> Dict:
+    """Per-rule firing counts and message table size of the recommendation rule engine."""
+    return recommendation_rules.stats()
+
+@router.get("/metrics/requests", response_class=PlainTextResponse)
+def get_request_metrics() -> PlainTextResponse:
+    """Per-route histograms of wall, database, analyzer and serialization time in Prometheus text format."""
+    return PlainTextResponse(request_metrics.exposition(), media_type="text/plain; version=0.0.4")
+
+@router.get("/profiles/slow")
+def get_slow_request_profiles() -> Dict:
+    """Sampled stacks of the most recent slow requests; empty unless SLOW_REQUEST_PROFILE_MS is set."""
+    if slow_request_sampler is None:
+        return {"enabled": False}
+    return {"enabled": True, **slow_request_sampler.stats()}
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from ...database import get_db
+from ...models import Job, User
+from ...schemas import Job as JobSchema, JobCreate
+from ...core.auth import get_current_admin_user
+from ...core.request_profiling import ProfiledRoute
+from ...services import job_queue
+
+# Jobs are only queued here; `app.cli run-jobs` runs them in its own processes
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.post("/jobs", response_model=JobSchema, status_code=202)
+def enqueue_job(
+    job: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Queue a background job (admin only); poll GET /jobs/{job_id} for progress and result.
+
+    Job types: update_clusters, regenerate_plans, rescore_assessments, cluster_cohorts.
+    """
+    try:
+        return job_queue.enqueue(db, job.job_type, job.params, current_user.id)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False, include_context=False))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+@router.get("/jobs/{job_id}", response_model=JobSchema)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get a job's status, progress and, once finished, its result or error (admin only)."""
+    job = db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobSchema)
+def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Cancel a job (admin only).
+
+    A queued job is cancelled at once; a running job stops at its next
+    progress report and keeps the work it already committed.
+    """
+    job = job_queue.cancel(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
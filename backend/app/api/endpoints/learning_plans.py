@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from ...database import get_db
+from ...models import LearningPlan, Student, User, LEARNING_PLAN_LOAD_OPTIONS
+from ...schemas import LearningPlan as LearningPlanSchema
+from ...core.auth import get_current_active_user
+from ...core.request_profiling import ProfiledRoute
+from ...services.assessment_analyzer import AssessmentAnalyzer
+from ...services.plan_generator import PlanGenerator
+from ...services.resource_catalog import resource_catalog
+
+router = APIRouter(route_class=ProfiledRoute)
+generator = PlanGenerator(AssessmentAnalyzer(), resource_catalog)
+
+@router.get("/learning-plans/{plan_id}", response_model=LearningPlanSchema)
+def get_learning_plan(
+    plan_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get a learning plan with its full subject, goal and resource tree."""
+    plan = db.query(LearningPlan).options(*LEARNING_PLAN_LOAD_OPTIONS).join(Student).filter(
+        LearningPlan.id == plan_id,
+        Student.user_id == current_user.id
+    ).first()
+    if not plan:
+        raise HTTPException(status_code=404, detail="Learning plan not found")
+    return plan
+
+@router.get("/students/{student_id}/learning-plans", response_model=List[LearningPlanSchema])
+def get_student_learning_plans(
+    student_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get all learning plans for a specific student, newest first."""
+    student = db.query(Student).filter(
+        Student.id == student_id,
+        Student.user_id == current_user.id
+    ).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    plans = db.query(LearningPlan).options(*LEARNING_PLAN_LOAD_OPTIONS).filter(
+        LearningPlan.student_id == student_id
+    ).order_by(LearningPlan.created_at.desc()).all()
+    return plans
+
+@router.post("/students/{student_id}/learning-plans/generate", response_model=LearningPlanSchema)
+def generate_learning_plan(
+    student_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Replace the student's learning plan with one built from their latest assessment in each subject."""
+    student = db.query(Student).filter(
+        Student.id == student_id,
+        Student.user_id == current_user.id
+    ).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    plan_id = generator.generate(db, student_id)
+    if plan_id is None:
+        raise HTTPException(status_code=404, detail="No assessments found")
+    db.commit()
+    
+    return db.query(LearningPlan).options(*LEARNING_PLAN_LOAD_OPTIONS).filter(LearningPlan.id == plan_id).one()
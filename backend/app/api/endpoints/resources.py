@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ...database import get_db
+from ...models import Subject, Difficulty, ResourceType, User
+from ...schemas import CatalogResource
+from ...core.auth import get_current_active_user
+from ...core.request_profiling import ProfiledRoute
+from ...services.resource_catalog import resource_catalog
+
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.get("/resources/recommendations", response_model=List[CatalogResource])
+def get_resource_recommendations(
+    subject: Subject,
+    skills: List[str] = Query(..., description="skills to cover, weakest first"),
+    difficulty: Optional[List[Difficulty]] = Query(None, description="accepted difficulties in preference order"),
+    resource_type: Optional[List[ResourceType]] = Query(None, description="accepted types in preference order"),
+    limit: int = Query(5, ge=1, le=100),
+    per_skill: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Top catalog resources for a set of skills, served from the in-memory resource index."""
+    catalog = resource_catalog.current(db)
+    return catalog.top_n(subject, skills, difficulty, resource_type, n=limit, per_skill=per_skill)
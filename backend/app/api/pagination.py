@@ -0,0 +1,135 @@
+import base64
+import json
+import orjson
+from datetime import datetime
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import Result, Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence
+from ..core.request_profiling import timed
+from ..models import Assessment, AssessmentResponse, QuestionBankItem
+from ..schemas import Assessment as AssessmentSchema, Question as QuestionSchema
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_BATCH_SIZE = 500
+
+# Columns selected for list responses, in response-schema field order. Rows
+# come straight from the database, so they are encoded without a second
+# round of Pydantic validation.
+ASSESSMENT_COLUMNS = tuple(getattr(Assessment, field) for field in AssessmentSchema.model_fields if field != "questions")
+# Question fields come from the shared bank item, the rest from the response row
+RESPONSE_FIELDS = ("assessment_id", "chosen_option", "is_correct")
+QUESTION_COLUMNS = tuple(
+    AssessmentResponse.question_id.label("id") if field == "id"
+    else getattr(AssessmentResponse if field in RESPONSE_FIELDS else QuestionBankItem, field)
+    for field in QuestionSchema.model_fields
+)
+
+def encode_cursor(completed_date: datetime, assessment_id: int) -> str:
+    """Encode the (completed_date, id) keyset position of an assessment."""
+    payload = json.dumps([completed_date.isoformat(), assessment_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        completed_date, assessment_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(completed_date), int(assessment_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_query(stmt: Select, cursor: Optional[str]) -> Select:
+    """Order assessments newest first and resume after the cursor position."""
+    if cursor is not None:
+        stmt = stmt.where(
+            tuple_(Assessment.completed_date, Assessment.id) < tuple_(*decode_cursor(cursor))
+        )
+    return stmt.order_by(Assessment.completed_date.desc(), Assessment.id.desc())
+
+def assessment_rows(stmt: Select, cursor: Optional[str]) -> Select:
+    """Narrow a select() of assessments to the list-response columns, in keyset order."""
+    return keyset_query(stmt.with_only_columns(*ASSESSMENT_COLUMNS), cursor)
+
+def questions_query(assessments: Sequence[Dict]) -> Select:
+    return select(*QUESTION_COLUMNS).join_from(AssessmentResponse, QuestionBankItem).where(
+        AssessmentResponse.assessment_id.in_([assessment["id"] for assessment in assessments])
+    ).order_by(AssessmentResponse.assessment_id, AssessmentResponse.position)
+
+def as_dicts(result: Result) -> List[Dict]:
+    """Rows as plain dicts keyed by column name; orjson encodes these natively."""
+    fields = tuple(result.keys())
+    return [dict(zip(fields, row)) for row in result]
+
+def attach_questions(assessments: List[Dict], questions: Sequence[Dict]) -> List[Dict]:
+    """Nest question rows under their assessments, like selectinload(Assessment.responses)."""
+    by_id = {}
+    for assessment in assessments:
+        assessment["questions"] = by_id[assessment["id"]] = []
+    for question in questions:
+        by_id[question["assessment_id"]].append(question)
+    return assessments
+
+def page_response(assessments: List[Dict], limit: int) -> ORJSONResponse:
+    """Encode one page with orjson, setting X-Next-Cursor when more rows follow."""
+    headers = {}
+    if len(assessments) > limit:
+        assessments = assessments[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(assessments[-1]["completed_date"], assessments[-1]["id"])
+    with timed("serialization"):
+        return ORJSONResponse(assessments, headers=headers)
+
+def paginate(db: Session, stmt: Select, limit: int, cursor: Optional[str] = None) -> ORJSONResponse:
+    """Return one page of assessments with their questions as an orjson-encoded response."""
+    assessments = as_dicts(db.execute(assessment_rows(stmt, cursor).limit(limit + 1)))
+    if assessments:
+        attach_questions(assessments, as_dicts(db.execute(questions_query(assessments))))
+    return page_response(assessments, limit)
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    limit: int,
+    cursor: Optional[str] = None
+) -> ORJSONResponse:
+    """Async variant of paginate."""
+    assessments = as_dicts(await db.execute(assessment_rows(stmt, cursor).limit(limit + 1)))
+    if assessments:
+        attach_questions(assessments, as_dicts(await db.execute(questions_query(assessments))))
+    return page_response(assessments, limit)
+
+def stream_ndjson(db: Session, stmt: Select, cursor: Optional[str] = None) -> StreamingResponse:
+    """Stream every assessment after the cursor as NDJSON from a server-side cursor.
+
+    Questions are loaded per batch of STREAM_BATCH_SIZE assessments and each
+    batch is written as a single chunk.
+    """
+    stmt = assessment_rows(stmt, cursor).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    def generate() -> Iterator[bytes]:
+        result = db.execute(stmt)
+        fields = tuple(result.keys())
+        for batch in result.partitions():
+            assessments = [dict(zip(fields, row)) for row in batch]
+            attach_questions(assessments, as_dicts(db.execute(questions_query(assessments))))
+            yield _ndjson(assessments)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+def stream_ndjson_async(db: AsyncSession, stmt: Select, cursor: Optional[str] = None) -> StreamingResponse:
+    """Async variant of stream_ndjson."""
+    stmt = assessment_rows(stmt, cursor).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    async def generate() -> AsyncIterator[bytes]:
+        result = await db.stream(stmt)
+        fields = tuple(result.keys())
+        async for batch in result.partitions():
+            assessments = [dict(zip(fields, row)) for row in batch]
+            attach_questions(assessments, as_dicts(await db.execute(questions_query(assessments))))
+            yield _ndjson(assessments)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+def _ndjson(items: List[Dict]) -> bytes:
+    return b"".join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in items)
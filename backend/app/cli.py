@@ -0,0 +1,184 @@
+import argparse
+import json
+import logging
+import signal
+import time
+from .database import SessionLocal
+from .core.config import settings
+from .core.token_cache import token_revocations
+from . import migrations
+from .services import assessment_rollup
+from .services import job_queue
+from .services import plan_generator
+from .services import student_progress
+from .services.adaptive_testing import calibrate_items as calibrate_adaptive_items
+from .services.assessment_analyzer import AssessmentAnalyzer
+from .services.cohort_clustering import cluster_cohorts as fit_cohort_clusters
+from .services.student_clustering import StudentClusterer
+
+def migrate(args: argparse.Namespace) -> None:
+    """Apply Alembic migrations to DATABASE_URL."""
+    migrations.upgrade(revision=args.revision)
+    print(f"Database migrated to {args.revision}")
+
+def rebuild_rollup(args: argparse.Namespace) -> None:
+    """Backfill the assessment rollup table from existing assessments."""
+    db = SessionLocal()
+    try:
+        rows = assessment_rollup.rebuild_rollup(db)
+    finally:
+        db.close()
+    print(f"Rebuilt assessment rollup: {rows} rows")
+
+def rebuild_progress(args: argparse.Namespace) -> None:
+    """Backfill the student progress series from existing assessments."""
+    db = SessionLocal()
+    try:
+        rows = student_progress.rebuild_progress(db, settings.PROGRESS_EWMA_ALPHA)
+    finally:
+        db.close()
+    print(f"Rebuilt student progress: {rows} buckets")
+
+def prune_revocations(args: argparse.Namespace) -> None:
+    """Delete token revocations whose tokens have expired."""
+    db = SessionLocal()
+    try:
+        deleted = token_revocations.prune(db)
+    finally:
+        db.close()
+    print(f"Pruned {deleted} expired token revocations")
+
+def calibrate_items(args: argparse.Namespace) -> None:
+    """Re-estimate question bank item locations from recorded answers."""
+    db = SessionLocal()
+    try:
+        updated = calibrate_adaptive_items(db, args.min_responses)
+    finally:
+        db.close()
+    print(f"Calibrated {updated} question bank items")
+
+def update_clusters(args: argparse.Namespace) -> None:
+    """Fold new assessments into the persisted cluster models."""
+    clusterer = StudentClusterer(AssessmentAnalyzer(), batch_size=args.batch_size)
+    db = SessionLocal()
+    try:
+        for n_clusters in args.n_clusters:
+            consumed = clusterer.update(db, n_clusters)
+            print(f"n_clusters={n_clusters}: folded in {consumed} assessments")
+            if args.reassign:
+                updated = clusterer.reassign_all(db, n_clusters)
+                print(f"n_clusters={n_clusters}: reassigned {updated} students")
+    finally:
+        db.close()
+
+def cluster_cohorts(args: argparse.Namespace) -> None:
+    """Cluster each subject cohort separately, choosing the number of clusters per cohort."""
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        cohorts = fit_cohort_clusters(
+            db,
+            AssessmentAnalyzer(),
+            by_grade=args.by_grade,
+            k_range=(args.min_clusters, args.max_clusters),
+            sample_size=args.sample_size,
+            time_budget=args.time_budget,
+            workers=args.workers,
+        )
+    finally:
+        db.close()
+    for cohort in cohorts:
+        grade = f" grade {cohort['grade']}" if cohort["grade"] is not None else ""
+        silhouette = f"{cohort['silhouette']:.3f}" if cohort["silhouette"] is not None else "n/a"
+        sizes = "/".join(str(len(members)) for members in cohort["clusters"].values())
+        partial = "" if cohort["complete"] else " (time budget reached)"
+        print(f"{cohort['subject']}{grade}: {cohort['n_students']} students, k={cohort['n_clusters']} "
+              f"silhouette={silhouette} sizes={sizes}{partial}")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(cohorts, output)
+    print(f"Clustered {len(cohorts)} cohorts in {time.perf_counter() - start:.1f}s")
+
+def regenerate_plans(args: argparse.Namespace) -> None:
+    """Rebuild every student's learning plan from their latest assessments."""
+    start = time.perf_counter()
+    written = plan_generator.regenerate_all(settings.DATABASE_URL, workers=args.workers, chunk_size=args.chunk_size)
+    print(f"Regenerated {written} learning plans in {time.perf_counter() - start:.1f}s")
+
+def run_jobs(args: argparse.Namespace) -> None:
+    """Run queued background jobs in worker processes until SIGTERM or Ctrl-C."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    runner = job_queue.job_runner(workers=args.workers)
+    # Stop claiming on SIGTERM or Ctrl-C; jobs already running are waited for
+    signal.signal(signal.SIGTERM, lambda signum, frame: runner.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: runner.stop())
+    outcomes = runner.run(drain=args.drain)
+    print("Jobs run: " + (", ".join(f"{count} {status}" for status, count in sorted(outcomes.items())) or "none"))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="TutorKids maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="apply schema migrations")
+    migrate_parser.add_argument("--revision", default="head")
+    migrate_parser.set_defaults(func=migrate)
+
+    subparsers.add_parser(
+        "rebuild-rollup", help="recompute assessment_rollups from the assessments table"
+    ).set_defaults(func=rebuild_rollup)
+
+    subparsers.add_parser(
+        "rebuild-progress", help="recompute student_progress from the assessments table"
+    ).set_defaults(func=rebuild_progress)
+
+    subparsers.add_parser(
+        "prune-revocations", help="delete expired rows from revoked_tokens"
+    ).set_defaults(func=prune_revocations)
+
+    calibrate_parser = subparsers.add_parser(
+        "calibrate-items", help="estimate adaptive testing item difficulties from assessment_responses"
+    )
+    calibrate_parser.add_argument("--min-responses", type=int, default=30)
+    calibrate_parser.set_defaults(func=calibrate_items)
+
+    clusters_parser = subparsers.add_parser(
+        "update-clusters", help="apply mini-batch updates to the student cluster models"
+    )
+    clusters_parser.add_argument("--n-clusters", type=int, nargs="+", default=settings.CLUSTER_COUNTS)
+    clusters_parser.add_argument("--batch-size", type=int, default=settings.CLUSTER_BATCH_SIZE)
+    clusters_parser.add_argument(
+        "--reassign", action="store_true", help="refresh every student's assignment afterwards"
+    )
+    clusters_parser.set_defaults(func=update_clusters)
+
+    cohorts_parser = subparsers.add_parser(
+        "cluster-cohorts", help="cluster students per subject in parallel, choosing k by silhouette score"
+    )
+    cohorts_parser.add_argument("--by-grade", action="store_true", help="split subject cohorts by grade")
+    cohorts_parser.add_argument("--min-clusters", type=int, default=settings.COHORT_CLUSTER_MIN)
+    cohorts_parser.add_argument("--max-clusters", type=int, default=settings.COHORT_CLUSTER_MAX)
+    cohorts_parser.add_argument("--sample-size", type=int, default=settings.COHORT_CLUSTER_SAMPLE_SIZE)
+    cohorts_parser.add_argument("--time-budget", type=float, default=settings.COHORT_CLUSTER_TIME_BUDGET_SECONDS)
+    cohorts_parser.add_argument("--workers", type=int, default=settings.COHORT_CLUSTER_WORKERS)
+    cohorts_parser.add_argument("--output", help="write the cohorts, with centroids and members, as JSON")
+    cohorts_parser.set_defaults(func=cluster_cohorts)
+
+    plans_parser = subparsers.add_parser(
+        "regenerate-plans", help="rebuild every student's learning plan in parallel worker processes"
+    )
+    plans_parser.add_argument("--workers", type=int, default=settings.PLAN_REFRESH_WORKERS)
+    plans_parser.add_argument("--chunk-size", type=int, default=settings.PLAN_REFRESH_CHUNK_SIZE)
+    plans_parser.set_defaults(func=regenerate_plans)
+
+    jobs_parser = subparsers.add_parser(
+        "run-jobs", help="run background jobs queued through POST /jobs in worker processes"
+    )
+    jobs_parser.add_argument("--workers", type=int, default=settings.JOB_WORKERS)
+    jobs_parser.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    jobs_parser.set_defaults(func=run_jobs)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,88 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Tuple
+from .config import settings
 from .security import verify_token
-from ..database import get_db
+from .token_cache import token_cache, token_digest, token_revocations
+from .user_cache import user_cache
+from ..database import get_db, get_async_db
 from ..models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    payload = verify_token(token)
+
+def _verified_token(token: str) -> Tuple[bytes, dict]:
+    """Return the digest and payload of a valid token or raise 401.
+
+    Payloads of recently verified tokens come from the token cache without
+    re-checking the signature; callers must still check revocation.
+    """
+    digest = token_digest(token)
+    payload = token_cache.get(digest)
     if payload is None:
-        raise credentials_exception
+        payload = verify_token(token)
+        if payload is None or payload.get("sub") is None:
+            raise _credentials_exception()
+        token_cache.put(digest, payload)
+    return digest, payload
+
+def _reject_revoked(digest: bytes) -> HTTPException:
+    token_cache.discard(digest)
+    return _credentials_exception()
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user, served from the user cache when possible."""
+    digest, payload = _verified_token(token)
+    user_id = int(payload["sub"])
+    if token_revocations.is_revoked(db, digest, user_id, payload.get("iat", 0)):
+        raise _reject_revoked(digest)
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return db.merge(user_cache.to_user(cached), load=False)
     
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
+    user_cache.put(user)
+    return user
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user through the async session."""
+    digest, payload = _verified_token(token)
+    user_id = int(payload["sub"])
+    issued_at = payload.get("iat", 0)
+    # Only a stale filter or a filter hit needs the database
+    revoked = None if token_revocations.stale() else token_revocations.check(digest, user_id, issued_at)
+    if revoked is None:
+        revoked = await db.run_sync(token_revocations.is_revoked, digest, user_id, issued_at)
+    if revoked:
+        raise _reject_revoked(digest)
+    
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(user_cache.to_user(cached), load=False)
+    
+    user = await db.get(User, user_id)
+    if user is None:
+        raise _credentials_exception()
+    
+    user_cache.put(user)
     return user
 
 async def get_current_active_user(
@@ -53,4 +105,16 @@ def get_current_admin_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async)
+) -> User:
+    """Get current active user through the async session."""
+    return await get_current_active_user(current_user)
+
+async def get_current_admin_user_async(
+    current_user: User = Depends(get_current_active_user_async)
+) -> User:
+    """Get current admin user through the async session."""
+    return get_current_admin_user(current_user)
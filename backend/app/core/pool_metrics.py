@@ -0,0 +1,122 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Type
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+class PoolMetrics:
+    """Thread-safe counters for one engine's connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def _pool(self):
+        # Only queue pools report size and overflow; SQLite's default pools do not
+        if self.engine is None or not hasattr(self.engine.pool, "overflow"):
+            return None
+        return self.engine.pool
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def on_checkout(self, *args) -> None:
+        with self._lock:
+            self.checkouts += 1
+            pool = self._pool()
+            if pool is not None:
+                self.peak_in_use = max(self.peak_in_use, pool.checkedout())
+
+    def on_checkin(self, *args) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def on_connect(self, *args) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self, *args) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict:
+        """Return current pool occupancy and cumulative counters."""
+        with self._lock:
+            waits = sum(self.wait_buckets)
+            snapshot = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "peak_in_use": self.peak_in_use,
+                "wait_seconds": {
+                    "count": waits,
+                    "total": self.wait_total,
+                    "mean": self.wait_total / waits if waits else 0.0,
+                    "max": self.wait_max,
+                    "buckets": {
+                        **{str(bound): count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)},
+                        "+Inf": self.wait_buckets[-1],
+                    },
+                },
+            }
+        pool = self._pool()
+        if pool is not None:
+            snapshot.update({
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return snapshot
+
+def timed_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Subclass a pool class so connect() records how long callers wait for a connection.
+
+    Pools have no event before checkout, so the wait is timed around connect();
+    Pool.recreate() keeps the subclass across engine.dispose().
+    """
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = base.connect(self)
+        except PoolTimeoutError:
+            metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect})
+
+def instrument_engine(engine: Engine, metrics: PoolMetrics) -> None:
+    """Attach pool event listeners that feed metrics; they survive engine.dispose()."""
+    metrics.engine = engine
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+    event.listen(engine, "connect", metrics.on_connect)
+    event.listen(engine, "invalidate", metrics.on_invalidate)
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
@@ -0,0 +1,383 @@
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Phases timed inside a request besides the database, in Server-Timing order
+PHASES = ("analyzer", "serialization")
+
+# Upper bounds of the request histograms: seconds for timings, statements for query counts
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+# Route label of requests that matched no profiled route (404s, the API root)
+OTHER_ROUTE = "other"
+
+# Frames kept per sampled stack, innermost first
+MAX_STACK_DEPTH = 48
+
+class RequestTimings:
+    """Time spent in each phase of one request.
+
+    Sync endpoints and dependencies run in worker threads under a copy of the
+    request's context, so they all add to the same instance.
+    """
+    __slots__ = ("start", "route", "db", "queries", "phases", "_depth", "_endpoint_done", "threads", "samples")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.route: Optional[str] = None
+        self.db = 0.0
+        self.queries = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self._depth = dict.fromkeys(PHASES, 0)
+        self._endpoint_done: Optional[float] = None
+        # Threads running the endpoint and the stacks sampled from them, for slow-request profiles
+        self.threads: set = set()
+        self.samples: Optional[Counter] = None
+
+    def server_timing(self, total: float) -> str:
+        """Render a Server-Timing header value; durations are in milliseconds."""
+        metrics = [
+            f"total;dur={total * 1e3:.2f}",
+            f'db;dur={self.db * 1e3:.2f};desc="{self.queries} queries"',
+        ]
+        metrics.extend(f"{phase};dur={self.phases[phase] * 1e3:.2f}" for phase in PHASES)
+        return ", ".join(metrics)
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time spent in the block to `phase` of the current request, if any.
+
+    Nested blocks of the same phase count once, so profiled methods may call
+    each other freely.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings._depth[phase] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._depth[phase] -= 1
+        if not timings._depth[phase]:
+            timings.phases[phase] += time.perf_counter() - start
+
+def profiled(phase: str) -> Callable:
+    """Decorator form of timed() for sync functions."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(phase):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _current.get()
+    if timings is not None and conn.info.get("query_start"):
+        timings.db += time.perf_counter() - conn.info["query_start"].pop()
+        timings.queries += 1
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+def instrument_queries(engine: Engine) -> None:
+    """Count statements and their execution time against the current request.
+
+    For an AsyncEngine pass its sync_engine; SQLAlchemy runs the sync layer in
+    greenlets that share the awaiting task's context.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set, Prometheus style."""
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...], labels: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        # Callers hold the registry lock
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total!r}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class RequestMetrics:
+    """Per-route histograms of request wall, database, analyzer and serialization time."""
+
+    LABELS = ("method", "route")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duration = Histogram("http_request_duration_seconds", "Wall time of HTTP requests.", SECONDS_BUCKETS, self.LABELS)
+        self.db = Histogram("http_request_db_seconds", "Time spent executing SQL per request.", SECONDS_BUCKETS, self.LABELS)
+        self.queries = Histogram("http_request_db_queries", "SQL statements executed per request.", QUERY_BUCKETS, self.LABELS)
+        self.phases = {
+            phase: Histogram(f"http_request_{phase}_seconds", f"Time spent in {phase} per request.", SECONDS_BUCKETS, self.LABELS)
+            for phase in PHASES
+        }
+
+    def observe(self, method: str, timings: RequestTimings, wall: float) -> None:
+        labels = (method, timings.route or OTHER_ROUTE)
+        with self._lock:
+            self.duration.observe(labels, wall)
+            self.db.observe(labels, timings.db)
+            self.queries.observe(labels, timings.queries)
+            for phase, histogram in self.phases.items():
+                histogram.observe(labels, timings.phases[phase])
+
+    def exposition(self) -> str:
+        """Render every histogram in the Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            lines = []
+            for histogram in (self.duration, self.db, self.queries, *self.phases.values()):
+                lines.extend(histogram.exposition())
+        return "\n".join(lines) + "\n"
+
+class SlowRequestSampler:
+    """Sampling profiler for requests slower than a threshold.
+
+    While requests are in flight a daemon thread snapshots the Python stacks of
+    the threads running their endpoints every `interval` seconds. Requests that
+    finish under the threshold discard their samples; slower ones log their
+    most frequent stacks and keep them for /internal/profiles/slow. Async
+    endpoints share the event loop thread, so their samples can include
+    frames of concurrent requests.
+    """
+
+    def __init__(self, threshold: float, interval: float, keep: int = 20, top: int = 15):
+        self.threshold = threshold
+        self.interval = interval
+        self.top = top
+        self._lock = threading.Lock()
+        self._active: set = set()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.recent: deque = deque(maxlen=keep)
+        self.sampled = 0
+        self.slow = 0
+
+    def start(self, timings: RequestTimings) -> None:
+        timings.samples = Counter()
+        with self._lock:
+            self._active.add(timings)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def finish(self, method: str, path: str, timings: RequestTimings, wall: float) -> None:
+        with self._lock:
+            self._active.discard(timings)
+            self.sampled += 1
+            if wall < self.threshold:
+                return
+            self.slow += 1
+            profile = {
+                "method": method,
+                "path": path,
+                "route": timings.route or OTHER_ROUTE,
+                "wall_ms": round(wall * 1e3, 2),
+                "db_ms": round(timings.db * 1e3, 2),
+                "queries": timings.queries,
+                **{f"{phase}_ms": round(seconds * 1e3, 2) for phase, seconds in timings.phases.items()},
+                "samples": sum(timings.samples.values()),
+                "stacks": [
+                    {"stack": stack, "samples": count} for stack, count in timings.samples.most_common(self.top)
+                ],
+            }
+            self.recent.append(profile)
+        logger.warning(
+            "Slow request %s %s: %.1f ms (db %.1f ms, %d queries); top sampled stacks:\n%s",
+            method, path, profile["wall_ms"], profile["db_ms"], profile["queries"],
+            "\n".join(f"  {entry['samples']:>5} {entry['stack']}" for entry in profile["stacks"]),
+        )
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            try:
+                self._sample()
+            except Exception:
+                # One bad sample must not end profiling for the life of the process
+                logger.exception("Slow request sampler failed to take a sample")
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        with self._lock:
+            if not self._active:
+                self._wake.clear()
+                return
+            for timings in self._active:
+                # Endpoint wrappers add and discard threads without this lock
+                for thread_id in tuple(timings.threads):
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        timings.samples[_fold(frame)] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold * 1e3,
+                "interval_ms": self.interval * 1e3,
+                "in_flight": len(self._active),
+                "sampled": self.sampled,
+                "slow": self.slow,
+                "recent": list(self.recent),
+            }
+
+def _fold(frame) -> str:
+    """Collapse a stack root-first as `file:function;...`, the flame graph input format."""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class ProfilingMiddleware:
+    """ASGI middleware that times each HTTP request.
+
+    Adds a Server-Timing header with total, db (with the statement count),
+    analyzer and serialization durations, and records the full request in
+    RequestMetrics once the last body chunk is sent. `total` in the header
+    stops at the response start, before the body of a streamed response.
+    """
+
+    def __init__(self, app, metrics: "RequestMetrics", sampler: Optional[SlowRequestSampler] = None):
+        self.app = app
+        self.metrics = metrics
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(time.perf_counter())
+        token = _current.set(timings)
+        if self.sampler is not None:
+            self.sampler.start(timings)
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timings._endpoint_done is not None:
+                    # FastAPI validates and encodes the endpoint's return value after it returns
+                    timings.phases["serialization"] += now - timings._endpoint_done
+                    timings._endpoint_done = None
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(now - timings.start).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            wall = time.perf_counter() - timings.start
+            _current.reset(token)
+            self.metrics.observe(scope["method"], timings, wall)
+            if self.sampler is not None:
+                self.sampler.finish(scope["method"], scope["path"], timings, wall)
+
+def _endpoint_timer(endpoint: Callable, path: str) -> Callable:
+    """Wrap an endpoint to label the request with its route and mark when it returned.
+
+    include_router() re-adds routes under their prefix with the already wrapped
+    endpoint, so the original is unwrapped first.
+    """
+    endpoint = getattr(endpoint, "_profiled_endpoint", endpoint)
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is not None:
+                timings.route = path
+                timings.threads.add(threading.get_ident())
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if timings is not None:
+                    timings._endpoint_done = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            thread_id = threading.get_ident()
+            if timings is not None:
+                timings.route = path
+                timings.threads.add(thread_id)
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if timings is not None:
+                    timings.threads.discard(thread_id)
+                    timings._endpoint_done = time.perf_counter()
+    wrapper._profiled_endpoint = endpoint
+    return wrapper
+
+class ProfiledRoute(APIRoute):
+    """APIRoute that reports its path template and response serialization time to ProfilingMiddleware."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _endpoint_timer(endpoint, path), **kwargs)
+
+request_metrics = RequestMetrics()
+slow_request_sampler = (
+    SlowRequestSampler(settings.SLOW_REQUEST_PROFILE_MS / 1e3, settings.SLOW_REQUEST_SAMPLE_INTERVAL_MS / 1e3)
+    if settings.SLOW_REQUEST_PROFILE_MS > 0 else None
+)
@@ -1,15 +1,101 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# min/max rounds pinned to the configured cost so verify_and_update flags
+# hashes made with any other cost, in either direction, for rehashing.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.SECURITY_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.SECURITY_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.SECURITY_BCRYPT_ROUNDS,
+)
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+class PasswordHasher:
+    """Dedicated, bounded executor for bcrypt work.
+
+    bcrypt releases the GIL, so a small thread pool uses every core. At most
+    max_pending calls may be queued or running; beyond that, submit() fails
+    fast with PasswordHasherBusy instead of tying up request workers.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., T], *args) -> "Future[T]":
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy()
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run_sync(self, fn: Callable[..., T], *args) -> T:
+        """Run fn on the hashing pool and block the calling thread until it finishes."""
+        return self.submit(fn, *args).result()
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run fn on the hashing pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if future is not None:
+                self.completed += 1
+        self._slots.release()
+
+_hash_workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+password_hasher = PasswordHasher(
+    workers=_hash_workers,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING or 2 * _hash_workers
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also return a new hash if the stored one uses an outdated cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
@@ -22,7 +108,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # Fractional iat so a user's revocation cutoff never catches a token issued right after it
+    to_encode.update({"exp": expire, "iat": time.time()})
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.JWT_SECRET_KEY, 
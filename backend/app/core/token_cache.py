@@ -0,0 +1,346 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+from .config import settings
+from ..models import RevokedToken, User
+
+# Rows inserted this long before the previous refresh are read again, so a
+# revocation whose transaction commits after a later-numbered one is not missed
+REFRESH_OVERLAP_SECONDS = 60.0
+
+# The filter is rebuilt from the table this often, dropping expired revocations
+FULL_RELOAD_SECONDS = 3600.0
+
+def token_digest(token: str) -> bytes:
+    """SHA-256 of an encoded token; the key of both the cache and the revocation filter."""
+    return hashlib.sha256(token.encode()).digest()
+
+def _epoch(moment: datetime) -> float:
+    # The database stores naive UTC datetimes
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified token payloads keyed by token digest.
+
+    Entries expire at the token's own `exp`, so a cache hit never outlives
+    the token. Callers must still check revocation before trusting a hit.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, digest: bytes) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, digest: bytes, payload: dict) -> None:
+        if self.max_size <= 0 or "exp" not in payload:
+            return
+        with self._lock:
+            self._entries[digest] = (float(payload["exp"]), payload)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, digest: bytes) -> None:
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+class BloomFilter:
+    """Fixed-size Bloom filter over SHA-256 digests.
+
+    The keys are already uniform hashes, so the probe positions come from
+    double hashing two 64-bit slices of the key instead of rehashing it.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, digest: bytes) -> None:
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+class TokenRevocations:
+    """Per-worker view of the revoked_tokens table.
+
+    Revoked token digests go into a Bloom filter; a filter hit is confirmed
+    against the table, so false positives cost one indexed query and never
+    reject a valid token. Per-user cutoffs (deactivation, password change)
+    are few and kept exactly. Revocations committed by this worker apply at
+    once; those from other workers are picked up by the next refresh, at
+    most refresh_interval seconds later. One caller at a time refreshes,
+    querying without holding the lock that checks take; the others carry on
+    with the current filter.
+    """
+
+    def __init__(self, refresh_interval: float, capacity: int, error_rate: float):
+        self.refresh_interval = refresh_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.filter = BloomFilter(capacity, error_rate)
+        self.user_cutoffs: Dict[int, float] = {}
+        # Filter hits the table confirmed, so a client retrying a revoked token costs no further queries
+        self.confirmed: set = set()
+        # Ids of rows applied within the refresh overlap, so re-read rows are not counted twice
+        self._recent: Dict[int, float] = {}
+        self.loaded = False
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+        self._refreshed_wall = 0.0
+        self._lock = threading.Lock()
+        # Held for a whole load or refresh, database round trip included
+        self._refresh_lock = threading.Lock()
+        # Rows apply()'d while a load's query runs, replayed into the rebuilt filter
+        self._pending: Optional[list] = None
+        self.confirmations = 0
+        self.false_positives = 0
+        self.rejected = 0
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def load(self, db: Session) -> int:
+        """Rebuild the filter from every unexpired revocation; returns how many were loaded."""
+        with self._refresh_lock:
+            return self._load(db)
+
+    def refresh(self, db: Session) -> int:
+        """Fold in revocations inserted since the previous refresh; returns how many rows were read.
+
+        Returns 0 at once while another caller refreshes, unless nothing is
+        loaded yet: an empty filter would let every revoked token through.
+        """
+        if not self.stale():
+            return 0
+        if not self._refresh_lock.acquire(blocking=not self.loaded):
+            return 0
+        try:
+            if not self.stale():
+                return 0
+            if not self.loaded or time.monotonic() - self._loaded_at >= FULL_RELOAD_SECONDS:
+                return self._load(db)
+            since = datetime.utcfromtimestamp(self._refreshed_wall - REFRESH_OVERLAP_SECONDS)
+            started = time.time()
+            rows = self._fetch(db, RevokedToken.created_at >= since)
+            with self._lock:
+                for row in rows:
+                    self._apply(*row)
+                horizon = _epoch(since)
+                self._recent = {row_id: created for row_id, created in self._recent.items() if created >= horizon}
+                self._refreshed_at = time.monotonic()
+                self._refreshed_wall = started
+            return len(rows)
+        finally:
+            self._refresh_lock.release()
+
+    def check(self, digest: bytes, user_id: int, issued_at: float) -> Optional[bool]:
+        """Answer from memory: True or False, or None when a filter hit must be confirmed by confirm()."""
+        if issued_at <= self.user_cutoffs.get(user_id, -math.inf):
+            self.rejected += 1
+            return True
+        if digest not in self.filter:
+            return False
+        if digest in self.confirmed:
+            self.rejected += 1
+            return True
+        return None
+
+    def confirm(self, db: Session, digest: bytes) -> bool:
+        """Look a filter hit up in the table."""
+        self.confirmations += 1
+        revoked = db.execute(
+            select(RevokedToken.id).where(RevokedToken.token_digest == digest.hex()).limit(1)
+        ).first() is not None
+        if revoked:
+            self.rejected += 1
+            with self._lock:
+                self.confirmed.add(digest)
+        else:
+            self.false_positives += 1
+        return revoked
+
+    def is_revoked(self, db: Session, digest: bytes, user_id: int, issued_at: float) -> bool:
+        """Refresh when stale, then check the filter; AsyncSession callers use db.run_sync(...)."""
+        if self.stale():
+            self.refresh(db)
+        revoked = self.check(digest, user_id, issued_at)
+        if revoked is None:
+            revoked = self.confirm(db, digest)
+        return revoked
+
+    @staticmethod
+    def revoke_token(db: Session, digest: bytes, expires_at: float) -> None:
+        """Revoke one token; takes effect in this worker when the session commits."""
+        db.add(RevokedToken(token_digest=digest.hex(), expires_at=datetime.utcfromtimestamp(expires_at)))
+
+    @staticmethod
+    def revoke_user(db: Session, user_id: int) -> None:
+        """Revoke every token issued to a user so far; takes effect in this worker when the session commits."""
+        now = datetime.utcnow()
+        db.add(RevokedToken(
+            user_id=user_id,
+            revoked_before=now,
+            expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        ))
+
+    @staticmethod
+    def prune(db: Session) -> int:
+        """Delete revocations whose tokens have expired anyway; returns how many."""
+        deleted = db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())).rowcount
+        db.commit()
+        return deleted
+
+    def apply(self, row_id: int, token_digest_hex: Optional[str], user_id: Optional[int],
+              revoked_before: Optional[datetime], created_at: datetime) -> None:
+        """Add one committed revoked_tokens row to the filter."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((row_id, token_digest_hex, user_id, revoked_before, created_at))
+            self._apply(row_id, token_digest_hex, user_id, revoked_before, created_at)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "revoked_tokens": self.filter.count,
+                "revoked_users": len(self.user_cutoffs),
+                "filter_bits": self.filter.size,
+                "filter_hashes": self.filter.hashes,
+                "filter_capacity": self.filter.capacity,
+                # Expected false-positive rate at the current fill
+                "filter_error_rate": (1 - math.exp(-self.filter.hashes * self.filter.count / self.filter.size))
+                ** self.filter.hashes,
+                "confirmations": self.confirmations,
+                "false_positives": self.false_positives,
+                "rejected": self.rejected,
+                "age_seconds": round(time.monotonic() - self._refreshed_at, 1) if self.loaded else None,
+            }
+
+    def _load(self, db: Session) -> int:
+        """Query every unexpired revocation, then swap in a filter built from them; caller holds _refresh_lock."""
+        started = time.time()
+        with self._lock:
+            self._pending = []
+        try:
+            rows = self._fetch(db, RevokedToken.expires_at > datetime.utcnow())
+            tokens = sum(1 for row in rows if row.token_digest is not None)
+            with self._lock:
+                # Leave room to grow until the next full reload
+                self.filter = BloomFilter(max(self.capacity, 2 * tokens), self.error_rate)
+                self.user_cutoffs = {}
+                self.confirmed = set()
+                self._recent = {}
+                # The query may not have seen revocations this worker committed meanwhile
+                for row in (*rows, *self._pending):
+                    self._apply(*row)
+                self.loaded = True
+                self._loaded_at = self._refreshed_at = time.monotonic()
+                self._refreshed_wall = started
+        finally:
+            with self._lock:
+                self._pending = None
+        return len(rows)
+
+    @staticmethod
+    def _fetch(db: Session, condition):
+        return db.execute(
+            select(
+                RevokedToken.id, RevokedToken.token_digest, RevokedToken.user_id,
+                RevokedToken.revoked_before, RevokedToken.created_at
+            ).where(condition)
+        ).all()
+
+    def _apply(self, row_id: int, token_digest_hex: Optional[str], user_id: Optional[int],
+               revoked_before: Optional[datetime], created_at: datetime) -> None:
+        if row_id in self._recent:
+            return
+        self._recent[row_id] = _epoch(created_at)
+        if token_digest_hex is not None:
+            self.filter.add(bytes.fromhex(token_digest_hex))
+        if user_id is not None and revoked_before is not None:
+            cutoff = _epoch(revoked_before)
+            if cutoff > self.user_cutoffs.get(user_id, -math.inf):
+                self.user_cutoffs[user_id] = cutoff
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+token_revocations = TokenRevocations(
+    settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+    settings.TOKEN_REVOCATION_CAPACITY,
+    settings.TOKEN_REVOCATION_ERROR_RATE,
+)
+
+# Deactivating a user through any session revokes their outstanding tokens
+@event.listens_for(Session, "before_flush")
+def _revoke_deactivated_users(session, flush_context, instances):
+    for obj in list(session.dirty):
+        if isinstance(obj, User) and obj.is_active is False and inspect(obj).attrs.is_active.history.deleted:
+            TokenRevocations.revoke_user(session, obj.id)
+
+# Committed revocations apply to this worker's filter straight away instead of
+# waiting for the next refresh
+@event.listens_for(Session, "after_flush")
+def _collect_revocations(session, flush_context):
+    revocations = session.info.setdefault("new_revocations", [])
+    for obj in session.new:
+        if isinstance(obj, RevokedToken):
+            revocations.append((obj.id, obj.token_digest, obj.user_id, obj.revoked_before, obj.created_at))
+
+@event.listens_for(Session, "after_commit")
+def _apply_revocations(session):
+    for revocation in session.info.pop("new_revocations", ()):
+        token_revocations.apply(*revocation)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_revocations(session):
+    session.info.pop("new_revocations", None)
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from typing import Dict, Optional, Tuple
+from .config import settings
+from ..models import User
+
+# Columns kept in the cache. hashed_password is left out; it loads on access
+# for the rare handler that needs it.
+CACHED_COLUMNS = ("id", "email", "full_name", "is_active", "is_admin", "created_at")
+
+class UserCache:
+    """In-process TTL + LRU cache of user rows keyed by user id.
+
+    Entries are plain column tuples, never ORM instances, so they can be shared
+    across threads and sessions. Invalidation is local to this worker; other
+    workers pick up changes once their entry's TTL expires.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[tuple]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: User) -> None:
+        if self.max_size <= 0:
+            return
+        values = tuple(getattr(user, column) for column in CACHED_COLUMNS)
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    @staticmethod
+    def to_user(values: tuple) -> User:
+        """Rebuild a detached User from cached values; merge(load=False) attaches it without a query."""
+        user = User(**dict(zip(CACHED_COLUMNS, values)))
+        make_transient_to_detached(user)
+        return user
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+# Any committed change to a User (profile edits, deactivation, admin flag
+# changes from scripts) drops its cache entry once the new row is visible.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
@@ -1,11 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .api.endpoints import assessments, auth
-from .database import engine, Base
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from .api.endpoints import adaptive, assessment_sessions, assessments, auth, jobs, learning_plans, resources
+from .api.endpoints import assessments_async, auth_async, internal
+from .database import engine, SessionLocal
 from .core.config import settings
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from .core.request_profiling import ProfilingMiddleware, request_metrics, slow_request_sampler
+from .core.security import PasswordHasherBusy
+from .migrations import check_schema
+from .services.adaptive_testing import adaptive_items
+from .services.assessment_sessions import assessment_sessions as assessment_session_store
+from .services.resource_catalog import resource_catalog
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -22,9 +28,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.RESPONSE_GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.RESPONSE_GZIP_MIN_SIZE)
+
+# Outermost, so Server-Timing totals include CORS and compression
+if settings.REQUEST_PROFILING:
+    app.add_middleware(ProfilingMiddleware, metrics=request_metrics, sampler=slow_request_sampler)
+
+@app.on_event("startup")
+def verify_schema() -> None:
+    """Fail fast if migrations have not been applied; schema changes go through `app.cli migrate`."""
+    if settings.SCHEMA_CHECK_ON_STARTUP:
+        check_schema(engine)
+
+@app.on_event("startup")
+def load_resource_catalog() -> None:
+    """Build the resource index unless a pre-fork parent already loaded it."""
+    if not resource_catalog.loaded:
+        db = SessionLocal()
+        try:
+            resource_catalog.load(db)
+        finally:
+            db.close()
+
+@app.on_event("startup")
+def load_adaptive_items() -> None:
+    """Build the adaptive testing item index so the first test does not pay for it."""
+    if not adaptive_items.loaded:
+        db = SessionLocal()
+        try:
+            adaptive_items.load(db)
+        finally:
+            db.close()
+
+@app.on_event("startup")
+def start_assessment_sessions() -> None:
+    """Replay answers journaled before a crash, then start the write-behind flush."""
+    db = SessionLocal()
+    try:
+        assessment_session_store.recover(db)
+    finally:
+        db.close()
+    assessment_session_store.start_flusher(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_assessment_sessions() -> None:
+    """Flush answers still held in memory."""
+    assessment_session_store.stop_flusher(SessionLocal)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed login/register load instead of queueing it behind a saturated hashing pool."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 # Include routers
-app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
-app.include_router(assessments.router, prefix=settings.API_V1_PREFIX, tags=["assessments"])
+if settings.DATABASE_ASYNC:
+    app.include_router(auth_async.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
+    app.include_router(assessments_async.router, prefix=settings.API_V1_PREFIX, tags=["assessments"])
+else:
+    app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
+    app.include_router(assessments.router, prefix=settings.API_V1_PREFIX, tags=["assessments"])
+app.include_router(learning_plans.router, prefix=settings.API_V1_PREFIX, tags=["learning-plans"])
+app.include_router(resources.router, prefix=settings.API_V1_PREFIX, tags=["resources"])
+app.include_router(adaptive.router, prefix=settings.API_V1_PREFIX, tags=["adaptive-testing"])
+app.include_router(assessment_sessions.router, prefix=settings.API_V1_PREFIX, tags=["assessment-sessions"])
+app.include_router(jobs.router, prefix=settings.API_V1_PREFIX, tags=["jobs"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
 
 @app.get("/")
 async def root():
@@ -37,18 +110,47 @@ async def root():
             "auth": {
                 "login": f"{settings.API_V1_PREFIX}/auth/login",
                 "register": f"{settings.API_V1_PREFIX}/auth/register",
+                "logout": f"{settings.API_V1_PREFIX}/auth/logout",
                 "me": f"{settings.API_V1_PREFIX}/auth/me"
             },
             "assessments": {
                 "create": f"{settings.API_V1_PREFIX}/assessments/",
                 "get": f"{settings.API_V1_PREFIX}/assessments/{{assessment_id}}",
                 "student": f"{settings.API_V1_PREFIX}/students/{{student_id}}/assessments",
+                "progress": f"{settings.API_V1_PREFIX}/students/{{student_id}}/progress",
                 "subject": f"{settings.API_V1_PREFIX}/assessments/subject/{{subject}}",
+                "question_set": f"{settings.API_V1_PREFIX}/question-sets/{{subject}}/{{difficulty}}",
                 "analysis": {
                     "clusters": f"{settings.API_V1_PREFIX}/assessments/analysis/clusters",
                     "learning_styles": f"{settings.API_V1_PREFIX}/assessments/analysis/learning-styles",
                     "mastery_levels": f"{settings.API_V1_PREFIX}/assessments/analysis/mastery-levels"
                 }
+            },
+            "learning_plans": {
+                "get": f"{settings.API_V1_PREFIX}/learning-plans/{{plan_id}}",
+                "student": f"{settings.API_V1_PREFIX}/students/{{student_id}}/learning-plans",
+                "generate": f"{settings.API_V1_PREFIX}/students/{{student_id}}/learning-plans/generate"
+            },
+            "resources": {
+                "recommendations": f"{settings.API_V1_PREFIX}/resources/recommendations"
+            },
+            "adaptive_testing": {
+                "start": f"{settings.API_V1_PREFIX}/adaptive-sessions",
+                "get": f"{settings.API_V1_PREFIX}/adaptive-sessions/{{session_id}}",
+                "answer": f"{settings.API_V1_PREFIX}/adaptive-sessions/{{session_id}}/answers",
+                "finish": f"{settings.API_V1_PREFIX}/adaptive-sessions/{{session_id}}/finish"
+            },
+            "assessment_sessions": {
+                "start": f"{settings.API_V1_PREFIX}/assessment-sessions",
+                "get": f"{settings.API_V1_PREFIX}/assessment-sessions/{{session_id}}",
+                "student": f"{settings.API_V1_PREFIX}/students/{{student_id}}/assessment-sessions",
+                "answer": f"{settings.API_V1_PREFIX}/assessment-sessions/{{session_id}}/answers",
+                "finish": f"{settings.API_V1_PREFIX}/assessment-sessions/{{session_id}}/finish"
+            },
+            "jobs": {
+                "enqueue": f"{settings.API_V1_PREFIX}/jobs",
+                "get": f"{settings.API_V1_PREFIX}/jobs/{{job_id}}",
+                "cancel": f"{settings.API_V1_PREFIX}/jobs/{{job_id}}/cancel"
             }
         }
     } 
\ No newline at end of file
@@ -0,0 +1,44 @@
+import os
+from typing import Optional, Tuple
+from sqlalchemy.engine import Engine
+from .core.config import settings
+
+# alembic.ini lives next to the app package, in backend/
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+def alembic_config(url: Optional[str] = None):
+    """Alembic config for this project, optionally pointed at a different database."""
+    # Imported here so workers never pay for Alembic unless they migrate or check
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    config.set_main_option("sqlalchemy.url", (url or settings.DATABASE_URL).replace("%", "%%"))
+    # Leave the host application's logging configuration alone
+    config.attributes["configure_logger"] = False
+    return config
+
+def upgrade(url: Optional[str] = None, revision: str = "head") -> None:
+    """Apply migrations up to revision."""
+    from alembic import command
+
+    command.upgrade(alembic_config(url), revision)
+
+def schema_revisions(engine: Engine) -> Tuple[Optional[str], Optional[str]]:
+    """Return (current, head) revisions; current is None for an unmigrated database."""
+    from alembic.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    return current, head
+
+def check_schema(engine: Engine) -> None:
+    """Raise RuntimeError unless the database is migrated to the head revision."""
+    current, head = schema_revisions(engine)
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current or '<none>'}, expected {head}; "
+            f"run `python -m app.cli migrate` (or `alembic upgrade head`) first"
+        )
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, JSON, Enum, UniqueConstraint, Boolean, Index
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import relationship, selectinload, raiseload
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
@@ -24,6 +25,13 @@ class MasteryLevel(str, enum.Enum):
     PROFICIENT = "proficient"
     ADVANCED = "advanced"
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
 class ResourceType(str, enum.Enum):
     VIDEO = "video"
     WORKSHEET = "worksheet"
@@ -31,20 +39,57 @@ class ResourceType(str, enum.Enum):
     READING = "reading"
     PRACTICE = "practice"
 
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, unique=True, index=True, nullable=False)
+    hashed_password = Column(String, nullable=False)
+    full_name = Column(String)
+    is_active = Column(Boolean, default=True)
+    is_admin = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    students = relationship("Student", back_populates="user")
+
+class RevokedToken(Base):
+    """Access-token revocations, mirrored by each worker's revocation filter.
+
+    A row revokes either one token (token_digest, the hex SHA-256 of the
+    encoded JWT) or every token of user_id issued at or before
+    revoked_before. Rows are dead once expires_at passes.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_digest = Column(String(64), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    revoked_before = Column(DateTime)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
 class Student(Base):
     __tablename__ = "students"
 
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     name = Column(String, index=True)
     grade = Column(Integer)
     age = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    user = relationship("User", back_populates="students")
     assessments = relationship("Assessment", back_populates="student")
     learning_plans = relationship("LearningPlan", back_populates="student")
 
 class Assessment(Base):
     __tablename__ = "assessments"
+    __table_args__ = (
+        # Per-student listings, keyset-paginated on (completed_date, id)
+        Index("ix_assessments_student_id_completed_date", "student_id", "completed_date", "id"),
+        # Per-subject listings joined to the owning student
+        Index("ix_assessments_subject_student_id", "subject", "student_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"))
@@ -54,29 +99,189 @@ class Assessment(Base):
     completed_date = Column(DateTime, default=datetime.utcnow)
     skill_breakdown = Column(JSON)
     recommendations = Column(JSON)
+    learning_style = Column(String)
+    mastery_level = Column(Enum(MasteryLevel))
     
     student = relationship("Student", back_populates="assessments")
-    questions = relationship("Question", back_populates="assessment")
+    responses = relationship("AssessmentResponse", back_populates="assessment", order_by="AssessmentResponse.position")
 
-class Question(Base):
-    __tablename__ = "questions"
+class AssessmentRollup(Base):
+    """Assessment counts per (subject, learning style, mastery level, grade).
+
+    Maintained by create_assessment in the same transaction as the assessment
+    insert so the analytics endpoints never scan the assessments table.
+    Students without a grade are counted under grade -1: NULLs never
+    conflict in the unique key, so the upsert would add a row each time.
+    """
+    __tablename__ = "assessment_rollups"
+    __table_args__ = (
+        UniqueConstraint("subject", "learning_style", "mastery_level", "grade",
+                         name="uq_assessment_rollups_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    subject = Column(Enum(Subject), nullable=False)
+    learning_style = Column(String, nullable=False)
+    mastery_level = Column(Enum(MasteryLevel), nullable=False)
+    grade = Column(Integer, nullable=False)
+    assessment_count = Column(Integer, nullable=False, default=0)
+
+class StudentProgress(Base):
+    """Per-student, per-subject score series in daily buckets.
+
+    Maintained incrementally as assessments are created; ewma_score is the
+    exponentially weighted mean of every score in the series up to the end
+    of the bucket.
+    """
+    __tablename__ = "student_progress"
+    __table_args__ = (
+        UniqueConstraint("student_id", "subject", "bucket_date", name="uq_student_progress_key"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    subject = Column(Enum(Subject), nullable=False)
+    bucket_date = Column(Date, nullable=False)
+    assessment_count = Column(Integer, nullable=False, default=0)
+    mean_score = Column(Float, nullable=False)
+    ewma_score = Column(Float, nullable=False)
+    last_mastery_level = Column(Enum(MasteryLevel))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class StudentClusterModel(Base):
+    """Persisted mini-batch k-means state for one cluster count.
+
+    Centroids live in the fixed skill feature space; last_assessment_id is the
+    watermark of assessments already folded into the model. id_gaps lists
+    [first_id, last_id, noticed_at] ranges below it that were not yet
+    committed when the watermark passed them; see StudentClusterer.update.
+    """
+    __tablename__ = "student_cluster_models"
+
+    id = Column(Integer, primary_key=True, index=True)
+    n_clusters = Column(Integer, unique=True, nullable=False)
+    features = Column(JSON)
+    centroids = Column(JSON)
+    counts = Column(JSON)
+    last_assessment_id = Column(Integer, default=0)
+    id_gaps = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class StudentCluster(Base):
+    """Precomputed cluster assignment of a student's latest assessment."""
+    __tablename__ = "student_clusters"
+    __table_args__ = (
+        Index("ix_student_clusters_n_clusters_student_id", "n_clusters", "student_id"),
+    )
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    n_clusters = Column(Integer, primary_key=True)
+    cluster_id = Column(Integer, nullable=False)
     assessment_id = Column(Integer, ForeignKey("assessments.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class QuestionBankItem(Base):
+    """One distinct question, shared by every assessment that asks it.
+
+    content_hash is the SHA-256 of the subject and question fields (see
+    services.question_bank.content_hash), so a question submitted again by
+    another student resolves to the existing row instead of a new copy.
+    """
+    __tablename__ = "question_bank"
+    __table_args__ = (
+        # Question sets are served per (subject, difficulty) in id order
+        Index("ix_question_bank_subject_difficulty_id", "subject", "difficulty", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+    subject = Column(Enum(Subject), nullable=False)
     text = Column(String)
     options = Column(JSON)
     correct_answer = Column(Integer)
     explanation = Column(String)
     difficulty = Column(Enum(Difficulty))
     skill_category = Column(String)
-    
-    assessment = relationship("Assessment", back_populates="questions")
+    # 2PL item response parameters on the ability (logit) scale; NULL until calibrated
+    irt_difficulty = Column(Float)
+    irt_discrimination = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class AssessmentResponse(Base):
+    """A student's answer to one bank question, at its position within the assessment."""
+    __tablename__ = "assessment_responses"
+
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    question_id = Column(Integer, ForeignKey("question_bank.id"), nullable=False, index=True)
+    chosen_option = Column(Integer)
+    is_correct = Column(Boolean)
+
+    assessment = relationship("Assessment", back_populates="responses")
+    question = relationship("QuestionBankItem")
+
+    # Question fields read through the bank item, so a response serializes
+    # like the per-assessment question rows it replaces
+    text = association_proxy("question", "text")
+    options = association_proxy("question", "options")
+    correct_answer = association_proxy("question", "correct_answer")
+    explanation = association_proxy("question", "explanation")
+    difficulty = association_proxy("question", "difficulty")
+    skill_category = association_proxy("question", "skill_category")
+
+class AssessmentSession(Base):
+    """An assessment in progress, resumable until expires_at.
+
+    Held in memory by services.assessment_sessions while active; answers
+    reach this row in batches from its write-behind flush. answers holds the
+    chosen option per position of question_ids, NULL while unanswered.
+    """
+    __tablename__ = "assessment_sessions"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
+    subject = Column(Enum(Subject), nullable=False)
+    question_ids = Column(JSON, nullable=False)
+    answers = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class Job(Base):
+    """A queued background job, run by `app.cli run-jobs` outside the request workers.
+
+    The runner claims QUEUED rows by switching them to RUNNING and keeps
+    heartbeat_at fresh while they run; the job itself writes progress (0-1)
+    and its outcome. Cancelling a running job sets cancel_requested, which
+    the job notices at its next progress report.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # The runner claims the oldest queued jobs of each type
+        Index("ix_jobs_status_job_type_id", "status", "job_type", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(64), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    params = Column(JSON, nullable=False)
+    result = Column(JSON)
+    error = Column(String)
+    progress = Column(Float, nullable=False, default=0.0)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
 
 class LearningPlan(Base):
     __tablename__ = "learning_plans"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     target_date = Column(DateTime)
     
@@ -89,7 +294,7 @@ class SubjectPlan(Base):
     __tablename__ = "subject_plans"
 
     id = Column(Integer, primary_key=True, index=True)
-    learning_plan_id = Column(Integer, ForeignKey("learning_plans.id"))
+    learning_plan_id = Column(Integer, ForeignKey("learning_plans.id"), index=True)
     subject = Column(Enum(Subject))
     progress = Column(Float)
     
@@ -101,7 +306,7 @@ class FocusArea(Base):
     __tablename__ = "focus_areas"
 
     id = Column(Integer, primary_key=True, index=True)
-    subject_plan_id = Column(Integer, ForeignKey("subject_plans.id"))
+    subject_plan_id = Column(Integer, ForeignKey("subject_plans.id"), index=True)
     name = Column(String)
     description = Column(String)
     mastery_level = Column(Enum(MasteryLevel))
@@ -113,7 +318,7 @@ class LearningActivity(Base):
     __tablename__ = "learning_activities"
 
     id = Column(Integer, primary_key=True, index=True)
-    focus_area_id = Column(Integer, ForeignKey("focus_areas.id"))
+    focus_area_id = Column(Integer, ForeignKey("focus_areas.id"), index=True)
     title = Column(String)
     description = Column(String)
     duration = Column(Integer)  # in seconds
@@ -127,7 +332,7 @@ class WeeklyGoal(Base):
     __tablename__ = "weekly_goals"
 
     id = Column(Integer, primary_key=True, index=True)
-    subject_plan_id = Column(Integer, ForeignKey("subject_plans.id"))
+    subject_plan_id = Column(Integer, ForeignKey("subject_plans.id"), index=True)
     description = Column(String)
     is_completed = Column(Integer, default=0)
     target_date = Column(DateTime)
@@ -138,7 +343,7 @@ class LearningGoal(Base):
     __tablename__ = "learning_goals"
 
     id = Column(Integer, primary_key=True, index=True)
-    learning_plan_id = Column(Integer, ForeignKey("learning_plans.id"))
+    learning_plan_id = Column(Integer, ForeignKey("learning_plans.id"), index=True)
     description = Column(String)
     target_date = Column(DateTime)
     progress = Column(Float)
@@ -150,7 +355,7 @@ class Milestone(Base):
     __tablename__ = "milestones"
 
     id = Column(Integer, primary_key=True, index=True)
-    learning_goal_id = Column(Integer, ForeignKey("learning_goals.id"))
+    learning_goal_id = Column(Integer, ForeignKey("learning_goals.id"), index=True)
     description = Column(String)
     is_completed = Column(Integer, default=0)
     target_date = Column(DateTime)
@@ -158,15 +363,35 @@ class Milestone(Base):
     learning_goal = relationship("LearningGoal", back_populates="milestones")
 
 class LearningResource(Base):
+    """A resource attached to a learning plan, or a catalog entry when learning_plan_id is NULL."""
     __tablename__ = "learning_resources"
+    __table_args__ = (
+        Index("ix_learning_resources_catalog", "subject", "difficulty", "skill_category", "type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    learning_plan_id = Column(Integer, ForeignKey("learning_plans.id"))
+    learning_plan_id = Column(Integer, ForeignKey("learning_plans.id"), index=True)
     title = Column(String)
     description = Column(String)
     type = Column(Enum(ResourceType))
     url = Column(String)
     subject = Column(Enum(Subject))
     difficulty = Column(Enum(Difficulty))
+    skill_category = Column(String)
     
-    learning_plan = relationship("LearningPlan", back_populates="resources") 
\ No newline at end of file
+    learning_plan = relationship("LearningPlan", back_populates="resources") 
+
+# Loader presets matching the nested response schemas. Each relationship level
+# is fetched with one SELECT ... IN query, so serializing a response never
+# lazy-loads per parent row.
+ASSESSMENT_LOAD_OPTIONS = (
+    selectinload(Assessment.responses).joinedload(AssessmentResponse.question, innerjoin=True),
+)
+
+LEARNING_PLAN_LOAD_OPTIONS = (
+    selectinload(LearningPlan.subject_plans).selectinload(SubjectPlan.focus_areas).selectinload(FocusArea.activities),
+    selectinload(LearningPlan.subject_plans).selectinload(SubjectPlan.weekly_goals),
+    selectinload(LearningPlan.goals).selectinload(LearningGoal.milestones),
+    selectinload(LearningPlan.resources),
+    raiseload("*"),
+)
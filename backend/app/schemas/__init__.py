@@ -0,0 +1,355 @@
+from pydantic import AliasChoices, BaseModel, Field, model_validator
+from typing import Any, List, Optional, Dict
+from datetime import date, datetime
+from ..models import Subject, Difficulty, JobStatus, MasteryLevel, ResourceType
+
+class StudentBase(BaseModel):
+    name: str
+    grade: int
+    age: int
+
+class StudentCreate(StudentBase):
+    pass
+
+class Student(StudentBase):
+    id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class QuestionBase(BaseModel):
+    text: str
+    options: List[str]
+    correct_answer: int
+    explanation: str
+    difficulty: Difficulty
+    skill_category: str
+
+class QuestionCreate(QuestionBase):
+    # Index into options the student picked; None when not recorded
+    chosen_option: Optional[int] = None
+
+class Question(QuestionBase):
+    # The shared question bank id; the same question has the same id in every assessment
+    id: int = Field(validation_alias=AliasChoices("question_id", "id"))
+    assessment_id: int
+    chosen_option: Optional[int] = None
+    is_correct: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+
+class QuestionBankItem(QuestionBase):
+    id: int
+    subject: Subject
+
+    class Config:
+        from_attributes = True
+
+class AssessmentBase(BaseModel):
+    subject: Subject
+    score: int
+    total_questions: int
+    skill_breakdown: Dict[str, int]
+    recommendations: List[str]
+
+class AssessmentCreate(AssessmentBase):
+    student_id: int
+    questions: List[QuestionCreate]
+
+class Assessment(AssessmentBase):
+    id: int
+    student_id: int
+    completed_date: datetime
+    questions: List[Question] = Field(validation_alias=AliasChoices("questions", "responses"))
+
+    class Config:
+        from_attributes = True
+
+class BulkAssessmentItemResult(BaseModel):
+    index: int
+    status: str  # "created" or "error"
+    assessment_id: Optional[int] = None
+    detail: Optional[str] = None
+    # HTTP status the item would have had on its own: 404, 422 or 503 for errors
+    status_code: int = 201
+
+class BulkAssessmentResult(BaseModel):
+    created: int
+    failed: int
+    items: List[BulkAssessmentItemResult]
+
+class AdaptiveSessionCreate(BaseModel):
+    student_id: int
+    subject: Subject
+    # Restrict the test to one skill; None draws from the whole subject
+    skill_category: Optional[str] = None
+    max_items: Optional[int] = Field(None, ge=1, le=100)
+
+class AdaptiveAnswer(BaseModel):
+    question_id: int
+    chosen_option: int
+
+class AdaptiveQuestion(BaseModel):
+    id: int
+    text: str
+    options: List[str]
+    difficulty: Difficulty
+    skill_category: str
+
+class AdaptiveSessionState(BaseModel):
+    session_id: str
+    student_id: int
+    subject: Subject
+    skill_category: Optional[str] = None
+    items_answered: int
+    correct: int
+    theta: float
+    standard_error: float
+    finished: bool
+    # The next question; None once the test is finished
+    question: Optional[AdaptiveQuestion] = None
+    # Whether the answer just submitted was correct
+    last_correct: Optional[bool] = None
+    # The assessment the test was recorded as, once the answer just submitted finished it
+    assessment_id: Optional[int] = None
+
+class AssessmentSessionCreate(BaseModel):
+    student_id: int
+    subject: Subject
+    # Bank question ids in the order asked, e.g. from a question set
+    question_ids: List[int] = Field(min_length=1, max_length=200)
+
+class AssessmentSessionAnswer(BaseModel):
+    # Index into the session's question_ids
+    position: int = Field(ge=0)
+    chosen_option: int = Field(ge=0)
+
+class AssessmentSessionAnswers(BaseModel):
+    answers: List[AssessmentSessionAnswer] = Field(min_length=1, max_length=200)
+
+class AssessmentSessionState(BaseModel):
+    session_id: str
+    student_id: int
+    subject: Subject
+    question_ids: List[int]
+    # Chosen option per position; None while unanswered
+    answers: List[Optional[int]]
+    answered: int
+    correct: int
+    expires_at: datetime
+
+class JobCreate(BaseModel):
+    job_type: str
+    # Validated against the job type's parameter model
+    params: Dict[str, Any] = {}
+
+class Job(BaseModel):
+    id: int
+    job_type: str
+    status: JobStatus
+    params: Dict[str, Any]
+    # Share of the work done, 0-1
+    progress: float
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class UpdateClustersJob(BaseModel):
+    n_clusters: int = Field(3, ge=2, le=20)
+    # Refresh every student's assignment against the updated centroids
+    reassign: bool = True
+
+class RegeneratePlansJob(BaseModel):
+    chunk_size: int = Field(500, ge=1, le=10000)
+
+class RescoreAssessmentsJob(BaseModel):
+    # None re-scores every subject
+    subject: Optional[Subject] = None
+    batch_size: int = Field(1000, ge=1, le=10000)
+
+class ClusterCohortsJob(BaseModel):
+    # Split each subject's cohort further by student grade
+    by_grade: bool = False
+    # None falls back to the COHORT_CLUSTER_* settings
+    min_clusters: Optional[int] = Field(None, ge=2, le=20)
+    max_clusters: Optional[int] = Field(None, ge=2, le=20)
+    sample_size: Optional[int] = Field(None, ge=100, le=20000)
+    time_budget_seconds: Optional[float] = Field(None, gt=0, le=3600)
+    workers: Optional[int] = Field(None, ge=0, le=64)
+
+    @model_validator(mode="after")
+    def check_cluster_range(self) -> "ClusterCohortsJob":
+        if self.min_clusters is not None and self.max_clusters is not None and self.min_clusters > self.max_clusters:
+            raise ValueError("min_clusters must not exceed max_clusters")
+        return self
+
+class ProgressPoint(BaseModel):
+    bucket_date: date
+    assessment_count: int
+    mean_score: float
+    ewma_score: float
+    last_mastery_level: Optional[MasteryLevel] = None
+
+class SubjectProgress(BaseModel):
+    subject: Subject
+    points: List[ProgressPoint]
+
+class StudentProgress(BaseModel):
+    student_id: int
+    period: str
+    subjects: List[SubjectProgress]
+
+class LearningActivityBase(BaseModel):
+    title: str
+    description: str
+    duration: int
+    difficulty: Difficulty
+    resource_type: ResourceType
+    url: Optional[str] = None
+
+class LearningActivityCreate(LearningActivityBase):
+    pass
+
+class LearningActivity(LearningActivityBase):
+    id: int
+    focus_area_id: int
+
+    class Config:
+        from_attributes = True
+
+class FocusAreaBase(BaseModel):
+    name: str
+    description: str
+    mastery_level: MasteryLevel
+    activities: List[LearningActivityCreate]
+
+class FocusAreaCreate(FocusAreaBase):
+    pass
+
+class FocusArea(FocusAreaBase):
+    id: int
+    subject_plan_id: int
+    activities: List[LearningActivity]
+
+    class Config:
+        from_attributes = True
+
+class WeeklyGoalBase(BaseModel):
+    description: str
+    target_date: datetime
+    is_completed: bool = False
+
+class WeeklyGoalCreate(WeeklyGoalBase):
+    pass
+
+class WeeklyGoal(WeeklyGoalBase):
+    id: int
+    subject_plan_id: int
+
+    class Config:
+        from_attributes = True
+
+class SubjectPlanBase(BaseModel):
+    subject: Subject
+    progress: float
+    focus_areas: List[FocusAreaCreate]
+    weekly_goals: List[WeeklyGoalCreate]
+
+class SubjectPlanCreate(SubjectPlanBase):
+    pass
+
+class SubjectPlan(SubjectPlanBase):
+    id: int
+    learning_plan_id: int
+    focus_areas: List[FocusArea]
+    weekly_goals: List[WeeklyGoal]
+
+    class Config:
+        from_attributes = True
+
+class MilestoneBase(BaseModel):
+    description: str
+    target_date: datetime
+    is_completed: bool = False
+
+class MilestoneCreate(MilestoneBase):
+    pass
+
+class Milestone(MilestoneBase):
+    id: int
+    learning_goal_id: int
+
+    class Config:
+        from_attributes = True
+
+class LearningGoalBase(BaseModel):
+    description: str
+    target_date: datetime
+    progress: float
+    milestones: List[MilestoneCreate]
+
+class LearningGoalCreate(LearningGoalBase):
+    pass
+
+class LearningGoal(LearningGoalBase):
+    id: int
+    learning_plan_id: int
+    milestones: List[Milestone]
+
+    class Config:
+        from_attributes = True
+
+class LearningResourceBase(BaseModel):
+    title: str
+    description: str
+    type: ResourceType
+    url: str
+    subject: Subject
+    difficulty: Difficulty
+    skill_category: Optional[str] = None
+
+class LearningResourceCreate(LearningResourceBase):
+    pass
+
+class LearningResource(LearningResourceBase):
+    id: int
+    learning_plan_id: int
+
+    class Config:
+        from_attributes = True
+
+class CatalogResource(LearningResourceBase):
+    id: int
+    skill_category: str
+
+    class Config:
+        from_attributes = True
+
+class LearningPlanBase(BaseModel):
+    target_date: datetime
+    subjects: List[SubjectPlanCreate]
+    goals: List[LearningGoalCreate]
+    resources: List[LearningResourceCreate]
+
+class LearningPlanCreate(LearningPlanBase):
+    student_id: int
+
+class LearningPlan(LearningPlanBase):
+    id: int
+    student_id: int
+    created_at: datetime
+    subjects: List[SubjectPlan] = Field(validation_alias=AliasChoices("subjects", "subject_plans"))
+    goals: List[LearningGoal]
+    resources: List[LearningResource]
+
+    class Config:
+        from_attributes = True 
\ No newline at end of file
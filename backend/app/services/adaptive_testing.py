@@ -0,0 +1,488 @@
+import bisect
+import math
+import secrets
+import threading
+import time
+import numpy as np
+from array import array
+from collections import OrderedDict
+from sqlalchemy import Integer, cast, func, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from ..core.config import settings
+from ..models import AssessmentResponse, Difficulty, QuestionBankItem, Subject
+from ..schemas import BulkAssessmentItemResult
+from .assessment_ingest import AssessmentIngester
+from .question_bank import CONTENT_FIELDS
+
+# Item location on the ability (logit) scale for bank items never calibrated
+DIFFICULTY_LOCATIONS = {Difficulty.BEGINNER: -1.0, Difficulty.INTERMEDIATE: 0.0, Difficulty.ADVANCED: 1.0}
+DEFAULT_DISCRIMINATION = 1.0
+
+# Quadrature grid of the ability estimate, with a standard normal prior
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+LOG_PRIOR = -0.5 * THETA_GRID ** 2
+
+# The index is rebuilt from the bank this often, picking up recalibrated items
+FULL_RELOAD_SECONDS = 3600.0
+
+class AdaptiveItem(NamedTuple):
+    id: int
+    subject: Subject
+    skill_category: str
+    difficulty: Difficulty
+    text: str
+    options: list
+    correct_answer: int
+    irt_difficulty: Optional[float]
+    irt_discrimination: Optional[float]
+
+ITEM_COLUMNS = [getattr(QuestionBankItem, field) for field in AdaptiveItem._fields]
+
+def item_parameters(item: AdaptiveItem) -> Tuple[float, float]:
+    """(discrimination, location) of an item, falling back to its difficulty label when uncalibrated."""
+    a = item.irt_discrimination if item.irt_discrimination is not None else DEFAULT_DISCRIMINATION
+    b = item.irt_difficulty if item.irt_difficulty is not None else DIFFICULTY_LOCATIONS.get(item.difficulty, 0.0)
+    return a, b
+
+def information(theta: float, a: float, b: float) -> float:
+    """Fisher information of a 2PL item at ability theta."""
+    p = 1.0 / (1.0 + math.exp(-a * (theta - b)))
+    return a * a * p * (1.0 - p)
+
+# x^2 * p(x) * (1 - p(x)) with p the logistic function peaks at x = PEAK_X
+PEAK_X = 2.3994
+PEAK_VALUE = 0.4392
+
+def information_bound(distance: float, max_discrimination: float) -> float:
+    """Most information any item with discrimination up to max_discrimination gives `distance` away from theta."""
+    if max_discrimination * distance <= PEAK_X:
+        return information(distance, max_discrimination, 0.0)
+    return PEAK_VALUE / (distance * distance)
+
+class ItemIndex:
+    """Immutable per-(subject, skill) indexes of bank items for maximum-information selection.
+
+    Every item is filed under (subject, skill_category) and (subject, None).
+    Each key's items are split into STRATA bands of similar discrimination,
+    and each band is a pair of parallel array('d') locations / array('q')
+    ids sorted by location. next_item() bisects every band at the ability
+    estimate and walks outwards, nearest location first, until no remaining
+    item of the band can beat the best found; bands whose best possible item
+    cannot are skipped. A selection costs O(STRATA log n) plus the handful of
+    candidates it compares.
+    """
+
+    STRATA = 8
+
+    def __init__(self, items: Iterable[AdaptiveItem] = ()):
+        self._items: Dict[int, AdaptiveItem] = {}
+        self._parameters: Dict[int, Tuple[float, float]] = {}
+        self._questions: Dict[int, Dict] = {}
+        keyed: Dict[Tuple[Subject, Optional[str]], List[Tuple[float, float, int]]] = {}
+        for item in items:
+            self._items[item.id] = item
+            self._parameters[item.id] = a, b = item_parameters(item)
+            # What a test taker sees: no answer, no explanation
+            self._questions[item.id] = {
+                "id": item.id, "text": item.text, "options": item.options,
+                "difficulty": item.difficulty, "skill_category": item.skill_category,
+            }
+            for key in ((item.subject, item.skill_category), (item.subject, None)):
+                keyed.setdefault(key, []).append((a, b, item.id))
+        # key -> [(max discrimination, locations, ids)], most discriminating band first
+        self._index: Dict[Tuple[Subject, Optional[str]], List[Tuple[float, array, array]]] = {}
+        for key, entries in keyed.items():
+            entries.sort(reverse=True)
+            size = -(-len(entries) // self.STRATA)
+            strata = []
+            for first in range(0, len(entries), size):
+                band = sorted(entries[first:first + size], key=lambda entry: entry[1])
+                strata.append((
+                    entries[first][0],
+                    array("d", (b for _, b, _ in band)),
+                    array("q", (item_id for _, _, item_id in band)),
+                ))
+            self._index[key] = strata
+        self.last_id = max(self._items, default=0)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, item_id: int) -> Optional[AdaptiveItem]:
+        return self._items.get(item_id)
+
+    def question(self, item_id: int) -> Dict:
+        return self._questions[item_id]
+
+    def parameters(self, item_id: int) -> Tuple[float, float]:
+        return self._parameters[item_id]
+
+    def has_items(self, subject: Subject, skill_category: Optional[str] = None) -> bool:
+        return (subject, skill_category) in self._index
+
+    def next_item(self, subject: Subject, skill_category: Optional[str], theta: float,
+                  exclude, window: int) -> Optional[int]:
+        """Id of the most informative item at theta not in exclude.
+
+        Exact unless a band needs more than `window` comparisons, in which
+        case the best of those stands in for the band.
+        """
+        strata = self._index.get((subject, skill_category))
+        if strata is None:
+            return None
+        best, best_information = None, -1.0
+        for max_discrimination, locations, ids in strata:
+            if best_information >= max_discrimination * max_discrimination / 4:
+                # Later bands discriminate less still
+                break
+            lo = bisect.bisect_left(locations, theta) - 1
+            hi = lo + 1
+            n = len(ids)
+            compared = 0
+            while compared < window and (lo >= 0 or hi < n):
+                if hi >= n or (lo >= 0 and theta - locations[lo] <= locations[hi] - theta):
+                    position, lo = lo, lo - 1
+                else:
+                    position, hi = hi, hi + 1
+                # Items are visited by increasing distance, so nothing further out can do better
+                if best_information >= information_bound(abs(theta - locations[position]), max_discrimination):
+                    break
+                item_id = ids[position]
+                if item_id in exclude:
+                    continue
+                compared += 1
+                a, b = self._parameters[item_id]
+                value = information(theta, a, b)
+                if value > best_information:
+                    best, best_information = item_id, value
+        return best
+
+    def merged(self, items: Iterable[AdaptiveItem]) -> "ItemIndex":
+        """A new index with items added or replaced by id."""
+        combined = dict(self._items)
+        combined.update((item.id, item) for item in items)
+        return ItemIndex(combined.values())
+
+class ItemBankIndex:
+    """Process-wide holder of the current ItemIndex.
+
+    Same refresh scheme as the resource catalog: readers take the `index`
+    snapshot without locking, refresh() folds in bank items past the highest
+    indexed id, and a full load every FULL_RELOAD_SECONDS picks up
+    parameters recalibrated by `app.cli calibrate-items`.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.index = ItemIndex()
+        self.loaded = False
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> int:
+        """Rebuild the index from every bank item; returns its size."""
+        with self._lock:
+            self.index = ItemIndex(self._fetch(db, after_id=0))
+            self.loaded = True
+            self._loaded_at = self._refreshed_at = time.monotonic()
+        return len(self.index)
+
+    def refresh(self, db: Session) -> int:
+        """Index bank items added since the last load or refresh; returns how many."""
+        with self._lock:
+            items = self._fetch(db, after_id=self.index.last_id)
+            if items:
+                self.index = self.index.merged(items)
+            self._refreshed_at = time.monotonic()
+        return len(items)
+
+    def current(self, db: Session) -> ItemIndex:
+        """The index, loading or refreshing first when it is missing or older than refresh_interval."""
+        now = time.monotonic()
+        if not self.loaded or now - self._loaded_at >= FULL_RELOAD_SECONDS:
+            self.load(db)
+        elif now - self._refreshed_at >= self.refresh_interval:
+            self.refresh(db)
+        return self.index
+
+    def stats(self) -> Dict:
+        return {
+            "items": len(self.index),
+            "keys": len(self.index._index),
+            "last_id": self.index.last_id,
+            "age_seconds": round(time.monotonic() - self._refreshed_at, 1) if self.loaded else None,
+        }
+
+    @staticmethod
+    def _fetch(db: Session, after_id: int) -> List[AdaptiveItem]:
+        rows = db.execute(
+            select(*ITEM_COLUMNS).where(
+                QuestionBankItem.id > after_id,
+                QuestionBankItem.skill_category.isnot(None)
+            ).order_by(QuestionBankItem.id)
+        )
+        return [AdaptiveItem(*row) for row in rows]
+
+class AdaptiveSession:
+    """One test in progress. Only touched under its own lock."""
+    __slots__ = (
+        "id", "user_id", "student_id", "subject", "skill_category", "max_items", "index",
+        "log_posterior", "theta", "standard_error", "administered", "responses", "current",
+        "finished", "submitting", "touched", "lock",
+    )
+
+    def __init__(self, session_id: str, user_id: int, student_id: int, subject: Subject,
+                 skill_category: Optional[str], max_items: int, index: ItemIndex):
+        self.id = session_id
+        self.user_id = user_id
+        self.student_id = student_id
+        self.subject = subject
+        self.skill_category = skill_category
+        self.max_items = max_items
+        # A test runs against one index snapshot, so refreshes never change an item mid-test
+        self.index = index
+        self.log_posterior = LOG_PRIOR.copy()
+        self.theta = 0.0
+        self.standard_error = 1.0
+        self.administered: set = set()
+        # (item id, chosen option, correct) in the order answered
+        self.responses: List[Tuple[int, int, bool]] = []
+        self.current: Optional[int] = None
+        self.finished = False
+        # Set while finish() submits the session, so it is submitted once
+        self.submitting = False
+        self.touched = time.monotonic()
+        self.lock = threading.Lock()
+
+    def state(self) -> Dict:
+        """The session as returned by the API; the current question when one is pending."""
+        return {
+            "session_id": self.id,
+            "student_id": self.student_id,
+            "subject": self.subject,
+            "skill_category": self.skill_category,
+            "items_answered": len(self.responses),
+            "correct": sum(1 for _, _, correct in self.responses if correct),
+            "theta": round(self.theta, 4),
+            "standard_error": round(self.standard_error, 4),
+            "finished": self.finished,
+            "question": None if self.current is None else self.index.question(self.current),
+        }
+
+class AdaptiveTester:
+    """Computerized adaptive tests over the question bank, with sessions held in memory.
+
+    Ability is the expected a posteriori estimate on THETA_GRID, updated in
+    place after each answer; the next item is the most informative one near
+    the estimate. A test stops after max_items answers, once the standard
+    error reaches target_se, or when the item pool runs out; finish() then
+    records it as an assessment. Sessions idle for session_ttl seconds are
+    dropped, and at most max_sessions are kept, so sessions are per worker
+    and a client must stick to one worker.
+    """
+
+    def __init__(self, max_items: int, target_se: float, window: int, session_ttl: float, max_sessions: int):
+        self.max_items = max_items
+        self.target_se = target_se
+        self.window = window
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, AdaptiveSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.started = 0
+        self.finished = 0
+        self.answers = 0
+        self.expired = 0
+
+    def start(self, index: ItemIndex, user_id: int, student_id: int, subject: Subject,
+              skill_category: Optional[str] = None, max_items: Optional[int] = None) -> Optional[AdaptiveSession]:
+        """Open a session and pick its first item; None when the store is full."""
+        session = AdaptiveSession(
+            secrets.token_urlsafe(16), user_id, student_id, subject, skill_category,
+            max_items or self.max_items, index
+        )
+        with self._lock:
+            self._expire(time.monotonic())
+            if len(self._sessions) >= self.max_sessions:
+                return None
+            self._sessions[session.id] = session
+            self.started += 1
+        with session.lock:
+            self._advance(session)
+        return session
+
+    def get(self, session_id: str, user_id: int) -> Optional[AdaptiveSession]:
+        """The caller's session, or None if it is unknown, expired or someone else's."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.user_id != user_id:
+                return None
+            now = time.monotonic()
+            if now - session.touched >= self.session_ttl:
+                del self._sessions[session_id]
+                self.expired += 1
+                return None
+            session.touched = now
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def answer(self, session: AdaptiveSession, question_id: int, chosen_option: int) -> Optional[bool]:
+        """Score an answer to the pending question and move on; None if question_id is not pending."""
+        with session.lock:
+            if session.finished or session.current != question_id:
+                return None
+            item = session.index.get(question_id)
+            correct = chosen_option == item.correct_answer
+            a, b = session.index.parameters(question_id)
+            z = a * (THETA_GRID - b)
+            # log P(correct) = -log(1 + e^-z), log P(wrong) = -log(1 + e^z)
+            session.log_posterior -= np.logaddexp(0.0, -z if correct else z)
+            weights = np.exp(session.log_posterior - session.log_posterior.max())
+            weights /= weights.sum()
+            session.theta = float(THETA_GRID @ weights)
+            session.standard_error = math.sqrt(float(((THETA_GRID - session.theta) ** 2) @ weights))
+            session.responses.append((question_id, chosen_option, correct))
+            session.current = None
+            self._advance(session)
+        with self._lock:
+            self.answers += 1
+        return correct
+
+    def finish(self, db: Session, session: AdaptiveSession, ingester: AssessmentIngester
+               ) -> Optional[BulkAssessmentItemResult]:
+        """Submit the answered items as an assessment through ingester and drop the session.
+
+        A test still running ends here. None if nothing was answered or the
+        session is being submitted already. A failed submission keeps the
+        session, so finishing can be retried.
+        """
+        with session.lock:
+            if session.submitting or not session.responses:
+                return None
+            session.submitting = True
+            if not session.finished:
+                session.current = None
+                self._advance(session, stop=True)
+        # A finished session takes no more answers, so its responses are read without the lock
+        try:
+            payload = self._assessment(db, session)
+            result = ingester.ingest_chunk(db, session.user_id, [payload], 0)[0]
+        finally:
+            with session.lock:
+                session.submitting = False
+        if result.status == "created":
+            self.discard(session.id)
+        return result
+
+    def state(self, session: AdaptiveSession) -> Dict:
+        with session.lock:
+            return session.state()
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def expire(self) -> int:
+        """Drop idle sessions; returns how many."""
+        with self._lock:
+            return self._expire(time.monotonic())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "started": self.started,
+                "finished": self.finished,
+                "answers": self.answers,
+                "expired": self.expired,
+            }
+
+    def _advance(self, session: AdaptiveSession, stop: bool = False) -> None:
+        if not stop and len(session.responses) < session.max_items and session.standard_error > self.target_se:
+            session.current = session.index.next_item(
+                session.subject, session.skill_category, session.theta, session.administered, self.window
+            )
+        if session.current is None:
+            session.finished = True
+            with self._lock:
+                self.finished += 1
+        else:
+            session.administered.add(session.current)
+
+    @staticmethod
+    def _assessment(db: Session, session: AdaptiveSession) -> Dict:
+        """An AssessmentCreate body for the answered items, scored 0-10 by share of correct answers."""
+        content = {
+            row[0]: dict(zip(CONTENT_FIELDS, row[1:]))
+            for row in db.execute(
+                select(QuestionBankItem.id, *(getattr(QuestionBankItem, field) for field in CONTENT_FIELDS))
+                .where(QuestionBankItem.id.in_({item_id for item_id, _, _ in session.responses}))
+            )
+        }
+        correct = sum(1 for _, _, is_correct in session.responses if is_correct)
+        return {
+            "student_id": session.student_id,
+            "subject": session.subject,
+            "score": round(10 * correct / len(session.responses)),
+            "total_questions": len(session.responses),
+            "skill_breakdown": {},
+            "recommendations": [],
+            "questions": [
+                {**content[item_id], "chosen_option": chosen_option}
+                for item_id, chosen_option, _ in session.responses
+            ],
+        }
+
+    def _expire(self, now: float) -> int:
+        expired = 0
+        # Sessions are kept in least recently used order
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.touched < self.session_ttl:
+                break
+            self._sessions.popitem(last=False)
+            expired += 1
+        self.expired += expired
+        return expired
+
+def calibrate_items(db: Session, min_responses: int) -> int:
+    """Re-estimate item locations from recorded answers; returns how many items were updated.
+
+    Uses the share of correct answers of every item with at least
+    min_responses scored responses. Under a standard normal ability
+    distribution the marginal probability of a correct answer to a 2PL item
+    is close to sigmoid(-a * b / sqrt(1 + pi * a^2 / 8)), which is inverted
+    here. Discriminations are left as they are. Commits.
+    """
+    correct = func.sum(cast(AssessmentResponse.is_correct, Integer))
+    answered = func.count()
+    rows = db.execute(
+        select(AssessmentResponse.question_id, answered, correct, QuestionBankItem.irt_discrimination)
+        .join(QuestionBankItem, QuestionBankItem.id == AssessmentResponse.question_id)
+        .where(AssessmentResponse.is_correct.isnot(None))
+        .group_by(AssessmentResponse.question_id, QuestionBankItem.irt_discrimination)
+        .having(answered >= min_responses)
+    ).all()
+    updates = []
+    for question_id, n, n_correct, a in rows:
+        a = a if a is not None else DEFAULT_DISCRIMINATION
+        # Add-half smoothing keeps all-correct and all-wrong items finite
+        p = (n_correct + 0.5) / (n + 1.0)
+        b = -math.log(p / (1.0 - p)) * math.sqrt(1.0 + math.pi * a * a / 8.0) / a
+        updates.append({"id": question_id, "irt_difficulty": round(b, 4)})
+    if updates:
+        db.execute(update(QuestionBankItem), updates)
+    db.commit()
+    return len(updates)
+
+adaptive_items = ItemBankIndex(settings.ADAPTIVE_ITEM_REFRESH_SECONDS)
+adaptive_tester = AdaptiveTester(
+    settings.ADAPTIVE_MAX_ITEMS,
+    settings.ADAPTIVE_TARGET_SE,
+    settings.ADAPTIVE_ITEM_WINDOW,
+    settings.ADAPTIVE_SESSION_TTL_SECONDS,
+    settings.ADAPTIVE_MAX_SESSIONS,
+)
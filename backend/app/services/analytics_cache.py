@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Dict, Hashable, Optional
+from ..models import AssessmentRollup, StudentClusterModel
+
+class VersionedResponseCache:
+    """LRU cache of encoded analytics responses keyed by (scope, params, data version).
+
+    Entries never need explicit invalidation: any committed write moves the
+    data version, so stale entries stop being addressed and age out.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
+
+def _rollup_version(db: Session) -> str:
+    """Total assessments counted in the rollup, plus its row count and max id.
+
+    The total moves in the same transaction as every assessment insert and
+    only grows, so each value names exactly one committed state; max(id)
+    would not, since ids are allocated before their transactions commit in
+    any order. A rollup rebuild re-inserts rows, which moves the max id on
+    PostgreSQL; SQLite reuses the ids of an emptied table, so there a rebuild
+    that keeps the total and row count keeps the version. The rollup is a
+    few hundred rows however many assessments there are.
+    """
+    total, rows, max_id = db.execute(select(
+        func.coalesce(func.sum(AssessmentRollup.assessment_count), 0),
+        func.count(),
+        func.coalesce(func.max(AssessmentRollup.id), 0)
+    )).one()
+    return f"{total}.{rows}.{max_id}"
+
+def distribution_version(db: Session) -> str:
+    """Watermark for the rollup-backed distributions."""
+    return _rollup_version(db)
+
+def cluster_version(db: Session, n_clusters: int) -> str:
+    """Watermark for precomputed cluster assignments.
+
+    New assessments are assigned in the transaction that counts them in the
+    rollup; mini-batch updates and full reassignments touch the model row.
+    """
+    model_updated_at = db.execute(
+        select(StudentClusterModel.updated_at).where(StudentClusterModel.n_clusters == n_clusters)
+    ).scalar()
+    updated = model_updated_at.isoformat() if model_updated_at else "none"
+    return f"{_rollup_version(db)}.{updated}"
+
+def make_etag(key: Hashable, version: str) -> str:
+    digest = hashlib.sha1(repr((key, version)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
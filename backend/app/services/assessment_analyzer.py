@@ -1,11 +1,35 @@
 import numpy as np
-from sklearn.cluster import KMeans
-from typing import List, Dict, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple, NamedTuple
+from ..core.request_profiling import profiled
 from ..models import Subject, Difficulty, MasteryLevel
 from ..schemas import AssessmentCreate, Question
+from .recommendation_rules import RuleSet, recommendation_rules
+
+class AssessmentAnalysis(NamedTuple):
+    skill_breakdown: Dict[str, int]
+    recommendations: List[str]
+    learning_style: str
+    mastery_level: MasteryLevel
 
 class AssessmentAnalyzer:
-    def __init__(self):
+    # Learning styles in tie-break order, each scored from the mean of two skills
+    LEARNING_STYLE_SKILLS = (
+        ("Visual", ("Viewing", "Visual Arts")),
+        ("Auditory", ("Listening", "Music")),
+        ("Kinesthetic", ("Drama", "Dance")),
+    )
+
+    # Lower score bounds for each mastery level above BEGINNER
+    MASTERY_THRESHOLDS = (4, 7, 9)
+    MASTERY_LEVELS = (
+        MasteryLevel.BEGINNER,
+        MasteryLevel.DEVELOPING,
+        MasteryLevel.PROFICIENT,
+        MasteryLevel.ADVANCED,
+    )
+
+    def __init__(self, rules: Optional[RuleSet] = None):
+        self.rules = rules if rules is not None else recommendation_rules
         self.skill_weights = {
             "Number Operations": 1.2,
             "Pattern and Function": 1.0,
@@ -30,13 +54,113 @@ class AssessmentAnalyzer:
             "Drama": 0.8,
             "Dance": 0.8
         }
+        self._skill_index = {skill: i for i, skill in enumerate(self.skill_weights)}
 
+    @profiled("analyzer")
     def analyze_assessment(self, assessment: AssessmentCreate) -> Tuple[Dict[str, int], List[str]]:
         """Analyze assessment results and generate skill breakdown and recommendations."""
         skill_breakdown = self._calculate_skill_breakdown(assessment.questions)
         recommendations = self._generate_recommendations(skill_breakdown, assessment.subject)
         return skill_breakdown, recommendations
 
+    @profiled("analyzer")
+    def analyze_many(self, assessments: List[AssessmentCreate]) -> List[AssessmentAnalysis]:
+        """Analyze a batch of assessments with grouped array reductions.
+
+        Produces the same skill breakdown, recommendations, learning style and
+        mastery level as the per-assessment methods, in input order.
+        """
+        if not assessments:
+            return []
+
+        skill_ids, offsets, skills, weights = self._encode_batch(assessments)
+        n_assessments = len(assessments)
+        n_skills = len(skills)
+
+        # One group per (assessment, skill) pair
+        assessment_idx = np.repeat(np.arange(n_assessments, dtype=np.int64), np.diff(offsets))
+        keys = assessment_idx * n_skills + skill_ids
+        group_keys, first_index, counts = np.unique(keys, return_index=True, return_counts=True)
+        group_assessment = group_keys // n_skills
+        group_skill = group_keys % n_skills
+
+        # Every question of a skill carries the same weight, so the per-question
+        # running total is looked up from a cumulative table. np.cumsum adds
+        # sequentially, which keeps the float result identical to the loop in
+        # _calculate_skill_breakdown before int() truncation.
+        running_totals = np.cumsum(
+            np.broadcast_to(weights[:, None], (n_skills, int(counts.max(initial=0)))), axis=1
+        )
+        totals = running_totals[group_skill, counts - 1]
+        group_scores = (totals / counts * 10).astype(np.int64)
+
+        # Restore first-appearance skill order within each assessment
+        order = np.lexsort((first_index, group_assessment))
+        group_assessment = group_assessment[order]
+        group_skill = group_skill[order]
+        group_scores = group_scores[order]
+        bounds = np.searchsorted(group_assessment, np.arange(n_assessments + 1)).tolist()
+
+        skill_matrix = np.zeros((n_assessments, n_skills), dtype=np.int64)
+        skill_matrix[group_assessment, group_skill] = group_scores
+        present = np.zeros((n_assessments, n_skills), dtype=bool)
+        present[group_assessment, group_skill] = True
+
+        learning_styles = self._predict_learning_styles(skill_matrix, skills)
+        recommendations = self.rules.evaluate(
+            [assessment.subject for assessment in assessments], skill_matrix, present, skills
+        )
+        scores = np.fromiter((a.score for a in assessments), dtype=np.int64, count=n_assessments)
+        mastery_idx = np.searchsorted(self.MASTERY_THRESHOLDS, scores, side="right").tolist()
+
+        skill_names = [skills[i] for i in group_skill.tolist()]
+        score_values = group_scores.tolist()
+        results = []
+        for i in range(n_assessments):
+            start, end = bounds[i], bounds[i + 1]
+            results.append(AssessmentAnalysis(
+                skill_breakdown=dict(zip(skill_names[start:end], score_values[start:end])),
+                recommendations=recommendations[i],
+                learning_style=learning_styles[i],
+                mastery_level=self.MASTERY_LEVELS[mastery_idx[i]]
+            ))
+
+        return results
+
+    def _encode_batch(self, assessments: List[AssessmentCreate]) -> Tuple[np.ndarray, np.ndarray, List[str], np.ndarray]:
+        """Flatten a batch into integer skill ids, per-skill weights and group offsets."""
+        skills = self._vocabulary(
+            question.skill_category for assessment in assessments for question in assessment.questions
+        )
+        skill_index = {skill: i for i, skill in enumerate(skills)}
+        # Unknown skills fall back to a weight of 1.0, as in the per-question path
+        weights = list(self.skill_weights.values()) + [1.0] * (len(skills) - len(self._skill_index))
+        skill_ids = []
+        offsets = [0]
+
+        for assessment in assessments:
+            skill_ids.extend(skill_index[question.skill_category] for question in assessment.questions)
+            offsets.append(len(skill_ids))
+
+        return (
+            np.asarray(skill_ids, dtype=np.int64),
+            np.asarray(offsets, dtype=np.int64),
+            skills,
+            np.asarray(weights, dtype=np.float64),
+        )
+
+    def _predict_learning_styles(self, skill_matrix: np.ndarray, skills: List[str]) -> List[str]:
+        """Predict learning styles for a batch from an (assessments x skills) score matrix."""
+        skill_index = {skill: i for i, skill in enumerate(skills)}
+        style_scores = np.column_stack([
+            skill_matrix[:, [skill_index[skill] for skill in style_skills]].mean(axis=1)
+            for _, style_skills in self.LEARNING_STYLE_SKILLS
+        ])
+
+        # argmax returns the first maximum, matching max() over the ordered dict
+        style_names = [style for style, _ in self.LEARNING_STYLE_SKILLS]
+        return [style_names[i] for i in style_scores.argmax(axis=1).tolist()]
+
     def _calculate_skill_breakdown(self, questions: List[Question]) -> Dict[str, int]:
         """Calculate skill breakdown from assessment questions."""
         skill_scores = {}
@@ -62,78 +186,78 @@ class AssessmentAnalyzer:
 
     def _generate_recommendations(self, skill_breakdown: Dict[str, int], subject: Subject) -> List[str]:
         """Generate personalized recommendations based on skill breakdown."""
-        recommendations = []
-        
-        # Overall performance recommendations
-        avg_score = np.mean(list(skill_breakdown.values()))
-        if avg_score < 5:
-            recommendations.append("Focus on strengthening fundamental concepts")
-            recommendations.append("Consider additional support in core areas")
-        elif avg_score < 7:
-            recommendations.append("Continue practicing to maintain current level")
-            recommendations.append("Challenge yourself with more advanced problems")
-        else:
-            recommendations.append("Excellent work! Keep up the good performance")
-            recommendations.append("Consider exploring advanced topics")
-        
-        # Subject-specific recommendations
-        subject_recommendations = self._get_subject_recommendations(subject, skill_breakdown)
-        recommendations.extend(subject_recommendations)
-        
-        # Skill-specific recommendations
-        for skill, score in skill_breakdown.items():
-            if score < 6:
-                recommendations.append(f"Focus on improving {skill} skills")
-                recommendations.append(f"Practice more {skill} exercises")
-        
-        return list(set(recommendations))  # Remove duplicates
+        return self.rules.evaluate_one(subject, skill_breakdown, self._vocabulary(skill_breakdown))
 
-    def _get_subject_recommendations(self, subject: Subject, skill_breakdown: Dict[str, int]) -> List[str]:
-        """Generate subject-specific recommendations."""
-        recommendations = []
-        
-        if subject == Subject.MATHEMATICS:
-            if "Number Operations" in skill_breakdown and skill_breakdown["Number Operations"] < 7:
-                recommendations.append("Practice basic arithmetic operations")
-            if "Pattern and Function" in skill_breakdown and skill_breakdown["Pattern and Function"] < 7:
-                recommendations.append("Work on identifying patterns and sequences")
-        
-        elif subject == Subject.ENGLISH:
-            if "Reading" in skill_breakdown and skill_breakdown["Reading"] < 7:
-                recommendations.append("Read more age-appropriate books")
-            if "Writing" in skill_breakdown and skill_breakdown["Writing"] < 7:
-                recommendations.append("Practice writing short stories and essays")
-        
-        elif subject == Subject.SCIENCE:
-            if "Living Things" in skill_breakdown and skill_breakdown["Living Things"] < 7:
-                recommendations.append("Study basic biology concepts")
-            if "Forces and Energy" in skill_breakdown and skill_breakdown["Forces and Energy"] < 7:
-                recommendations.append("Learn about basic physics principles")
-        
-        return recommendations
+    @profiled("analyzer")
+    def recommend_many(self, skill_breakdowns: List[Dict[str, int]], subjects: List[Subject]) -> List[List[str]]:
+        """Evaluate the recommendation rules over many skill breakdowns at once, e.g. to re-score stored assessments."""
+        skill_index = {skill: i for i, skill in enumerate(self._vocabulary(
+            skill for skill_breakdown in skill_breakdowns for skill in skill_breakdown
+        ))}
 
+        scores = np.zeros((len(skill_breakdowns), len(skill_index)), dtype=np.int64)
+        present = np.zeros(scores.shape, dtype=bool)
+        for row, skill_breakdown in enumerate(skill_breakdowns):
+            for skill, score in skill_breakdown.items():
+                scores[row, skill_index[skill]] = score
+                present[row, skill_index[skill]] = True
+        return self.rules.evaluate(subjects, scores, present, list(skill_index))
+
+    def _vocabulary(self, skills: Iterable[str]) -> List[str]:
+        """The skill table followed by any other skills sorted by name.
+
+        EVERY_SKILL rule messages follow vocabulary order, so unknown skills
+        must not be ordered by where they first appear in a batch.
+        """
+        return self.skill_features + sorted({skill for skill in skills if skill not in self._skill_index})
+
+    @property
+    def skill_features(self) -> List[str]:
+        """Fixed, ordered skill feature space used for clustering."""
+        return list(self._skill_index)
+
+    @profiled("analyzer")
+    def skill_feature_matrix(self, skill_breakdowns: List[Dict[str, int]]) -> np.ndarray:
+        """Project skill breakdowns onto the fixed skill feature space (missing skills score 0)."""
+        features = np.zeros((len(skill_breakdowns), len(self._skill_index)), dtype=np.float64)
+        for row, skill_breakdown in enumerate(skill_breakdowns):
+            for skill, score in skill_breakdown.items():
+                column = self._skill_index.get(skill)
+                if column is not None:
+                    features[row, column] = score
+        return features
+
+    @profiled("analyzer")
+    def fit_cluster_centroids(self, features: np.ndarray, n_clusters: int) -> np.ndarray:
+        """Fit KMeans on a feature matrix and return its centroids."""
+        # sklearn is only needed for clustering; importing it lazily keeps worker start-up fast
+        from sklearn.cluster import KMeans
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        kmeans.fit(features)
+        return kmeans.cluster_centers_
+
+    @profiled("analyzer")
     def cluster_students(self, assessments: List[AssessmentCreate], n_clusters: int = 3) -> Dict[int, List[int]]:
         """Cluster students based on their assessment performance."""
         # Extract features for clustering
-        features = []
-        student_ids = []
-        
-        for assessment in assessments:
-            skill_scores = list(self._calculate_skill_breakdown(assessment.questions).values())
-            features.append(skill_scores)
-            student_ids.append(assessment.student_id)
+        features = self.skill_feature_matrix([
+            self._calculate_skill_breakdown(assessment.questions) for assessment in assessments
+        ])
+        student_ids = [assessment.student_id for assessment in assessments]
         
         # Perform clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        from sklearn.cluster import KMeans
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
         clusters = kmeans.fit_predict(features)
         
         # Organize results
         cluster_results = {i: [] for i in range(n_clusters)}
-        for student_id, cluster_id in zip(student_ids, clusters):
+        for student_id, cluster_id in zip(student_ids, clusters.tolist()):
             cluster_results[cluster_id].append(student_id)
         
         return cluster_results
 
+    @profiled("analyzer")
     def predict_learning_style(self, assessment: AssessmentCreate) -> str:
         """Predict student's learning style based on assessment performance."""
         skill_breakdown = self._calculate_skill_breakdown(assessment.questions)
@@ -163,6 +287,7 @@ class AssessmentAnalyzer:
         
         return max(scores.items(), key=lambda x: x[1])[0]
 
+    @profiled("analyzer")
     def calculate_mastery_level(self, score: int) -> MasteryLevel:
         """Calculate mastery level based on assessment score."""
         if score < 4:
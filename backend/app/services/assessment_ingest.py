@@ -0,0 +1,163 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from typing import Any, List, Sequence, Tuple
+from ..models import Assessment, AssessmentResponse, Student
+from ..schemas import AssessmentCreate, BulkAssessmentItemResult
+from . import assessment_rollup, student_progress
+from .assessment_analyzer import AssessmentAnalysis, AssessmentAnalyzer
+from .question_bank import question_bank, response_rows
+from .student_clustering import StudentClusterer
+
+logger = logging.getLogger(__name__)
+
+class AssessmentIngester:
+    """Set-based ingestion of many assessments per transaction.
+
+    Each chunk runs one ownership query, one analyze_many call, one multi-row
+    INSERT ... RETURNING for assessments, one question bank lookup (inserting
+    only unseen questions), one executemany for the response rows and one
+    rollup upsert, folds the scores into the progress series, then
+    commits. Items that fail analysis are reported as errors before
+    anything is written; a chunk failing in the database rolls back alone.
+    """
+
+    def __init__(
+        self,
+        analyzer: AssessmentAnalyzer,
+        clusterer: StudentClusterer,
+        cluster_counts: Sequence[int],
+        progress_alpha: float
+    ):
+        self.analyzer = analyzer
+        self.clusterer = clusterer
+        self.cluster_counts = cluster_counts
+        self.progress_alpha = progress_alpha
+
+    def ingest_chunk(self, db: Session, user_id: int, items: List[Any], start_index: int) -> List[BulkAssessmentItemResult]:
+        """Validate, analyze and insert one chunk of raw items; returns a result per item."""
+        results = [None] * len(items)
+        assessments, positions = [], []
+        for position, item in enumerate(items):
+            try:
+                assessments.append(AssessmentCreate.model_validate(item))
+                positions.append(position)
+            except ValidationError as exc:
+                results[position] = self._error(start_index + position, str(exc), 422)
+
+        grades = dict(db.query(Student.id, Student.grade).filter(
+            Student.user_id == user_id,
+            Student.id.in_({assessment.student_id for assessment in assessments})
+        ).all()) if assessments else {}
+
+        owned, owned_positions = [], []
+        for assessment, position in zip(assessments, positions):
+            if assessment.student_id in grades:
+                owned.append(assessment)
+                owned_positions.append(position)
+            else:
+                results[position] = self._error(start_index + position, "Student not found", 404)
+
+        owned, owned_positions, analyses = self._analyze(owned, owned_positions, start_index, results)
+        if owned:
+            try:
+                assessment_ids = self._insert(db, owned, analyses, grades)
+                db.commit()
+            except SQLAlchemyError as exc:
+                db.rollback()
+                detail = f"Database error: {exc.__class__.__name__}"
+                for position in owned_positions:
+                    results[position] = self._error(start_index + position, detail, 503)
+            except BaseException:
+                # Leave nothing of the chunk, or of the caller's pending changes, behind
+                db.rollback()
+                raise
+            else:
+                for position, assessment_id in zip(owned_positions, assessment_ids):
+                    results[position] = BulkAssessmentItemResult(
+                        index=start_index + position, status="created", assessment_id=assessment_id
+                    )
+
+        return results
+
+    def _analyze(
+        self, assessments: List[AssessmentCreate], positions: List[int], start_index: int, results: list
+    ) -> Tuple[List[AssessmentCreate], List[int], List[AssessmentAnalysis]]:
+        """Analyze the batch, or item by item if it fails, recording failures in results.
+
+        Returns the assessments, positions and analyses that succeeded.
+        """
+        try:
+            return assessments, positions, self.analyzer.analyze_many(assessments)
+        except Exception:
+            logger.exception("Batch analysis of %d assessments failed; analyzing them one by one", len(assessments))
+        kept, kept_positions, analyses = [], [], []
+        for assessment, position in zip(assessments, positions):
+            try:
+                analyses.extend(self.analyzer.analyze_many([assessment]))
+            except Exception as exc:
+                results[position] = self._error(
+                    start_index + position, f"Analysis failed: {exc.__class__.__name__}", 422
+                )
+            else:
+                kept.append(assessment)
+                kept_positions.append(position)
+        return kept, kept_positions, analyses
+
+    def _insert(
+        self, db: Session, assessments: List[AssessmentCreate], analyses: List[AssessmentAnalysis], grades: dict
+    ) -> List[int]:
+        rows = [
+            {
+                "student_id": assessment.student_id,
+                "subject": assessment.subject,
+                "score": assessment.score,
+                "total_questions": len(assessment.questions),
+                "skill_breakdown": analysis.skill_breakdown,
+                "recommendations": analysis.recommendations,
+                "learning_style": analysis.learning_style,
+                "mastery_level": analysis.mastery_level,
+            }
+            for assessment, analysis in zip(assessments, analyses)
+        ]
+        completed_date = datetime.utcnow()
+        for row in rows:
+            row["completed_date"] = completed_date
+        assessment_ids = db.execute(
+            insert(Assessment).returning(Assessment.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+        question_ids = iter(question_bank.intern(db, [
+            (assessment.subject, question) for assessment in assessments for question in assessment.questions
+        ]))
+        responses = [
+            row
+            for assessment_id, assessment in zip(assessment_ids, assessments)
+            for row in response_rows(assessment_id, assessment.questions, [next(question_ids) for _ in assessment.questions])
+        ]
+        if responses:
+            db.execute(insert(AssessmentResponse), responses)
+
+        assessment_rollup.record_counts(db, Counter(
+            (row["subject"], row["learning_style"], row["mastery_level"], grades[row["student_id"]])
+            for row in rows
+        ))
+        self.clusterer.assign_many(db, [
+            (assessment_id, row["student_id"], row["skill_breakdown"])
+            for assessment_id, row in zip(assessment_ids, rows)
+        ], self.cluster_counts)
+        student_progress.record_scores(db, [
+            student_progress.ScoreEvent(
+                row["student_id"], row["subject"], row["score"], row["mastery_level"], completed_date
+            )
+            for row in rows
+        ], self.progress_alpha)
+        return list(assessment_ids)
+
+    @staticmethod
+    def _error(index: int, detail: str, status_code: int) -> BulkAssessmentItemResult:
+        return BulkAssessmentItemResult(index=index, status="error", detail=detail, status_code=status_code)
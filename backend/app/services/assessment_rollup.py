@@ -0,0 +1,94 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+from ..database import dialect_insert
+from ..models import Assessment, AssessmentRollup, Student, Subject
+
+ROLLUP_KEY = ("subject", "learning_style", "mastery_level", "grade")
+
+# Rollup grade of students without one; a NULL would never match the unique key
+NO_GRADE = -1
+
+def record_assessment(db: Session, assessment: Assessment, grade: Optional[int], count: int = 1) -> None:
+    """Add an assessment to the rollup in the caller's transaction.
+
+    Does not commit; create_assessment commits the assessment and the rollup
+    increment together.
+    """
+    key = (assessment.subject, assessment.learning_style, assessment.mastery_level, grade)
+    record_counts(db, {key: count})
+
+def record_counts(db: Session, counts: Dict[Tuple, int]) -> None:
+    """Add {(subject, learning_style, mastery_level, grade): count} increments in the caller's transaction.
+
+    A None grade is counted under NO_GRADE.
+    """
+    if not counts:
+        return
+    merged: Dict[Tuple, int] = {}
+    for (subject, learning_style, mastery_level, grade), count in counts.items():
+        key = (subject, learning_style, mastery_level, NO_GRADE if grade is None else grade)
+        merged[key] = merged.get(key, 0) + count
+    counts = merged
+
+    upsert = dialect_insert(db)
+    if upsert is not None:
+        rows = [dict(zip(ROLLUP_KEY, key), assessment_count=count) for key, count in counts.items()]
+        stmt = upsert(AssessmentRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={"assessment_count": AssessmentRollup.assessment_count + stmt.excluded.assessment_count}
+        )
+        db.execute(stmt)
+        return
+
+    for key, count in counts.items():
+        key = dict(zip(ROLLUP_KEY, key))
+        rollup = db.query(AssessmentRollup).filter_by(**key).with_for_update().first()
+        if rollup is None:
+            db.add(AssessmentRollup(**key, assessment_count=count))
+        else:
+            rollup.assessment_count += count
+
+def get_distribution(
+    db: Session,
+    column: str,
+    subject: Optional[Subject] = None,
+    grade: Optional[int] = None
+) -> Dict[str, int]:
+    """Sum rollup counts grouped by one rollup column."""
+    group_column = getattr(AssessmentRollup, column)
+    query = db.query(group_column, func.sum(AssessmentRollup.assessment_count)).group_by(group_column)
+    if subject is not None:
+        query = query.filter(AssessmentRollup.subject == subject)
+    if grade is not None:
+        query = query.filter(AssessmentRollup.grade == grade)
+    return {value: int(total) for value, total in query if total}
+
+def rebuild_rollup(db: Session) -> int:
+    """Recompute the rollup from the assessments table with one GROUP BY.
+
+    Used to backfill existing data; returns the number of rollup rows written.
+    """
+    grouped = (
+        select(
+            Assessment.subject,
+            Assessment.learning_style,
+            Assessment.mastery_level,
+            func.coalesce(Student.grade, NO_GRADE),
+            func.count(Assessment.id)
+        )
+        .join(Student, Assessment.student_id == Student.id)
+        .where(Assessment.learning_style.isnot(None), Assessment.mastery_level.isnot(None))
+        .group_by(
+            Assessment.subject, Assessment.learning_style, Assessment.mastery_level,
+            func.coalesce(Student.grade, NO_GRADE)
+        )
+    )
+
+    db.query(AssessmentRollup).delete(synchronize_session=False)
+    result = db.execute(
+        insert(AssessmentRollup).from_select(list(ROLLUP_KEY) + ["assessment_count"], grouped)
+    )
+    db.commit()
+    return result.rowcount
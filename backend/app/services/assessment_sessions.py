@@ -0,0 +1,508 @@
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from ..core.config import settings
+from ..models import AssessmentSession, QuestionBankItem, Subject
+from ..schemas import BulkAssessmentItemResult
+from .assessment_ingest import AssessmentIngester
+from .question_bank import CONTENT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Marks an unanswered position in SessionRecord.answers; questions have fewer options
+UNANSWERED = 0xFF
+
+# Expired rows are deleted by the flush thread this often
+EXPIRE_INTERVAL = 60.0
+
+# Write-behind statement: one executemany per flush, keyed on the session id.
+# Core rather than ORM bulk UPDATE, so rows finished or expired meanwhile are skipped silently.
+SESSION_UPDATE = update(AssessmentSession.__table__).where(
+    AssessmentSession.__table__.c.id == bindparam("session_id")
+).values(
+    answers=bindparam("answers"),
+    updated_at=bindparam("updated_at"),
+    expires_at=bindparam("expires_at"),
+)
+
+class SessionRecord:
+    """One assessment in progress. Only touched under its own lock.
+
+    Per question the record keeps its bank id, correct answer, option count
+    and chosen option in flat arrays, about a byte per question beyond the id.
+    """
+    __slots__ = (
+        "id", "user_id", "student_id", "subject", "question_ids", "correct_answers",
+        "option_counts", "answers", "answered", "correct", "expires_at", "finished", "lock",
+    )
+
+    def __init__(self, session_id: str, user_id: int, student_id: int, subject: Subject,
+                 questions: Sequence[Tuple[int, int, int]], expires_at: float):
+        self.id = session_id
+        self.user_id = user_id
+        self.student_id = student_id
+        self.subject = subject
+        self.question_ids = array("q", (question_id for question_id, _, _ in questions))
+        self.correct_answers = bytes(correct for _, correct, _ in questions)
+        self.option_counts = bytes(count for _, _, count in questions)
+        self.answers = bytearray([UNANSWERED]) * len(questions)
+        self.answered = 0
+        self.correct = 0
+        # Wall-clock seconds, as the row's expires_at
+        self.expires_at = expires_at
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def record(self, position: int, chosen_option: int) -> None:
+        previous = self.answers[position]
+        if previous == UNANSWERED:
+            self.answered += 1
+        elif previous == self.correct_answers[position]:
+            self.correct -= 1
+        self.answers[position] = chosen_option
+        if chosen_option == self.correct_answers[position]:
+            self.correct += 1
+
+    def chosen_options(self) -> List[Optional[int]]:
+        return [None if option == UNANSWERED else option for option in self.answers]
+
+    def state(self) -> Dict:
+        """The session as returned by the API."""
+        return {
+            "session_id": self.id,
+            "student_id": self.student_id,
+            "subject": self.subject,
+            "question_ids": self.question_ids.tolist(),
+            "answers": self.chosen_options(),
+            "answered": self.answered,
+            "correct": self.correct,
+            "expires_at": datetime.utcfromtimestamp(self.expires_at),
+        }
+
+    def row(self, now: datetime) -> Dict:
+        """Parameters of SESSION_UPDATE for this session."""
+        return {
+            "session_id": self.id,
+            "answers": self.chosen_options(),
+            "updated_at": now,
+            "expires_at": datetime.utcfromtimestamp(self.expires_at),
+        }
+
+class AnswerJournal:
+    """Local SQLite log of answers the database has not received yet.
+
+    Appends commit in WAL mode with synchronous=NORMAL, so they survive the
+    worker crashing but not the machine losing power. Entries are trimmed
+    once a flush covering them commits, and replayed on startup otherwise.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "seq INTEGER PRIMARY KEY, session_id TEXT NOT NULL, position INTEGER NOT NULL, chosen_option INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self.last_seq = self._conn.execute("SELECT coalesce(max(seq), 0) FROM answers").fetchone()[0]
+
+    def append(self, session_id: str, answers: Sequence[Tuple[int, int]]) -> None:
+        """Log answers in one transaction. Callers serialize appends."""
+        with self._conn:
+            for position, chosen_option in answers:
+                self.last_seq = self._conn.execute(
+                    "INSERT INTO answers (session_id, position, chosen_option) VALUES (?, ?, ?)",
+                    (session_id, position, chosen_option)
+                ).lastrowid
+
+    def entries(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Logged answers per session, in the order given."""
+        entries: Dict[str, List[Tuple[int, int]]] = {}
+        for session_id, position, chosen_option in self._conn.execute(
+            "SELECT session_id, position, chosen_option FROM answers ORDER BY seq"
+        ):
+            entries.setdefault(session_id, []).append((position, chosen_option))
+        return entries
+
+    def trim(self, seq: int) -> None:
+        """Drop entries up to and including seq."""
+        with self._conn:
+            self._conn.execute("DELETE FROM answers WHERE seq <= ?", (seq,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+class AssessmentSessionStore:
+    """In-progress assessments, answered from memory and persisted write-behind.
+
+    Starting a session inserts its row right away. Answers only change the
+    in-memory record and mark it dirty; a background thread writes every
+    dirty session to the database in one statement each flush_interval, and
+    deletes rows idle for longer than ttl. The most recently used cache_size
+    records stay in memory; others, and sessions started on another worker
+    or before a restart, are loaded from their row on first use.
+
+    Without a journal, answers given in the last flush_interval before a
+    crash are lost. With one they are also appended to a local SQLite file
+    and recover() replays them on startup. Behind several workers, route a
+    session to one worker: a worker holding unflushed answers overwrites
+    the row when it flushes.
+    """
+
+    def __init__(self, cache_size: int, flush_interval: float, ttl: float, journal_path: Optional[str] = None):
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self.journal_path = journal_path
+        self._journal: Optional[AnswerJournal] = None
+        self._sessions: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._dirty: Dict[str, SessionRecord] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = 0
+        self.loaded = 0
+        self.answers = 0
+        self.flushes = 0
+        self.flushed = 0
+        self.finished = 0
+        self.expired = 0
+        self.recovered = 0
+
+    def start(self, db: Session, user_id: int, student_id: int, subject: Subject,
+              question_ids: Sequence[int]) -> Optional[SessionRecord]:
+        """Open a session over bank questions of subject and commit its row; None if a question is not one."""
+        questions = self._questions(db, subject, question_ids)
+        if questions is None:
+            return None
+        record = SessionRecord(
+            secrets.token_urlsafe(16), user_id, student_id, subject, questions, time.time() + self.ttl
+        )
+        now = datetime.utcnow()
+        db.execute(insert(AssessmentSession).values(
+            id=record.id, user_id=user_id, student_id=student_id, subject=subject,
+            question_ids=list(question_ids), answers=record.chosen_options(),
+            created_at=now, updated_at=now, expires_at=datetime.utcfromtimestamp(record.expires_at),
+        ))
+        db.commit()
+        with self._lock:
+            self._remember(record)
+            self.started += 1
+        return record
+
+    def get(self, db: Session, session_id: str, user_id: int) -> Optional[SessionRecord]:
+        """The caller's session from memory or its row; None if unknown, expired, finished or someone else's."""
+        with self._lock:
+            record = self._sessions.get(session_id) or self._dirty.get(session_id)
+            if record is not None:
+                if record.user_id != user_id or record.finished or record.expires_at <= time.time():
+                    return None
+                self._remember(record)
+                return record
+        record = self._load(db, session_id, user_id)
+        if record is None:
+            return None
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep the first copy
+            record = self._sessions.get(session_id) or self._dirty.get(session_id) or record
+            self._remember(record)
+            self.loaded += 1
+        return record
+
+    def answer(self, record: SessionRecord, answers: Sequence[Tuple[int, int]]) -> bool:
+        """Record (position, chosen option) pairs; False if the session is finished.
+
+        Later answers to a position replace earlier ones. Raises ValueError,
+        recording nothing, if a position or option is out of range.
+        """
+        with record.lock:
+            if record.finished:
+                return False
+            for position, chosen_option in answers:
+                if not 0 <= position < len(record.answers):
+                    raise ValueError(f"Position {position} is out of range")
+                if not 0 <= chosen_option < record.option_counts[position]:
+                    raise ValueError(f"Option {chosen_option} is out of range for position {position}")
+            for position, chosen_option in answers:
+                record.record(position, chosen_option)
+            record.expires_at = time.time() + self.ttl
+            # Journal and mark dirty together, so a flush trimming the journal
+            # up to some entry also writes the session that entry belongs to
+            with self._lock:
+                if self._journal is not None:
+                    self._journal.append(record.id, answers)
+                self._dirty[record.id] = record
+                self.answers += len(answers)
+        return True
+
+    def state(self, record: SessionRecord) -> Dict:
+        with record.lock:
+            return record.state()
+
+    def finish(self, db: Session, record: SessionRecord, ingester: AssessmentIngester) -> Optional[BulkAssessmentItemResult]:
+        """Submit the session as an assessment through ingester; None if it is already finished.
+
+        Unanswered questions count as wrong. The session row is deleted in
+        the assessment's transaction, so a failed submission leaves the
+        session open.
+        """
+        with record.lock:
+            if record.finished:
+                return None
+            record.finished = True
+            payload = self._assessment(db, record)
+        db.execute(delete(AssessmentSession).where(AssessmentSession.id == record.id))
+        # ingest_chunk commits the delete along with the assessment, or rolls both back
+        try:
+            result = ingester.ingest_chunk(db, record.user_id, [payload], 0)[0]
+        except BaseException:
+            self._reopen(record)
+            raise
+        if result.status == "created":
+            with self._lock:
+                self._sessions.pop(record.id, None)
+                self._dirty.pop(record.id, None)
+                self.finished += 1
+        else:
+            self._reopen(record)
+        return result
+
+    def _reopen(self, record: SessionRecord) -> None:
+        """Undo finish() after a failed submission.
+
+        A flush running meanwhile skipped the finished record and trimmed the
+        journal past its answers, so it is marked dirty and journaled again.
+        """
+        with record.lock:
+            record.finished = False
+            answered = [
+                (position, option) for position, option in enumerate(record.chosen_options()) if option is not None
+            ]
+            with self._lock:
+                if self._journal is not None and answered:
+                    self._journal.append(record.id, answered)
+                self._dirty[record.id] = record
+
+    def flush(self, db: Session) -> int:
+        """Write every dirty session in one executemany and commit; returns how many."""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            seq = self._journal.last_seq if self._journal is not None else 0
+        now = datetime.utcnow()
+        rows = []
+        for record in batch.values():
+            with record.lock:
+                if not record.finished:
+                    rows.append(record.row(now))
+        try:
+            if rows:
+                db.execute(SESSION_UPDATE, rows)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            with self._lock:
+                for session_id, record in batch.items():
+                    self._dirty.setdefault(session_id, record)
+            raise
+        with self._lock:
+            if self._journal is not None:
+                self._journal.trim(seq)
+            self.flushes += 1
+            self.flushed += len(rows)
+        return len(rows)
+
+    def expire(self, db: Session) -> int:
+        """Drop expired sessions from memory and delete expired rows; returns how many rows."""
+        now = time.time()
+        with self._lock:
+            expired = [record.id for record in self._sessions.values() if record.expires_at <= now]
+            for session_id in expired:
+                del self._sessions[session_id]
+                self._dirty.pop(session_id, None)
+        deleted = db.execute(
+            delete(AssessmentSession).where(AssessmentSession.expires_at <= datetime.utcfromtimestamp(now))
+        ).rowcount
+        db.commit()
+        with self._lock:
+            self.expired += deleted
+        return deleted
+
+    def recover(self, db: Session) -> int:
+        """Open the journal and apply answers a crashed worker never flushed; returns how many sessions.
+
+        Run before serving: records already in memory would not see the replayed answers.
+        """
+        if self.journal_path is None:
+            return 0
+        if self._journal is None:
+            self._journal = AnswerJournal(self.journal_path)
+        entries = self._journal.entries()
+        if not entries:
+            return 0
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        rows = []
+        for session_id, answers in db.execute(
+            select(AssessmentSession.id, AssessmentSession.answers).where(AssessmentSession.id.in_(list(entries)))
+        ):
+            answers = list(answers)
+            for position, chosen_option in entries[session_id]:
+                if position < len(answers):
+                    answers[position] = chosen_option
+            rows.append({"session_id": session_id, "answers": answers, "updated_at": now, "expires_at": expires_at})
+        if rows:
+            db.execute(SESSION_UPDATE, rows)
+        db.commit()
+        self._journal.trim(self._journal.last_seq)
+        self.recovered += len(rows)
+        return len(rows)
+
+    def start_flusher(self, session_factory: Callable[[], Session]) -> None:
+        """Start the write-behind thread, once per process."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(session_factory,), name="assessment-session-flush", daemon=True
+            )
+            self._thread.start()
+
+    def stop_flusher(self, session_factory: Callable[[], Session]) -> None:
+        """Stop the write-behind thread and flush what is left."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        db = session_factory()
+        try:
+            self.flush(db)
+        finally:
+            db.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._dirty.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "cache_size": self.cache_size,
+                "dirty": len(self._dirty),
+                "started": self.started,
+                "loaded": self.loaded,
+                "answers": self.answers,
+                "flushes": self.flushes,
+                "flushed": self.flushed,
+                "finished": self.finished,
+                "expired": self.expired,
+                "recovered": self.recovered,
+                "journal": self.journal_path,
+            }
+
+    def _run(self, session_factory: Callable[[], Session]) -> None:
+        expired_at = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            db = session_factory()
+            try:
+                self.flush(db)
+                if time.monotonic() - expired_at >= EXPIRE_INTERVAL:
+                    self.expire(db)
+                    expired_at = time.monotonic()
+            except SQLAlchemyError:
+                logger.exception("Assessment session flush failed; retrying in %.1f s", self.flush_interval)
+            finally:
+                db.close()
+
+    def _remember(self, record: SessionRecord) -> None:
+        # Evicted records are reloaded from their row; dirty ones stay reachable until flushed
+        self._sessions[record.id] = record
+        self._sessions.move_to_end(record.id)
+        while len(self._sessions) > self.cache_size:
+            self._sessions.popitem(last=False)
+
+    def _load(self, db: Session, session_id: str, user_id: int) -> Optional[SessionRecord]:
+        row = db.execute(
+            select(AssessmentSession.student_id, AssessmentSession.subject, AssessmentSession.question_ids,
+                   AssessmentSession.answers, AssessmentSession.expires_at)
+            .where(AssessmentSession.id == session_id, AssessmentSession.user_id == user_id)
+        ).first()
+        if row is None or row.expires_at <= datetime.utcnow():
+            return None
+        questions = self._questions(db, row.subject, row.question_ids)
+        if questions is None:
+            return None
+        record = SessionRecord(
+            session_id, user_id, row.student_id, row.subject, questions,
+            (row.expires_at - datetime(1970, 1, 1)).total_seconds()
+        )
+        for position, chosen_option in enumerate(row.answers):
+            if chosen_option is not None:
+                record.record(position, chosen_option)
+        return record
+
+    @staticmethod
+    def _questions(db: Session, subject: Subject, question_ids: Sequence[int]) -> Optional[List[Tuple[int, int, int]]]:
+        """(id, correct answer, option count) per question id, or None if any is not a bank question of subject."""
+        found = {
+            question_id: (question_id, correct_answer, len(options))
+            for question_id, correct_answer, options in db.execute(
+                select(QuestionBankItem.id, QuestionBankItem.correct_answer, QuestionBankItem.options).where(
+                    QuestionBankItem.id.in_(set(question_ids)),
+                    QuestionBankItem.subject == subject
+                )
+            )
+        }
+        if len(found) != len(set(question_ids)):
+            return None
+        questions = [found[question_id] for question_id in question_ids]
+        if any(not 0 < count < UNANSWERED or not 0 <= correct < count for _, correct, count in questions):
+            return None
+        return questions
+
+    @staticmethod
+    def _assessment(db: Session, record: SessionRecord) -> Dict:
+        """An AssessmentCreate body for the session, scored 0-10 by share of correct answers."""
+        question_ids = record.question_ids.tolist()
+        content = {
+            row[0]: dict(zip(CONTENT_FIELDS, row[1:]))
+            for row in db.execute(
+                select(QuestionBankItem.id, *(getattr(QuestionBankItem, field) for field in CONTENT_FIELDS))
+                .where(QuestionBankItem.id.in_(set(question_ids)))
+            )
+        }
+        return {
+            "student_id": record.student_id,
+            "subject": record.subject,
+            "score": round(10 * record.correct / len(question_ids)),
+            "total_questions": len(question_ids),
+            "skill_breakdown": {},
+            "recommendations": [],
+            "questions": [
+                {**content[question_id], "chosen_option": chosen_option}
+                for question_id, chosen_option in zip(question_ids, record.chosen_options())
+            ],
+        }
+
+assessment_sessions = AssessmentSessionStore(
+    settings.ASSESSMENT_SESSION_CACHE_SIZE,
+    settings.ASSESSMENT_SESSION_FLUSH_SECONDS,
+    settings.ASSESSMENT_SESSION_TTL_SECONDS,
+    settings.ASSESSMENT_SESSION_JOURNAL_PATH,
+)
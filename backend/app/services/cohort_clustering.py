@@ -0,0 +1,175 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from ..models import Assessment, Student, Subject
+from .assessment_analyzer import AssessmentAnalyzer
+
+class Cohort(NamedTuple):
+    """Students of one subject, and optionally one grade, in that cohort's own skill space."""
+    subject: Subject
+    grade: Optional[int]
+    student_ids: List[int]
+    skills: List[str]
+    features: np.ndarray
+
+def load_cohorts(db: Session, analyzer: AssessmentAnalyzer, by_grade: bool = False) -> List[Cohort]:
+    """Partition each student's latest assessment per subject into cohorts, largest first.
+
+    A cohort's features are only the skills its assessments cover, so
+    Mathematics students are not compared on Arts skills they were never
+    assessed on.
+    """
+    ranked = select(
+        Assessment.student_id,
+        Assessment.subject,
+        Assessment.skill_breakdown,
+        Student.grade,
+        func.row_number().over(
+            partition_by=(Assessment.student_id, Assessment.subject),
+            order_by=(Assessment.completed_date.desc(), Assessment.id.desc())
+        ).label("position")
+    ).join(Student, Assessment.student_id == Student.id).subquery()
+    rows = db.execute(
+        select(ranked.c.student_id, ranked.c.subject, ranked.c.skill_breakdown, ranked.c.grade)
+        .where(ranked.c.position == 1).order_by(ranked.c.student_id)
+    ).all()
+
+    partitions: Dict[Tuple[Subject, Optional[int]], List] = {}
+    for row in rows:
+        partitions.setdefault((row.subject, row.grade if by_grade else None), []).append(row)
+
+    all_skills = analyzer.skill_features
+    cohorts = []
+    for (subject, grade), members in partitions.items():
+        breakdowns = [row.skill_breakdown or {} for row in members]
+        covered = set().union(*breakdowns)
+        columns = [i for i, skill in enumerate(all_skills) if skill in covered]
+        cohorts.append(Cohort(
+            subject=subject,
+            grade=grade,
+            student_ids=[row.student_id for row in members],
+            skills=[all_skills[i] for i in columns],
+            features=analyzer.skill_feature_matrix(breakdowns)[:, columns],
+        ))
+    cohorts.sort(key=lambda cohort: len(cohort.student_ids), reverse=True)
+    return cohorts
+
+def cluster_cohort(cohort: Cohort, k_range: Tuple[int, int], sample_size: int, deadline: float) -> Dict[str, Any]:
+    """Cluster one cohort, choosing k in k_range by silhouette score on a sample.
+
+    Candidates are fitted on at most sample_size students, smallest k
+    first; once time.time() passes deadline the remaining candidates are
+    skipped and "complete" is false. The chosen k is then refitted on the
+    whole cohort, starting from its sample centroids.
+    """
+    # Loaded by the first cohort a pool worker fits, not when job_queue imports this module
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+    from threadpoolctl import threadpool_limits
+
+    features = cohort.features
+    n_students = len(features)
+    sample = features
+    if n_students > sample_size:
+        rng = np.random.default_rng(42)
+        sample = features[rng.choice(n_students, size=sample_size, replace=False)]
+    # A silhouette needs 2 <= k < sampled points, and k-means at most one centroid per distinct point
+    k_min, k_max = k_range
+    k_max = min(k_max, len(np.unique(sample, axis=0)), len(sample) - 1)
+    candidates = list(range(max(k_min, 2), k_max + 1))
+
+    scores: Dict[int, float] = {}
+    best_k, best_centroids = 1, features.mean(axis=0, keepdims=True)
+    labels = np.zeros(n_students, dtype=np.int64)
+    # Cohorts already run one per process; keep OpenMP from oversubscribing the cores
+    with threadpool_limits(limits=1):
+        for k in candidates:
+            if scores and time.time() > deadline:
+                break
+            kmeans = KMeans(n_clusters=k, random_state=42, n_init=3).fit(sample)
+            scores[k] = float(silhouette_score(sample, kmeans.labels_))
+            # Ties go to the smaller k
+            if best_k == 1 or scores[k] > scores[best_k]:
+                best_k, best_centroids = k, kmeans.cluster_centers_
+        if best_k > 1:
+            kmeans = KMeans(n_clusters=best_k, init=best_centroids, n_init=1).fit(features)
+            best_centroids, labels = kmeans.cluster_centers_, kmeans.labels_
+
+    clusters: Dict[int, List[int]] = {i: [] for i in range(best_k)}
+    for student_id, label in zip(cohort.student_ids, labels.tolist()):
+        clusters[label].append(student_id)
+    return {
+        "subject": cohort.subject.value,
+        "grade": cohort.grade,
+        "n_students": n_students,
+        "n_clusters": best_k,
+        "silhouette": scores.get(best_k),
+        "silhouette_by_k": scores,
+        "complete": len(scores) == len(candidates),
+        "skills": cohort.skills,
+        "centroids": np.round(best_centroids, 4).tolist(),
+        "clusters": clusters,
+    }
+
+def fit_cohorts(
+    cohorts: List[Cohort],
+    k_range: Tuple[int, int],
+    sample_size: int,
+    time_budget: float,
+    workers: int = 0,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Cluster cohorts across a pool of worker processes, in the given order.
+
+    workers=0 uses one per CPU and workers=1 runs in-process. k selection
+    stops trying larger k once time_budget seconds have passed, so a run
+    takes about that long plus one fit per cohort still running. on_progress
+    gets (cohorts done, total). Results are ordered by subject and grade.
+    """
+    deadline = time.time() + time_budget
+    workers = min(workers or os.cpu_count() or 1, len(cohorts))
+    results = []
+    if workers <= 1:
+        for cohort in cohorts:
+            results.append(cluster_cohort(cohort, k_range, sample_size, deadline))
+            if on_progress is not None:
+                on_progress(len(results), len(cohorts))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(cluster_cohort, cohort, k_range, sample_size, deadline) for cohort in cohorts]
+            try:
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    if on_progress is not None:
+                        on_progress(len(results), len(cohorts))
+            except BaseException:
+                # e.g. a cancelled job: let running cohorts finish but start no more
+                pool.shutdown(cancel_futures=True)
+                raise
+    results.sort(key=lambda result: (result["subject"], result["grade"] or 0))
+    return results
+
+def cluster_cohorts(
+    db: Session,
+    analyzer: AssessmentAnalyzer,
+    by_grade: bool = False,
+    k_range: Tuple[int, int] = (2, 8),
+    sample_size: int = 2000,
+    time_budget: float = 30.0,
+    workers: int = 0,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Cluster every subject (and with by_grade every grade) cohort, each on its own skills.
+
+    The cohorts are read here and fitted by fit_cohorts(), largest first so
+    the pool is not left waiting on one big cohort at the end.
+    """
+    start = time.time()
+    cohorts = load_cohorts(db, analyzer, by_grade)
+    # The workers need no database: release the connection before forking
+    db.commit()
+    return fit_cohorts(cohorts, k_range, sample_size, time_budget - (time.time() - start), workers, on_progress)
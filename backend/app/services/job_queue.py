@@ -0,0 +1,408 @@
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from collections import Counter
+from multiprocessing import connection
+from multiprocessing.process import BaseProcess
+from datetime import datetime, timedelta
+from pydantic import BaseModel
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Type
+from ..core.config import settings
+from ..database import JSON_OPTIONS
+from ..models import Assessment, Job, JobStatus, StudentCluster, StudentClusterModel
+from ..schemas import ClusterCohortsJob, RegeneratePlansJob, RescoreAssessmentsJob, UpdateClustersJob
+from . import plan_generator
+from .assessment_analyzer import AssessmentAnalyzer
+from .cohort_clustering import cluster_cohorts as fit_cohort_clusters
+from .resource_catalog import resource_catalog
+from .student_clustering import StudentClusterer
+
+logger = logging.getLogger(__name__)
+
+# Running jobs of one type a runner allows when JOB_TYPE_LIMITS does not name it
+DEFAULT_TYPE_LIMIT = 1
+
+# A running job writes its progress, and sees cancellation, at most this often
+PROGRESS_INTERVAL = 1.0
+
+class JobCancelled(Exception):
+    """Raised inside a job by JobContext once cancellation was requested."""
+
+class JobContext:
+    """Handed to a running job for progress reports and cancellation checks.
+
+    Reports go through their own connection and commit at once. Call
+    progress() between the job's transactions: on SQLite a job holding a
+    write transaction would block its own report.
+    """
+
+    def __init__(self, engine: Engine, job_id: int):
+        self.engine = engine
+        self.job_id = job_id
+        self._reported = 0.0
+
+    def progress(self, done: int, total: int) -> None:
+        """Record done of total units of work; raises JobCancelled if the job was cancelled."""
+        now = time.monotonic()
+        if now - self._reported < PROGRESS_INTERVAL and done < total:
+            return
+        self._reported = now
+        fraction = min(done / total, 1.0) if total else 1.0
+        with self.engine.begin() as conn:
+            conn.execute(update(Job.__table__).where(Job.id == self.job_id).values(progress=fraction))
+            cancelled = conn.execute(select(Job.cancel_requested).where(Job.id == self.job_id)).scalar()
+        if cancelled:
+            raise JobCancelled()
+
+    def check_cancelled(self) -> None:
+        with self.engine.connect() as conn:
+            if conn.execute(select(Job.cancel_requested).where(Job.id == self.job_id)).scalar():
+                raise JobCancelled()
+
+class JobType(NamedTuple):
+    # handler(db, params, context) does the work and returns a JSON-serializable result
+    handler: Callable[[Session, BaseModel, JobContext], Any]
+    params: Type[BaseModel]
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+def job_type(name: str, params: Type[BaseModel]):
+    """Register the decorated function as the handler of job type name."""
+    def register(handler):
+        JOB_TYPES[name] = JobType(handler, params)
+        return handler
+    return register
+
+def enqueue(db: Session, job_type: str, params: Mapping[str, Any], user_id: Optional[int]) -> Job:
+    """Validate params against the job type and queue the job; commits.
+
+    Raises ValueError for an unknown job type and pydantic's
+    ValidationError, also a ValueError, for invalid params.
+    """
+    spec = JOB_TYPES.get(job_type)
+    if spec is None:
+        raise ValueError(f"Unknown job type {job_type!r}; expected one of {', '.join(sorted(JOB_TYPES))}")
+    job = Job(
+        job_type=job_type,
+        status=JobStatus.QUEUED,
+        params=spec.params.model_validate(params).model_dump(mode="json"),
+        progress=0.0,
+        cancel_requested=False,
+        attempts=0,
+        created_by=user_id,
+        created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+def cancel(db: Session, job_id: int) -> Optional[Job]:
+    """Cancel a queued job outright, or ask a running one to stop; commits. None if there is no such job."""
+    db.execute(
+        update(Job).where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+        .values(status=JobStatus.CANCELLED, cancel_requested=True, finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(Job).where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+        .values(cancel_requested=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return db.get(Job, job_id, populate_existing=True)
+
+def claim(db: Session, capacity: Mapping[str, int], slots: int) -> List[Tuple[int, str]]:
+    """Switch up to slots of the oldest queued jobs to RUNNING, at most capacity[type] per type; commits.
+
+    Each claim is a compare-and-set on the job's status, so runners sharing
+    the table never claim the same job twice. Returns (id, type) pairs.
+    """
+    candidates = []
+    for name, free in capacity.items():
+        if free > 0:
+            candidates.extend(db.execute(
+                select(Job.id, Job.job_type).where(Job.status == JobStatus.QUEUED, Job.job_type == name)
+                .order_by(Job.id).limit(free)
+            ).all())
+    now = datetime.utcnow()
+    claimed = []
+    for job_id, name in sorted(candidates)[:slots]:
+        won = db.execute(
+            update(Job).where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.RUNNING, started_at=now, heartbeat_at=now, attempts=Job.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if won:
+            claimed.append((job_id, name))
+    db.commit()
+    return claimed
+
+def heartbeat(db: Session, job_ids: Sequence[int]) -> None:
+    db.execute(
+        update(Job).where(Job.id.in_(job_ids), Job.status == JobStatus.RUNNING)
+        .values(heartbeat_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def release(db: Session, condition, max_attempts: int, error: str) -> int:
+    """Take RUNNING jobs matching condition off their runner; commits and returns how many.
+
+    Jobs asked to cancel end CANCELLED, jobs with attempts left go back to
+    the queue, and the rest FAILED with error.
+    """
+    now = datetime.utcnow()
+    running = (Job.status == JobStatus.RUNNING, condition)
+    released = 0
+    for where, values in (
+        ((Job.cancel_requested.is_(True),), {"status": JobStatus.CANCELLED, "finished_at": now}),
+        ((Job.attempts < max_attempts,), {"status": JobStatus.QUEUED, "started_at": None, "heartbeat_at": None}),
+        ((), {"status": JobStatus.FAILED, "error": error, "finished_at": now}),
+    ):
+        released += db.execute(
+            update(Job).where(*running, *where).values(**values).execution_options(synchronize_session=False)
+        ).rowcount
+    db.commit()
+    return released
+
+# Each process opens its own engine; connections never cross the process boundary
+_sessionmaker = None
+_engine = None
+
+def _init_process(database_url: str) -> None:
+    global _sessionmaker, _engine
+    connect_args = {"timeout": 60} if make_url(database_url).get_backend_name() == "sqlite" else {}
+    _engine = create_engine(database_url, poolclass=NullPool, connect_args=connect_args, **JSON_OPTIONS)
+    _sessionmaker = sessionmaker(bind=_engine, autoflush=False)
+
+def _init_worker(database_url: str) -> None:
+    # Ctrl-C reaches the whole process group; the runner decides when jobs stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_process(database_url)
+
+def _job_process(database_url: str, job_id: int) -> None:
+    _init_worker(database_url)
+    _run_job(job_id)
+
+def _run_job(job_id: int) -> str:
+    """Run one claimed job and record its outcome; returns the final status."""
+    db = _sessionmaker()
+    try:
+        job = db.get(Job, job_id)
+        spec = JOB_TYPES[job.job_type]
+        params = spec.params.model_validate(job.params)
+        db.commit()
+        context = JobContext(_engine, job_id)
+        outcome = {"progress": 1.0}
+        try:
+            context.check_cancelled()
+            outcome["result"] = spec.handler(db, params, context)
+            db.commit()
+            outcome["status"] = JobStatus.SUCCEEDED
+        except JobCancelled:
+            db.rollback()
+            outcome = {"status": JobStatus.CANCELLED}
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Job %s (%s) failed", job_id, job.job_type)
+            outcome = {"status": JobStatus.FAILED, "error": f"{exc.__class__.__name__}: {exc}"[:1000]}
+        # A job requeued meanwhile by a runner that lost track of it is left alone
+        db.execute(
+            update(Job).where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+            .values(finished_at=datetime.utcnow(), **outcome)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return outcome["status"].value
+    finally:
+        db.close()
+
+class JobRunner:
+    """Claims queued jobs and runs each in its own worker process, up to workers at a time.
+
+    Run by `app.cli run-jobs`, apart from the API workers; the jobs table is
+    the only coordination, so no broker is needed and several runners may
+    share a database, each applying its own per-type limits. While jobs run
+    the runner refreshes their heartbeat_at; jobs whose heartbeat is older
+    than heartbeat_timeout lost their runner and are requeued until they
+    have run max_attempts times. A job whose process dies is handled the
+    same way, without affecting the jobs running next to it.
+    """
+
+    def __init__(self, database_url: str, workers: int, limits: Mapping[str, int], poll_interval: float,
+                 heartbeat_timeout: float, max_attempts: int):
+        self.database_url = database_url
+        self.workers = workers
+        self.limits = dict(limits)
+        self.poll_interval = poll_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+
+    def run(self, drain: bool = False) -> Counter:
+        """Run jobs until stop(), or with drain until the queue is empty; returns final status counts.
+
+        Once stopping, no new jobs are claimed and running ones are waited for.
+        """
+        self._stop.clear()
+        _init_process(self.database_url)
+        running: Dict[int, Tuple[BaseProcess, str]] = {}
+        outcomes: Counter = Counter()
+        checked_stale = 0.0
+        while running or not self._stop.is_set():
+            db = _sessionmaker()
+            try:
+                if running:
+                    heartbeat(db, list(running))
+                if time.monotonic() - checked_stale >= self.heartbeat_timeout / 4:
+                    stale = datetime.utcnow() - timedelta(seconds=self.heartbeat_timeout)
+                    if release(db, Job.heartbeat_at < stale, self.max_attempts, "Job runner stopped responding"):
+                        logger.warning("Released jobs of an unresponsive runner")
+                    checked_stale = time.monotonic()
+                claimed = [] if self._stop.is_set() else claim(
+                    db, self._capacity(running.values()), self.workers - len(running)
+                )
+            finally:
+                db.close()
+            for job_id, name in claimed:
+                logger.info("Starting job %s (%s)", job_id, name)
+                process = multiprocessing.Process(
+                    target=_job_process, args=(self.database_url, job_id), name=f"job-{job_id}"
+                )
+                process.start()
+                running[job_id] = (process, name)
+
+            if not running:
+                if drain:
+                    break
+                self._stop.wait(self.poll_interval)
+                continue
+            connection.wait([process.sentinel for process, _ in running.values()], timeout=self.poll_interval)
+            for job_id, (process, name) in list(running.items()):
+                if process.exitcode is None:
+                    continue
+                process.join()
+                del running[job_id]
+                outcomes[self._outcome(job_id, name, process.exitcode)] += 1
+        return outcomes
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _outcome(self, job_id: int, name: str, exitcode: int) -> str:
+        db = _sessionmaker()
+        try:
+            if exitcode != 0:
+                # The process died before recording an outcome
+                logger.error("Job %s (%s) lost: worker exited with code %s", job_id, name, exitcode)
+                release(db, Job.id == job_id, self.max_attempts, f"Worker process exited with code {exitcode}")
+                status = "lost"
+            else:
+                status = db.scalar(select(Job.status).where(Job.id == job_id)).value
+        finally:
+            db.close()
+        logger.info("Job %s (%s) %s", job_id, name, status)
+        return status
+
+    def _capacity(self, running: Iterable[Tuple[BaseProcess, str]]) -> Dict[str, int]:
+        busy = Counter(name for _, name in running)
+        return {name: self.limits.get(name, DEFAULT_TYPE_LIMIT) - busy[name] for name in JOB_TYPES}
+
+def job_runner(workers: Optional[int] = None) -> JobRunner:
+    """A runner configured from settings."""
+    return JobRunner(
+        settings.DATABASE_URL,
+        workers or settings.JOB_WORKERS,
+        settings.JOB_TYPE_LIMITS,
+        settings.JOB_POLL_SECONDS,
+        settings.JOB_HEARTBEAT_TIMEOUT_SECONDS,
+        settings.JOB_MAX_ATTEMPTS,
+    )
+
+# Job types
+
+@job_type("update_clusters", UpdateClustersJob)
+def update_clusters(db: Session, params: UpdateClustersJob, context: JobContext) -> Dict:
+    """Fold new assessments into a cluster model, then optionally refresh every assignment."""
+    clusterer = StudentClusterer(AssessmentAnalyzer(), batch_size=settings.CLUSTER_BATCH_SIZE)
+    watermark = db.scalar(
+        select(StudentClusterModel.last_assessment_id).where(StudentClusterModel.n_clusters == params.n_clusters)
+    ) or 0
+    pending = db.scalar(select(func.count()).select_from(Assessment).where(Assessment.id > watermark))
+    students = db.scalar(
+        select(func.count()).select_from(StudentCluster).where(StudentCluster.n_clusters == params.n_clusters)
+    ) if params.reassign else 0
+    db.commit()
+
+    total = pending + students
+    consumed = clusterer.update(db, params.n_clusters, on_batch=lambda done: context.progress(done, total))
+    reassigned = 0
+    if params.reassign:
+        reassigned = clusterer.reassign_all(
+            db, params.n_clusters, on_batch=lambda done: context.progress(consumed + done, max(total, consumed + done))
+        )
+    return {"n_clusters": params.n_clusters, "consumed": consumed, "reassigned": reassigned}
+
+@job_type("regenerate_plans", RegeneratePlansJob)
+def regenerate_plans(db: Session, params: RegeneratePlansJob, context: JobContext) -> Dict:
+    """Rebuild every student's learning plan, one chunk of students per transaction."""
+    generator = plan_generator.PlanGenerator(AssessmentAnalyzer(), resource_catalog)
+    chunks = list(plan_generator.student_id_chunks(db, params.chunk_size))
+    db.commit()
+    written = 0
+    for done, chunk in enumerate(chunks, 1):
+        written += len(generator.generate_many(db, chunk))
+        db.commit()
+        context.progress(done, len(chunks))
+    return {"plans_written": written}
+
+@job_type("rescore_assessments", RescoreAssessmentsJob)
+def rescore_assessments(db: Session, params: RescoreAssessmentsJob, context: JobContext) -> Dict:
+    """Re-evaluate stored assessments' recommendations against the current rule table."""
+    analyzer = AssessmentAnalyzer()
+    conditions = [Assessment.subject == params.subject] if params.subject is not None else []
+    total = db.scalar(select(func.count()).select_from(Assessment).where(*conditions))
+    done = updated = last_id = 0
+    while True:
+        rows = db.execute(
+            select(Assessment.id, Assessment.subject, Assessment.skill_breakdown, Assessment.recommendations)
+            .where(Assessment.id > last_id, *conditions).order_by(Assessment.id).limit(params.batch_size)
+        ).all()
+        if not rows:
+            break
+        recommendations = analyzer.recommend_many([row.skill_breakdown or {} for row in rows], [row.subject for row in rows])
+        changes = [
+            {"id": row.id, "recommendations": new}
+            for row, new in zip(rows, recommendations) if new != row.recommendations
+        ]
+        if changes:
+            db.execute(update(Assessment), changes)
+        db.commit()
+        done += len(rows)
+        updated += len(changes)
+        last_id = rows[-1].id
+        context.progress(done, total)
+    return {"assessments": done, "updated": updated}
+
+@job_type("cluster_cohorts", ClusterCohortsJob)
+def cluster_cohorts(db: Session, params: ClusterCohortsJob, context: JobContext) -> Dict:
+    """Cluster each subject cohort on its own skills, choosing k per cohort; the result holds the centroids."""
+    k_min = params.min_clusters or settings.COHORT_CLUSTER_MIN
+    k_max = max(params.max_clusters or settings.COHORT_CLUSTER_MAX, k_min)
+    cohorts = fit_cohort_clusters(
+        db,
+        AssessmentAnalyzer(),
+        by_grade=params.by_grade,
+        k_range=(k_min, k_max),
+        sample_size=params.sample_size or settings.COHORT_CLUSTER_SAMPLE_SIZE,
+        time_budget=params.time_budget_seconds or settings.COHORT_CLUSTER_TIME_BUDGET_SECONDS,
+        workers=settings.COHORT_CLUSTER_WORKERS if params.workers is None else params.workers,
+        on_progress=context.progress,
+    )
+    return {"cohorts": cohorts}
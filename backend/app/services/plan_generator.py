@@ -0,0 +1,393 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, delete, func, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from ..models import (
+    Assessment, Student, LearningPlan, SubjectPlan, FocusArea, LearningActivity, WeeklyGoal,
+    LearningGoal, Milestone, LearningResource, Subject, Difficulty, MasteryLevel, ResourceType
+)
+from ..database import JSON_OPTIONS
+from .assessment_analyzer import AssessmentAnalyzer
+from .resource_catalog import ResourceCatalog, ResourceCatalogIndex, resource_catalog
+
+class PlanGenerator:
+    """Builds learning plans from each student's latest assessment per subject.
+
+    Plans are built as plain dicts shaped like LearningPlanCreate, so building
+    is pure CPU work with no session, and written level by level: one
+    multi-row INSERT per table in the plan tree however many plans are
+    written together.
+    """
+
+    # Skills scoring below this become focus areas, weakest first
+    FOCUS_SCORE_THRESHOLD = 7
+    MAX_FOCUS_AREAS = 3
+    PLAN_WEEKS = 4
+
+    # Lesson format matched to the predicted learning style
+    STYLE_RESOURCE_TYPES = {
+        "Visual": ResourceType.VIDEO,
+        "Auditory": ResourceType.READING,
+        "Kinesthetic": ResourceType.INTERACTIVE,
+    }
+    MASTERY_DIFFICULTY = {
+        MasteryLevel.BEGINNER: Difficulty.BEGINNER,
+        MasteryLevel.DEVELOPING: Difficulty.BEGINNER,
+        MasteryLevel.PROFICIENT: Difficulty.INTERMEDIATE,
+        MasteryLevel.ADVANCED: Difficulty.ADVANCED,
+    }
+    LESSON_DURATION = 15 * 60
+    PRACTICE_DURATION = 20 * 60
+    RESOURCES_PER_FOCUS_AREA = 2
+
+    def __init__(self, analyzer: AssessmentAnalyzer, catalog: Optional[ResourceCatalogIndex] = None):
+        self.analyzer = analyzer
+        self.catalog = catalog
+
+    def build_plan(
+        self,
+        student_id: int,
+        assessments: Sequence[Assessment],
+        now: Optional[datetime] = None,
+        catalog: Optional[ResourceCatalog] = None
+    ) -> Dict:
+        """Build one plan from the student's latest assessment in each subject.
+
+        `assessments` may be ORM objects or rows with subject, skill_breakdown,
+        learning_style and mastery_level. Resources come from the catalog when
+        it has matches for a focus skill; otherwise a library link is used.
+        """
+        now = now or datetime.utcnow()
+        target_date = now + timedelta(weeks=self.PLAN_WEEKS)
+        subjects, goals, resources = [], [], []
+
+        for assessment in assessments:
+            subject = Subject(assessment.subject)
+            mastery_level = MasteryLevel(assessment.mastery_level or MasteryLevel.BEGINNER)
+            lesson_type = self.STYLE_RESOURCE_TYPES.get(assessment.learning_style, ResourceType.VIDEO)
+            focus_skills = self._focus_skills(assessment.skill_breakdown or {})
+
+            focus_areas = []
+            for skill, score in focus_skills:
+                skill_mastery = self.analyzer.calculate_mastery_level(score)
+                difficulty = self.MASTERY_DIFFICULTY[skill_mastery]
+                matches = catalog.top_n(
+                    subject, [skill], [difficulty], self._type_preference(lesson_type), n=self.RESOURCES_PER_FOCUS_AREA
+                ) if catalog is not None else []
+                if matches:
+                    skill_resources = [
+                        {field: getattr(match, field) for field in match._fields if field != "id"} for match in matches
+                    ]
+                else:
+                    skill_resources = [{
+                        "title": f"{skill} {lesson_type.value.lower()}",
+                        "description": f"{subject.value.replace('_', ' ').title()} resource for {skill}",
+                        "type": lesson_type,
+                        "url": self._resource_url(subject, skill),
+                        "subject": subject,
+                        "difficulty": difficulty,
+                        "skill_category": skill,
+                    }]
+                lesson = skill_resources[0]
+                focus_areas.append({
+                    "name": skill,
+                    "description": f"Build {skill} from {skill_mastery.value.lower()} level",
+                    "mastery_level": skill_mastery,
+                    "activities": [
+                        {
+                            "title": f"{skill} lesson",
+                            "description": f"Guided {lesson['type'].value.lower()} lesson on {skill}",
+                            "duration": self.LESSON_DURATION,
+                            "difficulty": difficulty,
+                            "resource_type": lesson["type"],
+                            "url": lesson["url"],
+                        },
+                        {
+                            "title": f"{skill} practice set",
+                            "description": f"Practice problems for {skill}",
+                            "duration": self.PRACTICE_DURATION,
+                            "difficulty": difficulty,
+                            "resource_type": ResourceType.PRACTICE,
+                            "url": None,
+                        },
+                    ],
+                })
+                resources.extend(skill_resources)
+
+            # Cycle through the focus areas, one per week
+            weekly_goals = [
+                {
+                    "description": f"Week {week}: complete the {focus_areas[(week - 1) % len(focus_areas)]['name']} activities",
+                    "target_date": now + timedelta(weeks=week),
+                    "is_completed": False,
+                }
+                for week in range(1, self.PLAN_WEEKS + 1)
+            ] if focus_areas else []
+
+            subjects.append({
+                "subject": subject,
+                "progress": 0.0,
+                "focus_areas": focus_areas,
+                "weekly_goals": weekly_goals,
+            })
+            goals.append({
+                "description": f"Reach {self._next_mastery_level(mastery_level).value.lower()} level in "
+                               f"{subject.value.replace('_', ' ').lower()}",
+                "target_date": target_date,
+                "progress": 0.0,
+                "milestones": [
+                    {
+                        "description": f"Score {self.FOCUS_SCORE_THRESHOLD}+ in {focus_area['name']}",
+                        "target_date": now + timedelta(weeks=min(i + 1, self.PLAN_WEEKS)),
+                        "is_completed": False,
+                    }
+                    for i, focus_area in enumerate(focus_areas)
+                ],
+            })
+
+        return {
+            "student_id": student_id,
+            "target_date": target_date,
+            "subjects": subjects,
+            "goals": goals,
+            "resources": resources,
+        }
+
+    def generate(self, db: Session, student_id: int) -> Optional[int]:
+        """Replace the student's plans with one built from their latest assessments.
+
+        Runs in the caller's transaction. Returns the new plan id, or None if
+        the student has no assessments.
+        """
+        plan_ids = self.generate_many(db, [student_id])
+        return plan_ids.get(student_id)
+
+    def generate_many(self, db: Session, student_ids: Sequence[int], now: Optional[datetime] = None) -> Dict[int, int]:
+        """Replace plans for a batch of students in the caller's transaction.
+
+        Students without assessments keep their existing plans. Returns
+        {student_id: new plan id}.
+        """
+        latest = latest_assessments(db, student_ids)
+        catalog = self.catalog.current(db) if self.catalog is not None else None
+        plans = [self.build_plan(student_id, rows, now, catalog) for student_id, rows in latest.items()]
+        if not plans:
+            return {}
+        delete_plans(db, list(latest))
+        return dict(zip(latest, write_plans(db, plans)))
+
+    def _focus_skills(self, skill_breakdown: Dict[str, int]) -> List[Tuple[str, int]]:
+        """Weakest skills below the threshold; the weakest overall if every skill passes."""
+        if not skill_breakdown:
+            return []
+        # sorted() is stable, so ties keep the assessment's skill order
+        ranked = sorted(skill_breakdown.items(), key=lambda item: item[1])
+        weak = [item for item in ranked if item[1] < self.FOCUS_SCORE_THRESHOLD]
+        return weak[:self.MAX_FOCUS_AREAS] or ranked[:1]
+
+    def _next_mastery_level(self, mastery_level: MasteryLevel) -> MasteryLevel:
+        levels = self.analyzer.MASTERY_LEVELS
+        return levels[min(levels.index(mastery_level) + 1, len(levels) - 1)]
+
+    @staticmethod
+    def _type_preference(lesson_type: ResourceType) -> List[ResourceType]:
+        return [lesson_type] + [resource_type for resource_type in ResourceType if resource_type != lesson_type]
+
+    @staticmethod
+    def _resource_url(subject: Subject, skill: str) -> str:
+        slug = "-".join("".join(c if c.isalnum() else " " for c in skill.lower()).split())
+        return f"/resources/{subject.value.lower()}/{slug}"
+
+def latest_assessments(db: Session, student_ids: Sequence[int]) -> Dict[int, List]:
+    """Each student's most recent assessment per subject, grouped by student in input order."""
+    if not student_ids:
+        return {}
+    ranked = select(
+        Assessment.student_id,
+        Assessment.subject,
+        Assessment.skill_breakdown,
+        Assessment.learning_style,
+        Assessment.mastery_level,
+        func.row_number().over(
+            partition_by=(Assessment.student_id, Assessment.subject),
+            order_by=(Assessment.completed_date.desc(), Assessment.id.desc())
+        ).label("position")
+    ).where(Assessment.student_id.in_(student_ids)).subquery()
+
+    rows = db.execute(
+        select(ranked).where(ranked.c.position == 1).order_by(ranked.c.student_id, ranked.c.subject)
+    ).all()
+    by_student = {}
+    for row in rows:
+        by_student.setdefault(row.student_id, []).append(row)
+    return {student_id: by_student[student_id] for student_id in student_ids if student_id in by_student}
+
+def delete_plans(db: Session, student_ids: Sequence[int]) -> None:
+    """Delete the students' plan trees, leaves first, with one statement per table."""
+    plans = select(LearningPlan.id).where(LearningPlan.student_id.in_(student_ids))
+    subject_plans = select(SubjectPlan.id).where(SubjectPlan.learning_plan_id.in_(plans))
+    focus_areas = select(FocusArea.id).where(FocusArea.subject_plan_id.in_(subject_plans))
+    goals = select(LearningGoal.id).where(LearningGoal.learning_plan_id.in_(plans))
+
+    for stmt in (
+        delete(LearningActivity).where(LearningActivity.focus_area_id.in_(focus_areas)),
+        delete(FocusArea).where(FocusArea.subject_plan_id.in_(subject_plans)),
+        delete(WeeklyGoal).where(WeeklyGoal.subject_plan_id.in_(subject_plans)),
+        delete(SubjectPlan).where(SubjectPlan.learning_plan_id.in_(plans)),
+        delete(Milestone).where(Milestone.learning_goal_id.in_(goals)),
+        delete(LearningGoal).where(LearningGoal.learning_plan_id.in_(plans)),
+        delete(LearningResource).where(LearningResource.learning_plan_id.in_(plans)),
+        delete(LearningPlan).where(LearningPlan.student_id.in_(student_ids)),
+    ):
+        db.execute(stmt, execution_options={"synchronize_session": False})
+
+def write_plans(db: Session, plans: List[Dict]) -> List[int]:
+    """Insert LearningPlanCreate-shaped dicts level by level; returns plan ids in input order.
+
+    At most one plan per student, and subjects, focus area names and goal
+    descriptions must be unique within their parent: generated ids are
+    matched back to their rows on those keys.
+    """
+    now = datetime.utcnow()
+    plan_ids = _insert_returning(db, LearningPlan, ("student_id",), [
+        {"student_id": plan["student_id"], "created_at": now, "target_date": plan["target_date"]} for plan in plans
+    ])
+
+    subject_plans = [
+        (plan_id, subject_plan) for plan_id, plan in zip(plan_ids, plans) for subject_plan in plan["subjects"]
+    ]
+    subject_plan_ids = _insert_returning(db, SubjectPlan, ("learning_plan_id", "subject"), [
+        {"learning_plan_id": plan_id, "subject": subject_plan["subject"], "progress": subject_plan["progress"]}
+        for plan_id, subject_plan in subject_plans
+    ])
+
+    focus_areas = [
+        (subject_plan_id, focus_area)
+        for subject_plan_id, (_, subject_plan) in zip(subject_plan_ids, subject_plans)
+        for focus_area in subject_plan["focus_areas"]
+    ]
+    focus_area_ids = _insert_returning(db, FocusArea, ("subject_plan_id", "name"), [
+        {"subject_plan_id": subject_plan_id, **_columns(focus_area, "activities")}
+        for subject_plan_id, focus_area in focus_areas
+    ])
+    _insert(db, LearningActivity, [
+        {"focus_area_id": focus_area_id, **activity}
+        for focus_area_id, (_, focus_area) in zip(focus_area_ids, focus_areas)
+        for activity in focus_area["activities"]
+    ])
+    _insert(db, WeeklyGoal, [
+        {"subject_plan_id": subject_plan_id, **_columns(weekly_goal)}
+        for subject_plan_id, (_, subject_plan) in zip(subject_plan_ids, subject_plans)
+        for weekly_goal in subject_plan["weekly_goals"]
+    ])
+
+    goals = [(plan_id, goal) for plan_id, plan in zip(plan_ids, plans) for goal in plan["goals"]]
+    goal_ids = _insert_returning(db, LearningGoal, ("learning_plan_id", "description"), [
+        {"learning_plan_id": plan_id, **_columns(goal, "milestones")} for plan_id, goal in goals
+    ])
+    _insert(db, Milestone, [
+        {"learning_goal_id": goal_id, **_columns(milestone)}
+        for goal_id, (_, goal) in zip(goal_ids, goals)
+        for milestone in goal["milestones"]
+    ])
+    _insert(db, LearningResource, [
+        {"learning_plan_id": plan_id, **resource} for plan_id, plan in zip(plan_ids, plans) for resource in plan["resources"]
+    ])
+    return plan_ids
+
+def _columns(values: Dict, *children: str) -> Dict:
+    """Row values without child collections; completion flags are stored as integers."""
+    row = {key: value for key, value in values.items() if key not in children}
+    if "is_completed" in row:
+        row["is_completed"] = int(row["is_completed"])
+    return row
+
+# Core table inserts throughout: the ORM bulk path splits a batch into one
+# statement per row when nullable values alternate between None and set.
+def _insert_returning(db: Session, model, key: Tuple[str, ...], rows: List[Dict]) -> List[int]:
+    """Insert rows and return their ids in input order.
+
+    RETURNING is matched back on a natural key rather than requested in
+    parameter order, which SQLite can only honour one row per statement.
+    """
+    if not rows:
+        return []
+    keys = [tuple(row[column] for column in key) for row in rows]
+    if len(set(keys)) != len(keys):
+        raise ValueError(f"{model.__tablename__} rows must be unique on {key}")
+
+    table = model.__table__
+    returned = db.execute(insert(table).returning(table.c.id, *(table.c[column] for column in key)), rows)
+    ids = {tuple(values): row_id for row_id, *values in returned}
+    return [ids[row_key] for row_key in keys]
+
+def _insert(db: Session, model, rows: List[Dict]) -> None:
+    if rows:
+        db.execute(insert(model.__table__), rows)
+
+# Batch regeneration. Each worker process opens its own engine; connections
+# and sessions never cross the process boundary.
+_worker_sessionmaker = None
+_worker_generator = None
+
+def _init_worker(database_url: str) -> None:
+    global _worker_sessionmaker, _worker_generator
+    connect_args = {"timeout": 60} if make_url(database_url).get_backend_name() == "sqlite" else {}
+    engine = create_engine(database_url, poolclass=NullPool, connect_args=connect_args, **JSON_OPTIONS)
+    _worker_sessionmaker = sessionmaker(bind=engine, autoflush=False)
+    _worker_generator = PlanGenerator(AssessmentAnalyzer(), resource_catalog)
+
+def _regenerate_chunk(student_ids: List[int]) -> int:
+    """Regenerate one chunk of students in its own transaction; returns plans written."""
+    db = _worker_sessionmaker()
+    try:
+        written = len(_worker_generator.generate_many(db, student_ids))
+        db.commit()
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def student_id_chunks(db: Session, chunk_size: int) -> Iterator[List[int]]:
+    """Ids of students with assessments, in keyset-paged chunks."""
+    last_id = 0
+    while True:
+        chunk = db.execute(
+            select(Student.id).where(
+                Student.id > last_id,
+                select(Assessment.id).where(Assessment.student_id == Student.id).exists()
+            ).order_by(Student.id).limit(chunk_size)
+        ).scalars().all()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+def regenerate_all(database_url: str, workers: int = 0, chunk_size: int = 500) -> int:
+    """Regenerate every student's plan across a pool of worker processes.
+
+    Students are split into chunks of chunk_size, each generated and written
+    in one transaction by a worker; workers=0 uses one per CPU and workers=1
+    runs in-process. Returns the number of plans written.
+    """
+    workers = workers or os.cpu_count() or 1
+    _init_worker(database_url)
+    db = _worker_sessionmaker()
+    try:
+        # Load the catalog and materialize the chunks, then release the
+        # connection before forking; workers inherit the catalog pages
+        resource_catalog.load(db, freeze=workers > 1)
+        chunks = list(student_id_chunks(db, chunk_size))
+    finally:
+        db.close()
+
+    if workers == 1:
+        return sum(_regenerate_chunk(chunk) for chunk in chunks)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(database_url,)) as pool:
+        return sum(pool.map(_regenerate_chunk, chunks))
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import threading
+import time
+import orjson
+from collections import OrderedDict
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Sequence, Tuple
+from ..core.config import settings
+from ..core.request_profiling import timed
+from ..database import dialect_insert
+from ..models import AssessmentResponse, Difficulty, QuestionBankItem, Subject
+from ..schemas import QuestionCreate, QuestionBankItem as QuestionBankItemSchema
+
+# Fields that identify a question; questions agreeing on all of them (and the subject) share a bank item
+CONTENT_FIELDS = ("text", "options", "correct_answer", "explanation", "difficulty", "skill_category")
+
+# Columns of a served question set, in response-schema field order
+QUESTION_SET_COLUMNS = tuple(getattr(QuestionBankItem, field) for field in QuestionBankItemSchema.model_fields)
+
+def content_hash(subject: Subject, question: QuestionCreate) -> str:
+    """Hex SHA-256 of the subject and CONTENT_FIELDS as compact JSON, with enums by name.
+
+    Migration 0006 hashes the rows it moves the same way; keep them in step.
+    """
+    content = [Subject(subject).name] + [
+        value.name if isinstance(value, Difficulty) else value
+        for value in (getattr(question, field) for field in CONTENT_FIELDS)
+    ]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()).hexdigest()
+
+def response_rows(assessment_id: int, questions: Sequence[QuestionCreate], question_ids: Sequence[int]) -> List[Dict]:
+    """assessment_responses rows for one assessment's questions, in submission order."""
+    return [
+        {
+            "assessment_id": assessment_id,
+            "position": position,
+            "question_id": question_id,
+            "chosen_option": question.chosen_option,
+            "is_correct": None if question.chosen_option is None else question.chosen_option == question.correct_answer,
+        }
+        for position, (question, question_id) in enumerate(zip(questions, question_ids))
+    ]
+
+class QuestionBank:
+    """Process-wide access to the shared question bank.
+
+    intern() maps submitted questions to bank ids, inserting only questions
+    the bank has never seen. The most recent id_cache_size content_hash -> id
+    mappings are remembered, so resubmitting a known question costs no query.
+    Mappings learned inside a transaction only enter the cache when it
+    commits, so a rolled-back insert never leaves a dangling id behind.
+
+    Question sets, the first set_size bank items of a (subject, difficulty)
+    in id order, are kept as orjson-encoded bytes and served without touching
+    the database. A set is rebuilt when this worker commits new items to it,
+    or once it is older than refresh_interval for items other workers added.
+    """
+
+    def __init__(self, id_cache_size: int, set_size: int, refresh_interval: float):
+        self.id_cache_size = id_cache_size
+        self.set_size = set_size
+        self.refresh_interval = refresh_interval
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        self._sets: Dict[Tuple[Subject, Difficulty], Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        self.id_hits = 0
+        self.id_misses = 0
+        self.inserted = 0
+        self.set_hits = 0
+        self.set_loads = 0
+
+    def intern(self, db: Session, questions: Sequence[Tuple[Subject, QuestionCreate]]) -> List[int]:
+        """Bank ids of (subject, question) pairs, inserting missing items in the caller's transaction.
+
+        Does not commit. AsyncSession callers use db.run_sync(question_bank.intern, ...).
+        """
+        hashes = [content_hash(subject, question) for subject, question in questions]
+        ids: Dict[str, int] = {}
+        missing: Dict[str, Tuple[Subject, QuestionCreate]] = {}
+        with self._lock:
+            for digest, item in zip(hashes, questions):
+                question_id = self._ids.get(digest)
+                if question_id is not None:
+                    self._ids.move_to_end(digest)
+                    ids[digest] = question_id
+                    self.id_hits += 1
+                elif digest not in missing:
+                    missing[digest] = item
+                    self.id_misses += 1
+        if missing:
+            found = self._lookup(db, missing)
+            new = {digest: item for digest, item in missing.items() if digest not in found}
+            if new:
+                inserted = self._insert(db, new)
+                found.update(inserted)
+                db.info["question_bank_inserted"] = db.info.get("question_bank_inserted", 0) + len(inserted)
+                # Rows a concurrent transaction inserted first
+                lost = {digest for digest in new if digest not in inserted}
+                if lost:
+                    found.update(self._lookup(db, lost))
+            ids.update(found)
+            learned = db.info.setdefault("question_bank_ids", {})
+            learned.update(found)
+            if new:
+                db.info.setdefault("question_bank_sets", set()).update(
+                    (Subject(subject), question.difficulty) for subject, question in new.values()
+                )
+        return [ids[digest] for digest in hashes]
+
+    def record_responses(self, db: Session, assessment_id: int, subject: Subject,
+                         questions: Sequence[QuestionCreate]) -> None:
+        """Intern an assessment's questions and insert its response rows in the caller's transaction."""
+        if not questions:
+            return
+        question_ids = self.intern(db, [(subject, question) for question in questions])
+        db.execute(insert(AssessmentResponse), response_rows(assessment_id, questions, question_ids))
+
+    def cached_set(self, subject: Subject, difficulty: Difficulty) -> Optional[bytes]:
+        """The encoded question set if it is cached and fresh, else None."""
+        entry = self._sets.get((subject, difficulty))
+        if entry is None or time.monotonic() - entry[0] >= self.refresh_interval:
+            return None
+        self.set_hits += 1
+        return entry[1]
+
+    def load_set(self, db: Session, subject: Subject, difficulty: Difficulty) -> bytes:
+        """Read and encode one question set and cache it."""
+        result = db.execute(
+            select(*QUESTION_SET_COLUMNS).where(
+                QuestionBankItem.subject == subject,
+                QuestionBankItem.difficulty == difficulty
+            ).order_by(QuestionBankItem.id).limit(self.set_size)
+        )
+        fields = tuple(result.keys())
+        rows = [dict(zip(fields, row)) for row in result]
+        with timed("serialization"):
+            body = orjson.dumps(rows)
+        with self._lock:
+            self._sets[(subject, difficulty)] = (time.monotonic(), body)
+            self.set_loads += 1
+        return body
+
+    def question_set(self, db: Session, subject: Subject, difficulty: Difficulty) -> bytes:
+        """The encoded question set, from the cache when fresh."""
+        body = self.cached_set(subject, difficulty)
+        if body is None:
+            body = self.load_set(db, subject, difficulty)
+        return body
+
+    def remember(self, ids: Dict[str, int], sets: Sequence[Tuple[Subject, Difficulty]] = (), inserted: int = 0) -> None:
+        """Cache committed content_hash -> id mappings and drop question sets that gained items.
+
+        inserted is how many of the committed items are new bank rows.
+        """
+        with self._lock:
+            self.inserted += inserted
+            for digest, question_id in ids.items():
+                self._ids[digest] = question_id
+                self._ids.move_to_end(digest)
+            while len(self._ids) > self.id_cache_size:
+                self._ids.popitem(last=False)
+            for key in sets:
+                self._sets.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self._sets.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.id_hits + self.id_misses
+            return {
+                "ids_cached": len(self._ids),
+                "id_cache_size": self.id_cache_size,
+                "id_hits": self.id_hits,
+                "id_misses": self.id_misses,
+                "id_hit_ratio": self.id_hits / lookups if lookups else 0.0,
+                "inserted": self.inserted,
+                "sets_cached": len(self._sets),
+                "set_bytes": sum(len(body) for _, body in self._sets.values()),
+                "set_hits": self.set_hits,
+                "set_loads": self.set_loads,
+            }
+
+    @staticmethod
+    def _lookup(db: Session, hashes) -> Dict[str, int]:
+        return dict(db.execute(
+            select(QuestionBankItem.content_hash, QuestionBankItem.id)
+            .where(QuestionBankItem.content_hash.in_(list(hashes)))
+        ).all())
+
+    def _insert(self, db: Session, new: Dict[str, Tuple[Subject, QuestionCreate]]) -> Dict[str, int]:
+        """Insert new items; returns content_hash -> id of the rows this transaction inserted."""
+        rows = [
+            {"content_hash": digest, "subject": subject, **question.model_dump(include=set(CONTENT_FIELDS))}
+            for digest, (subject, question) in new.items()
+        ]
+        upsert = dialect_insert(db)
+        if upsert is not None:
+            # A concurrent transaction inserting the same question wins; its id is read back by the caller
+            stmt = upsert(QuestionBankItem).on_conflict_do_nothing(index_elements=["content_hash"])
+        else:
+            stmt = insert(QuestionBankItem)
+        return dict(db.execute(stmt.returning(QuestionBankItem.content_hash, QuestionBankItem.id), rows).all())
+
+question_bank = QuestionBank(
+    settings.QUESTION_BANK_ID_CACHE_SIZE,
+    settings.QUESTION_SET_SIZE,
+    settings.QUESTION_SET_REFRESH_SECONDS,
+)
+
+# Ids resolved in a transaction are cached, and question sets that gained
+# items are dropped, only once it commits
+@event.listens_for(Session, "after_commit")
+def _remember_question_ids(session):
+    ids = session.info.pop("question_bank_ids", None)
+    sets = session.info.pop("question_bank_sets", ())
+    inserted = session.info.pop("question_bank_inserted", 0)
+    if ids:
+        question_bank.remember(ids, sets, inserted)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_question_ids(session):
+    session.info.pop("question_bank_ids", None)
+    session.info.pop("question_bank_sets", None)
+    session.info.pop("question_bank_inserted", None)
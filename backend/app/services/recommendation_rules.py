@@ -0,0 +1,239 @@
+import json
+import math
+import os
+import threading
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from ..core.config import settings
+from ..models import Subject
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "recommendation_rules.json")
+
+# Rule skill that expands to one rule per skill, with {skill} in the messages
+EVERY_SKILL = "*"
+
+SUBJECT_CODES = {subject: code for code, subject in enumerate(Subject)}
+
+# Compiled vocabularies kept before starting over; batches with skills
+# outside the analyzer's table each add one
+MAX_VOCABULARIES = 64
+
+class RecommendationRule(NamedTuple):
+    """Fires when a score falls in [at_least, below).
+
+    The score is the named skill's, each skill's in turn for EVERY_SKILL, or
+    the mean over all skills when skill is None. A rule for a skill the
+    breakdown lacks does not fire; subject=None matches every subject.
+    """
+    id: str
+    messages: Tuple[str, ...]
+    subject: Optional[Subject] = None
+    skill: Optional[str] = None
+    at_least: float = -math.inf
+    below: float = math.inf
+
+class CompiledRules(NamedTuple):
+    """A rule table expanded against one skill vocabulary, one row per (rule, skill)."""
+    rule: np.ndarray       # index into RuleSet.rules, for firing statistics
+    column: np.ndarray     # skill column; len(skills) selects the mean over all skills
+    subject: np.ndarray    # subject code, or -1 for any subject
+    at_least: np.ndarray
+    below: np.ndarray
+    messages: List[Tuple[int, ...]]  # interned message ids per row
+    texts: List[str]                 # message id -> text
+    rows: List[Tuple]                # (rule, skill or None, subject, at_least, below, messages) for evaluate_one
+
+def load_rules(path: str) -> List[RecommendationRule]:
+    """Read a rule table from a JSON file of the form {"rules": [{"id": ..., "messages": [...], ...}]}."""
+    with open(path) as rules_file:
+        table = json.load(rules_file)
+
+    rules, seen = [], set()
+    for entry in table["rules"]:
+        rule_id = entry.get("id")
+        if not rule_id or rule_id in seen:
+            raise ValueError(f"Recommendation rule ids must be present and unique: {rule_id!r}")
+        seen.add(rule_id)
+        if not entry.get("messages"):
+            raise ValueError(f"Recommendation rule {rule_id!r} has no messages")
+        rules.append(RecommendationRule(
+            id=rule_id,
+            messages=tuple(entry["messages"]),
+            subject=Subject(entry["subject"]) if entry.get("subject") is not None else None,
+            skill=entry.get("skill"),
+            at_least=float(entry.get("at_least", -math.inf)),
+            below=float(entry.get("below", math.inf)),
+        ))
+    return rules
+
+class RuleSet:
+    """Recommendation rules evaluated as array comparisons over a batch of skill breakdowns.
+
+    The table is compiled once per skill vocabulary into parallel arrays;
+    evaluation compares every (assessment, rule row) pair at once. Messages
+    come out in rule-table order (EVERY_SKILL rows in vocabulary order,
+    which AssessmentAnalyzer makes canonical),
+    each at most once, and are interned so identical recommendations share
+    one string. Firing counts per rule are kept for the metrics endpoint.
+    """
+
+    def __init__(self, rules: Sequence[RecommendationRule]):
+        self.rules = list(rules)
+        self.messages: List[str] = []
+        self._message_ids: Dict[str, int] = {}
+        self._compiled: Dict[Tuple[str, ...], CompiledRules] = {}
+        self._fired = np.zeros(len(self.rules), dtype=np.int64)
+        self._evaluated = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        return cls(load_rules(path))
+
+    def evaluate(
+        self,
+        subjects: Sequence[Subject],
+        scores: np.ndarray,
+        present: np.ndarray,
+        skills: Sequence[str]
+    ) -> List[List[str]]:
+        """Recommendations for each row of an (assessments x skills) score matrix.
+
+        present marks which skills each assessment's breakdown contains;
+        skills names the matrix columns.
+        """
+        n_assessments = len(subjects)
+        if n_assessments == 0:
+            return []
+        compiled = self._compile(tuple(skills))
+
+        # The mean is appended as an extra column for the rules scored on it
+        n_skills = len(skills)
+        values = np.empty((n_assessments, n_skills + 1), dtype=np.float64)
+        values[:, :n_skills] = scores
+        has_value = np.empty(values.shape, dtype=bool)
+        has_value[:, :n_skills] = present
+        counts = present.sum(axis=1)
+        np.greater(counts, 0, out=has_value[:, n_skills])
+        np.divide(np.where(present, scores, 0).sum(axis=1), counts, out=values[:, n_skills], where=has_value[:, n_skills])
+        values = values[:, compiled.column]
+        has_value = has_value[:, compiled.column]
+        subject_codes = np.fromiter((SUBJECT_CODES[Subject(s)] for s in subjects), dtype=np.int64, count=n_assessments)
+
+        fired = (
+            has_value
+            & (values >= compiled.at_least)
+            & (values < compiled.below)
+            & ((compiled.subject < 0) | (subject_codes[:, None] == compiled.subject))
+        )
+
+        with self._lock:
+            np.add.at(self._fired, compiled.rule, fired.sum(axis=0))
+            self._evaluated += n_assessments
+
+        # nonzero walks row-major, so each assessment's rows stay in table order
+        assessment_idx, row_idx = np.nonzero(fired)
+        bounds = np.searchsorted(assessment_idx, np.arange(n_assessments + 1)).tolist()
+        row_idx = row_idx.tolist()
+        texts, row_messages = compiled.texts, compiled.messages
+        results = []
+        for i in range(n_assessments):
+            message_ids = dict.fromkeys(
+                message_id for row in row_idx[bounds[i]:bounds[i + 1]] for message_id in row_messages[row]
+            )
+            results.append([texts[message_id] for message_id in message_ids])
+        return results
+
+    def evaluate_one(self, subject: Subject, skill_breakdown: Dict[str, int], skills: Sequence[str]) -> List[str]:
+        """evaluate() for a single breakdown, walking the compiled rows without array set-up.
+
+        skills must list every skill in the breakdown; results match evaluate().
+        """
+        compiled = self._compile(tuple(skills))
+        subject_code = SUBJECT_CODES[Subject(subject)]
+        mean = sum(skill_breakdown.values()) / len(skill_breakdown) if skill_breakdown else None
+
+        fired_rules, message_ids = [], {}
+        for rule, skill, rule_subject, at_least, below, row_messages in compiled.rows:
+            if rule_subject >= 0 and rule_subject != subject_code:
+                continue
+            value = mean if skill is None else skill_breakdown.get(skill)
+            if value is not None and at_least <= value < below:
+                fired_rules.append(rule)
+                message_ids.update(dict.fromkeys(row_messages))
+
+        with self._lock:
+            for rule in fired_rules:
+                self._fired[rule] += 1
+            self._evaluated += 1
+        return [compiled.texts[message_id] for message_id in message_ids]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            fired = self._fired.tolist()
+            return {
+                "rules": len(self.rules),
+                "messages": len(self.messages),
+                "vocabularies": len(self._compiled),
+                "evaluated": self._evaluated,
+                "fired": {rule.id: count for rule, count in zip(self.rules, fired)},
+            }
+
+    def _compile(self, skills: Tuple[str, ...]) -> CompiledRules:
+        compiled = self._compiled.get(skills)
+        if compiled is not None:
+            return compiled
+
+        with self._lock:
+            compiled = self._compiled.get(skills)
+            if compiled is not None:
+                return compiled
+            if len(self._compiled) >= MAX_VOCABULARIES:
+                # Fresh containers: batches still holding an old compilation keep its texts
+                self._compiled = {}
+                self.messages = []
+                self._message_ids = {}
+            columns = {skill: i for i, skill in enumerate(skills)}
+            rows = []
+            for rule_index, rule in enumerate(self.rules):
+                if rule.skill is None:
+                    targets = [(len(skills), None)]
+                elif rule.skill == EVERY_SKILL:
+                    targets = [(column, skill) for skill, column in columns.items()]
+                elif rule.skill in columns:
+                    targets = [(columns[rule.skill], rule.skill)]
+                else:
+                    continue
+                for column, skill in targets:
+                    message_ids = tuple(
+                        self._intern(template.format(skill=skill) if rule.skill == EVERY_SKILL else template)
+                        for template in rule.messages
+                    )
+                    rows.append((rule_index, column, skill, rule, message_ids))
+
+            rows = [
+                (rule_index, skill, SUBJECT_CODES[rule.subject] if rule.subject is not None else -1,
+                 rule.at_least, rule.below, message_ids, column)
+                for rule_index, column, skill, rule, message_ids in rows
+            ]
+            compiled = CompiledRules(
+                rule=np.array([row[0] for row in rows], dtype=np.int64),
+                column=np.array([row[6] for row in rows], dtype=np.int64),
+                subject=np.array([row[2] for row in rows], dtype=np.int64),
+                at_least=np.array([row[3] for row in rows], dtype=np.float64),
+                below=np.array([row[4] for row in rows], dtype=np.float64),
+                messages=[row[5] for row in rows],
+                texts=self.messages,
+                rows=[row[:6] for row in rows],
+            )
+            self._compiled[skills] = compiled
+        return compiled
+
+    def _intern(self, message: str) -> int:
+        message_id = self._message_ids.get(message)
+        if message_id is None:
+            message_id = self._message_ids[message] = len(self.messages)
+            self.messages.append(message)
+        return message_id
+
+recommendation_rules = RuleSet.from_file(settings.RECOMMENDATION_RULES_PATH or DEFAULT_RULES_PATH)
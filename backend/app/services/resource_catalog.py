@@ -0,0 +1,171 @@
+import gc
+import threading
+import time
+from array import array
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from ..core.config import settings
+from ..models import LearningResource, Subject, Difficulty, ResourceType
+
+class CatalogResource(NamedTuple):
+    id: int
+    title: str
+    description: str
+    type: ResourceType
+    url: str
+    subject: Subject
+    difficulty: Difficulty
+    skill_category: str
+
+CATALOG_COLUMNS = [getattr(LearningResource, field) for field in CatalogResource._fields]
+
+class ResourceCatalog:
+    """Immutable inverted index over catalog resources.
+
+    Postings for each (subject, difficulty, skill_category, type) key are
+    contiguous, id-ordered runs of one flat array('q'), addressed by
+    (start, stop) offsets. The array is a single buffer that lookups only
+    read, so after a fork its pages stay shared with the parent. The
+    CatalogResource tuples are not: returning one changes its reference
+    count, so a child copies the page of every resource it serves.
+    """
+
+    def __init__(self, resources: Iterable[CatalogResource] = ()):
+        resources = sorted(resources, key=lambda r: (self._key(r), r.id))
+        self._resources: Dict[int, CatalogResource] = {r.id: r for r in resources}
+        self._ids = array("q", (r.id for r in resources))
+        self._postings: Dict[Tuple, Tuple[int, int]] = {}
+        start = 0
+        for position in range(1, len(resources) + 1):
+            if position == len(resources) or self._key(resources[position]) != self._key(resources[start]):
+                self._postings[self._key(resources[start])] = (start, position)
+                start = position
+        self.last_id = max(self._resources, default=0)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get(self, resource_id: int) -> Optional[CatalogResource]:
+        return self._resources.get(resource_id)
+
+    def top_n(
+        self,
+        subject: Subject,
+        skills: Sequence[str],
+        difficulties: Optional[Sequence[Difficulty]] = None,
+        resource_types: Optional[Sequence[ResourceType]] = None,
+        n: int = 5,
+        per_skill: Optional[int] = None
+    ) -> List[CatalogResource]:
+        """Top n resources for skills, in preference order.
+
+        Results are ordered by skill (weakest first, as given), then by
+        difficulty and resource type in the order given (all values when
+        None), then by id. per_skill caps how many each skill contributes.
+        """
+        subject = Subject(subject)
+        difficulties = list(Difficulty) if difficulties is None else [Difficulty(d) for d in difficulties]
+        resource_types = list(ResourceType) if resource_types is None else [ResourceType(t) for t in resource_types]
+        per_skill = n if per_skill is None else per_skill
+
+        results = []
+        for skill in dict.fromkeys(skills):
+            taken = 0
+            for difficulty in difficulties:
+                for resource_type in resource_types:
+                    span = self._postings.get((subject, difficulty, skill, resource_type))
+                    if span is None:
+                        continue
+                    for resource_id in self._ids[span[0]:span[0] + min(span[1] - span[0], per_skill - taken)]:
+                        results.append(self._resources[resource_id])
+                        taken += 1
+                        if len(results) == n:
+                            return results
+                    if taken == per_skill:
+                        break
+                if taken == per_skill:
+                    break
+        return results
+
+    def merged(self, resources: Iterable[CatalogResource]) -> "ResourceCatalog":
+        """A new catalog with resources added or replaced by id."""
+        combined = dict(self._resources)
+        combined.update((r.id, r) for r in resources)
+        return ResourceCatalog(combined.values())
+
+    @staticmethod
+    def _key(resource: CatalogResource) -> Tuple:
+        return (resource.subject, resource.difficulty, resource.skill_category, resource.type)
+
+class ResourceCatalogIndex:
+    """Process-wide holder of the current ResourceCatalog.
+
+    Readers take the `catalog` snapshot without locking; load() and refresh()
+    build a new catalog and swap the reference. refresh() only fetches rows
+    past the highest id already indexed, so edits and deletions of existing
+    catalog rows need a full load().
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.catalog = ResourceCatalog()
+        self.loaded = False
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, db: Session, freeze: bool = False) -> int:
+        """Rebuild the catalog from every catalog row; returns its size.
+
+        With freeze=True the loaded objects are moved out of the garbage
+        collector's reach (gc.freeze), so collections in forked workers do
+        not write to, and copy, every page of the catalog; only the pages
+        of resources a worker actually returns are copied. Use it when
+        loading in a pre-fork parent.
+        """
+        with self._lock:
+            self.catalog = ResourceCatalog(self._fetch(db, after_id=0))
+            self.loaded = True
+            self._refreshed_at = time.monotonic()
+        if freeze:
+            gc.freeze()
+        return len(self.catalog)
+
+    def refresh(self, db: Session) -> int:
+        """Index catalog rows added since the last load or refresh; returns how many."""
+        with self._lock:
+            resources = self._fetch(db, after_id=self.catalog.last_id)
+            if resources:
+                self.catalog = self.catalog.merged(resources)
+            self.loaded = True
+            self._refreshed_at = time.monotonic()
+        return len(resources)
+
+    def current(self, db: Session) -> ResourceCatalog:
+        """The catalog, loading or refreshing first when it is missing or older than refresh_interval."""
+        if not self.loaded:
+            self.load(db)
+        elif time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh(db)
+        return self.catalog
+
+    def stats(self) -> Dict:
+        return {
+            "resources": len(self.catalog),
+            "keys": len(self.catalog._postings),
+            "last_id": self.catalog.last_id,
+            "age_seconds": round(time.monotonic() - self._refreshed_at, 1) if self.loaded else None,
+        }
+
+    @staticmethod
+    def _fetch(db: Session, after_id: int) -> List[CatalogResource]:
+        rows = db.execute(
+            select(*CATALOG_COLUMNS).where(
+                LearningResource.learning_plan_id.is_(None),
+                LearningResource.skill_category.isnot(None),
+                LearningResource.id > after_id
+            ).order_by(LearningResource.id)
+        )
+        return [CatalogResource(*row) for row in rows]
+
+resource_catalog = ResourceCatalogIndex(settings.RESOURCE_CATALOG_REFRESH_SECONDS)
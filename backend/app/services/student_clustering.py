@@ -0,0 +1,286 @@
+import bisect
+import time
+import numpy as np
+from datetime import datetime
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from ..database import dialect_insert
+from ..models import Assessment, StudentCluster, StudentClusterModel
+from .assessment_analyzer import AssessmentAnalyzer
+
+# Ids missing below the watermark are looked for again this long, so an
+# assessment whose transaction commits after a later-numbered one is folded
+# in late rather than never; gaps left by rolled-back inserts then expire
+GAP_RECHECK_SECONDS = 600.0
+# Oldest gaps are dropped beyond this many ranges
+MAX_ID_GAPS = 1000
+
+class StudentClusterer:
+    """Incremental student clustering over the fixed skill feature space.
+
+    Centroids are fitted with mini-batch k-means updates over assessments newer
+    than the model's watermark and persisted in student_cluster_models. Each
+    student's cluster is precomputed into student_clusters so reads never fit.
+    """
+
+    def __init__(self, analyzer: AssessmentAnalyzer, batch_size: int = 1000):
+        self.analyzer = analyzer
+        self.batch_size = batch_size
+
+    def get_clusters(self, db: Session, n_clusters: int) -> Optional[Dict[int, List[int]]]:
+        """Read precomputed assignments; None if no fitted model exists for n_clusters."""
+        model = self._get_model(db, n_clusters)
+        if model is None or model.centroids is None:
+            return None
+
+        clusters = {i: [] for i in range(n_clusters)}
+        rows = db.query(StudentCluster.student_id, StudentCluster.cluster_id).filter(
+            StudentCluster.n_clusters == n_clusters
+        ).order_by(StudentCluster.student_id)
+        for student_id, cluster_id in rows:
+            clusters[cluster_id].append(student_id)
+        return clusters
+
+    def assign(self, db: Session, assessment: Assessment, cluster_counts: Sequence[int]) -> None:
+        """Assign a newly created assessment's student to the nearest existing centroids.
+
+        Runs in the caller's transaction. The assessment is folded into the
+        centroids later by update().
+        """
+        self.assign_many(
+            db, [(assessment.id, assessment.student_id, assessment.skill_breakdown)], cluster_counts
+        )
+
+    def assign_many(self, db: Session, assessments: Sequence[tuple], cluster_counts: Sequence[int]) -> None:
+        """Assign a batch of (assessment_id, student_id, skill_breakdown) in the caller's transaction.
+
+        Later entries win when a student appears more than once.
+        """
+        if not assessments:
+            return
+        features = self.analyzer.skill_feature_matrix([skill_breakdown or {} for _, _, skill_breakdown in assessments])
+        for n_clusters in cluster_counts:
+            model = self._get_model(db, n_clusters)
+            centroids = self._centroids(model)
+            if centroids is None:
+                continue
+            labels = self._predict(centroids, features).tolist()
+            self._save_assignments(db, n_clusters, {
+                student_id: (assessment_id, label)
+                for (assessment_id, student_id, _), label in zip(assessments, labels)
+            })
+
+    def update(self, db: Session, n_clusters: int, on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """Fold assessments past the watermark into the model, one mini-batch per transaction.
+
+        Ids are allocated before commit, so the watermark can pass an
+        assessment that commits later; such ids are kept in id_gaps and
+        fetched with every batch for GAP_RECHECK_SECONDS. Returns the number of assessments consumed; on_batch gets the running
+        count after each committed batch.
+        """
+        model = self._get_model(db, n_clusters) or self._create_model(db, n_clusters)
+        model.id_gaps = self._next_gaps(model.id_gaps or [], model.last_assessment_id, [])
+        consumed = 0
+        while True:
+            batch = db.query(
+                Assessment.id, Assessment.student_id, Assessment.skill_breakdown
+            ).filter(or_(
+                Assessment.id > model.last_assessment_id,
+                *(Assessment.id.between(first, last) for first, last, _ in model.id_gaps)
+            )).order_by(Assessment.id).limit(self.batch_size).all()
+            if not batch:
+                break
+            if not self._fit_batch(db, model, batch):
+                # Too few assessments to seed the centroids yet
+                break
+            db.commit()
+            consumed += len(batch)
+            if on_batch is not None:
+                on_batch(consumed)
+        # Keep expired gaps dropped even when there was nothing to fold
+        db.commit()
+        return consumed
+
+    def reassign_all(self, db: Session, n_clusters: int, on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """Recompute every stored assignment against the current centroids.
+
+        Centroids drift as mini-batches arrive; this refreshes students whose
+        latest assessment predates the drift. Returns the number of students
+        updated; on_batch gets the running count after each committed batch.
+        """
+        model = self._get_model(db, n_clusters)
+        centroids = self._centroids(model)
+        if centroids is None:
+            return 0
+
+        updated = 0
+        last_student_id = 0
+        while True:
+            rows = db.query(
+                StudentCluster.student_id, Assessment.id, Assessment.skill_breakdown
+            ).join(
+                Assessment, StudentCluster.assessment_id == Assessment.id
+            ).filter(
+                StudentCluster.n_clusters == n_clusters,
+                StudentCluster.student_id > last_student_id
+            ).order_by(StudentCluster.student_id).limit(self.batch_size).all()
+            if not rows:
+                break
+            labels = self._predict(centroids, self.analyzer.skill_feature_matrix(
+                [row.skill_breakdown or {} for row in rows]
+            ))
+            self._save_assignments(db, n_clusters, {
+                row.student_id: (row.id, label) for row, label in zip(rows, labels.tolist())
+            })
+            db.commit()
+            updated += len(rows)
+            last_student_id = rows[-1].student_id
+            if on_batch is not None:
+                on_batch(updated)
+
+        # Bump the model so analytics caches keyed on its version refresh
+        model.updated_at = datetime.utcnow()
+        db.commit()
+        return updated
+
+    def _fit_batch(self, db: Session, model: StudentClusterModel, batch) -> bool:
+        """Apply one mini-batch k-means step and reassign the batch's students."""
+        n_clusters = model.n_clusters
+        features = self.analyzer.skill_feature_matrix([row.skill_breakdown or {} for row in batch])
+        centroids = self._centroids(model)
+
+        if centroids is None:
+            if len(np.unique(features, axis=0)) < n_clusters:
+                return False
+            centroids = self.analyzer.fit_cluster_centroids(features, n_clusters)
+            counts = np.zeros(n_clusters, dtype=np.int64)
+        else:
+            counts = np.asarray(model.counts, dtype=np.int64)
+
+        # Each centroid moves to the running mean of every point assigned to it
+        labels = self._predict(centroids, features)
+        batch_counts = np.bincount(labels, minlength=n_clusters)
+        batch_sums = np.zeros_like(centroids)
+        np.add.at(batch_sums, labels, features)
+        new_counts = counts + batch_counts
+        moved = batch_counts > 0
+        centroids[moved] = (
+            centroids[moved] * counts[moved, None] + batch_sums[moved]
+        ) / new_counts[moved, None]
+
+        model.features = self.analyzer.skill_features
+        model.centroids = centroids.tolist()
+        model.counts = new_counts.tolist()
+        # Gap rows sort first, so the batch's last id is never below the watermark
+        model.id_gaps = self._next_gaps(model.id_gaps or [], model.last_assessment_id, [row.id for row in batch])
+        model.last_assessment_id = max(model.last_assessment_id, batch[-1].id)
+
+        # Rows are ordered by id, so later assessments overwrite earlier ones
+        labels = self._predict(centroids, features)
+        assignments = {}
+        for row, label in zip(batch, labels.tolist()):
+            assignments[row.student_id] = (row.id, label)
+        self._save_assignments(db, n_clusters, assignments)
+        return True
+
+    def _get_model(self, db: Session, n_clusters: int) -> Optional[StudentClusterModel]:
+        return db.query(StudentClusterModel).filter(StudentClusterModel.n_clusters == n_clusters).first()
+
+    def _create_model(self, db: Session, n_clusters: int) -> StudentClusterModel:
+        model = StudentClusterModel(n_clusters=n_clusters, features=self.analyzer.skill_features, last_assessment_id=0)
+        db.add(model)
+        db.flush()
+        return model
+
+    def _centroids(self, model: Optional[StudentClusterModel]) -> Optional[np.ndarray]:
+        """Return the model's centroids, or None if unfitted or fitted on a different feature space."""
+        if model is None or model.centroids is None:
+            return None
+        if model.features != self.analyzer.skill_features:
+            # The skill list changed; refit from scratch
+            model.centroids = None
+            model.counts = None
+            model.last_assessment_id = 0
+            model.id_gaps = None
+            return None
+        return np.asarray(model.centroids, dtype=np.float64)
+
+    @staticmethod
+    def _next_gaps(gaps: List[list], watermark: int, ids: Sequence[int]) -> List[list]:
+        """Gap ranges after folding the sorted ids: found ids leave their gap, ids
+        skipped past the watermark open new gaps and gaps past GAP_RECHECK_SECONDS expire."""
+        now = time.time()
+        next_gaps = []
+        for first, last, noticed_at in gaps:
+            if now - noticed_at < GAP_RECHECK_SECONDS:
+                next_gaps.extend([start, end, noticed_at] for start, end in _missing_ranges(first, last, ids))
+        if ids and ids[-1] > watermark:
+            next_gaps.extend([start, end, now] for start, end in _missing_ranges(watermark + 1, ids[-1], ids))
+        return next_gaps[-MAX_ID_GAPS:]
+
+    @staticmethod
+    def _predict(centroids: np.ndarray, features: np.ndarray) -> np.ndarray:
+        distances = ((features[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    @staticmethod
+    def _save_assignments(db: Session, n_clusters: int, assignments: Dict[int, tuple]) -> None:
+        """Upsert {student_id: (assessment_id, cluster_id)} for one cluster count.
+
+        A stored assignment of a newer assessment is kept: gap rows folded
+        in late must not replace the cluster of a student's latest assessment.
+        """
+        if not assignments:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "student_id": student_id,
+                "n_clusters": n_clusters,
+                "assessment_id": assessment_id,
+                "cluster_id": cluster_id,
+                "updated_at": now,
+            }
+            for student_id, (assessment_id, cluster_id) in assignments.items()
+        ]
+
+        upsert = dialect_insert(db)
+        if upsert is not None:
+            stmt = upsert(StudentCluster).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["student_id", "n_clusters"],
+                set_={
+                    "assessment_id": stmt.excluded.assessment_id,
+                    "cluster_id": stmt.excluded.cluster_id,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+                where=or_(
+                    StudentCluster.assessment_id.is_(None),
+                    stmt.excluded.assessment_id >= StudentCluster.assessment_id
+                )
+            )
+            db.execute(stmt)
+            return
+
+        stored = dict(db.query(StudentCluster.student_id, StudentCluster.assessment_id).filter(
+            StudentCluster.n_clusters == n_clusters,
+            StudentCluster.student_id.in_(list(assignments))
+        ))
+        for row in rows:
+            latest = stored.get(row["student_id"])
+            if latest is not None and row["assessment_id"] < latest:
+                continue
+            db.merge(StudentCluster(**row))
+
+def _missing_ranges(first: int, last: int, ids: Sequence[int]) -> List[Tuple[int, int]]:
+    """Ranges of [first, last] not in the sorted ids."""
+    ranges = []
+    start = first
+    for position in range(bisect.bisect_left(ids, first), bisect.bisect_right(ids, last)):
+        if ids[position] > start:
+            ranges.append((start, ids[position] - 1))
+        start = ids[position] + 1
+    if start <= last:
+        ranges.append((start, last))
+    return ranges
@@ -0,0 +1,213 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from ..database import dialect_insert
+from ..models import Assessment, MasteryLevel, StudentProgress, Subject
+
+class ScoreEvent(NamedTuple):
+    student_id: int
+    subject: Subject
+    score: float
+    mastery_level: Optional[MasteryLevel]
+    completed_date: datetime
+
+BACKFILL_BATCH_SIZE = 5000
+
+def record_assessment(db: Session, assessment: Assessment, alpha: float) -> None:
+    """Fold a flushed assessment into its student's progress series in the caller's transaction.
+
+    Does not commit; create_assessment commits the assessment and the
+    progress update together.
+    """
+    record_scores(db, [ScoreEvent(
+        assessment.student_id, assessment.subject, assessment.score,
+        assessment.mastery_level, assessment.completed_date or datetime.utcnow()
+    )], alpha)
+
+def record_scores(db: Session, events: Sequence[ScoreEvent], alpha: float) -> None:
+    """Fold score events into the progress series in the caller's transaction.
+
+    Each (student, subject) series costs one locked read of its latest
+    bucket, shared across the batch, and one row update or upsert per
+    bucket touched, however long the series already is.
+    """
+    if not events:
+        return
+
+    latest = _latest_buckets(db, {(event.student_id, event.subject) for event in events})
+    for event in sorted(events, key=lambda event: event.completed_date):
+        key = (event.student_id, event.subject)
+        bucket = latest.get(key)
+        # completed_date is server-assigned, so buckets only move forward;
+        # an event dated before the latest bucket is folded into it
+        bucket_date = event.completed_date.date()
+        if bucket is None or bucket_date > bucket.bucket_date:
+            previous_ewma = bucket.ewma_score if bucket is not None else event.score
+            bucket = _open_bucket(db, event.student_id, event.subject, bucket_date, previous_ewma)
+            latest[key] = bucket
+        bucket.assessment_count, bucket.mean_score, bucket.ewma_score = _fold(
+            bucket.assessment_count, bucket.mean_score, bucket.ewma_score, event.score, alpha
+        )
+        bucket.last_mastery_level = event.mastery_level
+
+def get_progress(
+    db: Session,
+    student_id: int,
+    subject: Optional[Subject] = None,
+    since: Optional[date] = None
+) -> List[StudentProgress]:
+    """Progress buckets for a student ordered by subject and date; reads the unique-key index."""
+    query = db.query(StudentProgress).filter(StudentProgress.student_id == student_id)
+    if subject is not None:
+        query = query.filter(StudentProgress.subject == subject)
+    if since is not None:
+        query = query.filter(StudentProgress.bucket_date >= since)
+    return query.order_by(StudentProgress.subject, StudentProgress.bucket_date).all()
+
+def rebuild_progress(db: Session, alpha: float) -> int:
+    """Recompute every series from the assessments table in one ordered pass.
+
+    Used to backfill existing data or after changing alpha; returns the
+    number of buckets written.
+    """
+    db.query(StudentProgress).delete(synchronize_session=False)
+    rows = db.execute(
+        select(
+            Assessment.student_id, Assessment.subject, Assessment.score,
+            Assessment.mastery_level, Assessment.completed_date
+        ).where(
+            Assessment.score.isnot(None), Assessment.completed_date.isnot(None)
+        ).order_by(
+            Assessment.student_id, Assessment.subject, Assessment.completed_date, Assessment.id
+        ).execution_options(yield_per=BACKFILL_BATCH_SIZE)
+    )
+
+    written = 0
+    pending: List[Dict] = []
+    bucket: Optional[Dict] = None
+    for event in rows:
+        event = ScoreEvent(*event)
+        bucket_date = event.completed_date.date()
+        same_series = bucket is not None and (bucket["student_id"], bucket["subject"]) == (event.student_id, event.subject)
+        if not same_series or bucket_date != bucket["bucket_date"]:
+            bucket = {
+                "student_id": event.student_id,
+                "subject": event.subject,
+                "bucket_date": bucket_date,
+                "assessment_count": 0,
+                "mean_score": 0.0,
+                "ewma_score": bucket["ewma_score"] if same_series else event.score,
+                "last_mastery_level": None,
+                "updated_at": datetime.utcnow(),
+            }
+            pending.append(bucket)
+        bucket["assessment_count"], bucket["mean_score"], bucket["ewma_score"] = _fold(
+            bucket["assessment_count"], bucket["mean_score"], bucket["ewma_score"], event.score, alpha
+        )
+        bucket["last_mastery_level"] = event.mastery_level
+
+        # Only the last pending bucket can still change
+        if len(pending) > BACKFILL_BATCH_SIZE:
+            db.execute(insert(StudentProgress.__table__), pending[:-1])
+            written += len(pending) - 1
+            pending = pending[-1:]
+
+    if pending:
+        db.execute(insert(StudentProgress.__table__), pending)
+        written += len(pending)
+    db.commit()
+    return written
+
+def resample(buckets: Iterable[StudentProgress], period: str) -> List[Dict]:
+    """Merge consecutive daily buckets of one series into weeks or months.
+
+    Counts add, means are count-weighted, and the EWMA and mastery level are
+    taken from the last day in the period.
+    """
+    merged: List[Dict] = []
+    for bucket in buckets:
+        start = _period_start(bucket.bucket_date, period)
+        if merged and merged[-1]["subject"] == bucket.subject and merged[-1]["bucket_date"] == start:
+            point = merged[-1]
+            total = point["assessment_count"] + bucket.assessment_count
+            point["mean_score"] += (bucket.mean_score - point["mean_score"]) * bucket.assessment_count / total
+            point["assessment_count"] = total
+            point["ewma_score"] = bucket.ewma_score
+            point["last_mastery_level"] = bucket.last_mastery_level
+        else:
+            merged.append({
+                "subject": bucket.subject,
+                "bucket_date": start,
+                "assessment_count": bucket.assessment_count,
+                "mean_score": bucket.mean_score,
+                "ewma_score": bucket.ewma_score,
+                "last_mastery_level": bucket.last_mastery_level,
+            })
+    return merged
+
+def progress_series(student_id: int, buckets: Iterable[StudentProgress], period: str = "day") -> Dict:
+    """Shape get_progress() rows as a StudentProgress response, one series per subject."""
+    subjects: Dict[Subject, List[Dict]] = {}
+    for point in resample(buckets, period):
+        subjects.setdefault(point.pop("subject"), []).append(point)
+    return {
+        "student_id": student_id,
+        "period": period,
+        "subjects": [{"subject": subject, "points": points} for subject, points in subjects.items()],
+    }
+
+def _open_bucket(db: Session, student_id: int, subject: Subject, bucket_date: date, ewma: float) -> StudentProgress:
+    """Create an empty bucket for a new day, or lock the one a concurrent transaction just created.
+
+    Two assessments of a series on a new day both miss it in _latest_buckets;
+    the second insert must fold into the first's bucket instead of failing
+    uq_student_progress_key.
+    """
+    key = {"student_id": student_id, "subject": subject, "bucket_date": bucket_date}
+    upsert = dialect_insert(db)
+    if upsert is not None:
+        db.execute(upsert(StudentProgress).values(
+            **key, assessment_count=0, mean_score=0.0, ewma_score=ewma, updated_at=datetime.utcnow()
+        ).on_conflict_do_nothing(index_elements=list(key)))
+        return db.query(StudentProgress).filter_by(**key).with_for_update().populate_existing().one()
+
+    bucket = StudentProgress(**key, assessment_count=0, mean_score=0.0, ewma_score=ewma)
+    try:
+        with db.begin_nested():
+            db.add(bucket)
+    except IntegrityError:
+        bucket = db.query(StudentProgress).filter_by(**key).with_for_update().one()
+    return bucket
+
+def _latest_buckets(db: Session, keys: Iterable[Tuple[int, Subject]]) -> Dict[Tuple[int, Subject], StudentProgress]:
+    """Lock and return the newest bucket of each (student_id, subject) series that exists."""
+    keys = list(keys)
+    student_ids = {student_id for student_id, _ in keys}
+    newer = aliased(StudentProgress)
+    buckets = db.query(StudentProgress).filter(
+        StudentProgress.student_id.in_(student_ids),
+        ~select(newer.id).where(
+            newer.student_id == StudentProgress.student_id,
+            newer.subject == StudentProgress.subject,
+            newer.bucket_date > StudentProgress.bucket_date
+        ).exists()
+    ).with_for_update().all()
+    wanted = set(keys)
+    return {
+        (bucket.student_id, bucket.subject): bucket
+        for bucket in buckets if (bucket.student_id, bucket.subject) in wanted
+    }
+
+def _fold(count: int, mean: float, ewma: float, score: float, alpha: float) -> Tuple[int, float, float]:
+    """Add one score to a bucket's running count, mean and EWMA."""
+    count += 1
+    return count, mean + (score - mean) / count, alpha * score + (1 - alpha) * ewma
+
+def _period_start(day: date, period: str) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
@@ -0,0 +1,139 @@
+"""Adaptive testing: next-question latency with thousands of sessions in memory.
+
+Builds an item index from synthetic 2PL items, starts --sessions tests at
+once and answers them round-robin until all finish. Simulated children
+answer with the probabilities of their own true ability. Reports:
+
+- the latency of each answer, which includes the ability update and the
+  next selection;
+- the cost of one indexed selection next to a scan of every item under
+  the same key;
+- how close indexed choices come to the scan's most informative item;
+- the error of the final ability estimates.
+
+No database is involved. Run from the backend directory:
+
+    python -m benchmarks.bench_adaptive --items-per-skill 2000 --sessions 5000
+"""
+import argparse
+import math
+import random
+import time
+import tracemalloc
+
+from app.models import Difficulty
+from app.services.adaptive_testing import AdaptiveItem, AdaptiveTester, ItemIndex, information
+from benchmarks.synthetic import SUBJECT_SKILLS
+
+def make_items(items_per_skill: int, rng: random.Random) -> list:
+    items = []
+    for subject, skills in SUBJECT_SKILLS.items():
+        for skill in skills:
+            for _ in range(items_per_skill):
+                b = rng.gauss(0.0, 1.2)
+                difficulty = Difficulty.BEGINNER if b < -0.5 else Difficulty.ADVANCED if b > 0.5 else Difficulty.INTERMEDIATE
+                items.append(AdaptiveItem(
+                    len(items) + 1, subject, skill, difficulty, f"Question {len(items) + 1}", ["A", "B", "C", "D"],
+                    0, round(b, 4), round(rng.uniform(0.6, 2.0), 4)
+                ))
+    return items
+
+def scan_next_item(items_by_key: dict, index: ItemIndex, session) -> int:
+    """Most informative unused item by exhaustive scan; the baseline the index replaces."""
+    best, best_information = None, -1.0
+    for item_id in items_by_key[(session.subject, session.skill_category)]:
+        if item_id in session.administered:
+            continue
+        a, b = index.parameters(item_id)
+        value = information(session.theta, a, b)
+        if value > best_information:
+            best, best_information = item_id, value
+    return best
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items-per-skill", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--max-items", type=int, default=20)
+    parser.add_argument("--target-se", type=float, default=0.3)
+    parser.add_argument("--window", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = make_items(args.items_per_skill, rng)
+    start = time.perf_counter()
+    index = ItemIndex(items)
+    print(f"indexed {len(items)} items in {(time.perf_counter() - start) * 1e3:.0f} ms")
+    items_by_key = {}
+    for item in items:
+        items_by_key.setdefault((item.subject, item.skill_category), []).append(item.id)
+    keys = list(items_by_key)
+
+    tester = AdaptiveTester(args.max_items, args.target_se, args.window, session_ttl=3600, max_sessions=args.sessions)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions, abilities = [], {}
+    for student_id in range(args.sessions):
+        subject, skill = rng.choice(keys)
+        session = tester.start(index, 1, student_id, subject, skill)
+        sessions.append(session)
+        abilities[session.id] = rng.gauss(0.0, 1.0)
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / args.sessions
+    tracemalloc.stop()
+
+    latencies, indexed_selection, scan_selection, efficiency = [], [], [], []
+    active = list(sessions)
+    while active:
+        still_active = []
+        for session in active:
+            a, b = index.parameters(session.current)
+            theta = abilities[session.id]
+            correct_answer = index.get(session.current).correct_answer
+            p = 1.0 / (1.0 + math.exp(-a * (theta - b)))
+            chosen = correct_answer if rng.random() < p else (correct_answer + 1) % 4
+
+            t0 = time.perf_counter()
+            tester.answer(session, session.current, chosen)
+            latencies.append(time.perf_counter() - t0)
+            if session.finished:
+                continue
+            still_active.append(session)
+
+            # Compare the indexed choice with the exhaustive one at the same state
+            session.administered.discard(session.current)
+            t0 = time.perf_counter()
+            chosen_id = index.next_item(session.subject, session.skill_category, session.theta,
+                                        session.administered, args.window)
+            t1 = time.perf_counter()
+            best_id = scan_next_item(items_by_key, index, session)
+            t2 = time.perf_counter()
+            session.administered.add(session.current)
+            indexed_selection.append(t1 - t0)
+            scan_selection.append(t2 - t1)
+            efficiency.append(
+                information(session.theta, *index.parameters(chosen_id))
+                / information(session.theta, *index.parameters(best_id))
+            )
+        active = still_active
+
+    errors = [session.theta - abilities[session.id] for session in sessions]
+    lengths = [len(session.responses) for session in sessions]
+    indexed = sum(indexed_selection) / len(indexed_selection) * 1e6
+    scan = sum(scan_selection) / len(scan_selection) * 1e6
+    print(f"{args.sessions} concurrent sessions, {per_session / 1024:.1f} KiB each, {len(latencies)} answers")
+    print(f"answer + next question: p50 {percentile(latencies, 0.5) * 1e6:.1f} us, "
+          f"p99 {percentile(latencies, 0.99) * 1e6:.1f} us, max {max(latencies) * 1e3:.2f} ms")
+    print(f"selection: indexed {indexed:.1f} us, full scan of {args.items_per_skill} items {scan:.1f} us "
+          f"({scan / indexed:.0f}x)")
+    print(f"indexed choice information vs best: mean {sum(efficiency) / len(efficiency):.1%}, "
+          f"min {min(efficiency):.1%}")
+    print(f"items per test {sum(lengths) / len(lengths):.1f}, "
+          f"ability RMSE {math.sqrt(sum(e * e for e in errors) / len(errors)):.3f}")
+
+if __name__ == "__main__":
+    main()
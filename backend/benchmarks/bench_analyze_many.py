@@ -0,0 +1,112 @@
+"""Compare per-assessment analysis with AssessmentAnalyzer.analyze_many.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_analyze_many
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from app.models import Subject, Difficulty
+from app.schemas import AssessmentCreate, QuestionCreate
+from app.services.assessment_analyzer import AssessmentAnalyzer
+
+QUESTIONS_PER_ASSESSMENT = 10
+
+def make_assessments(n_questions: int, seed: int = 42) -> List[AssessmentCreate]:
+    """Build synthetic assessments totalling n_questions questions."""
+    rng = random.Random(seed)
+    skills = list(AssessmentAnalyzer().skill_weights)
+    subjects = list(Subject)
+    difficulties = list(Difficulty)
+
+    assessments = []
+    for student_id in range(n_questions // QUESTIONS_PER_ASSESSMENT):
+        questions = [
+            QuestionCreate.model_construct(
+                text="",
+                options=[],
+                correct_answer=0,
+                explanation="",
+                difficulty=rng.choice(difficulties),
+                skill_category=rng.choice(skills)
+            )
+            for _ in range(QUESTIONS_PER_ASSESSMENT)
+        ]
+        assessments.append(AssessmentCreate.model_construct(
+            student_id=student_id,
+            subject=rng.choice(subjects),
+            score=rng.randint(0, QUESTIONS_PER_ASSESSMENT),
+            total_questions=QUESTIONS_PER_ASSESSMENT,
+            skill_breakdown={},
+            recommendations=[],
+            questions=questions
+        ))
+    return assessments
+
+def analyze_one_by_one(analyzer: AssessmentAnalyzer, assessments: List[AssessmentCreate]):
+    results = []
+    for assessment in assessments:
+        skill_breakdown, recommendations = analyzer.analyze_assessment(assessment)
+        results.append((
+            skill_breakdown,
+            recommendations,
+            analyzer.predict_learning_style(assessment),
+            analyzer.calculate_mastery_level(assessment.score)
+        ))
+    return results
+
+def check_equivalent(expected, actual) -> None:
+    assert len(expected) == len(actual)
+    for (breakdown, recommendations, style, level), result in zip(expected, actual):
+        assert list(breakdown.items()) == list(result.skill_breakdown.items())
+        assert recommendations == result.recommendations
+        assert style == result.learning_style
+        assert level == result.mastery_level
+
+def check_empty_assessments() -> None:
+    """Batches where every, or only some, assessments have no questions."""
+    analyzer = AssessmentAnalyzer()
+    assessments = make_assessments(200)
+    empty = [assessment.model_copy(update={"questions": []}) for assessment in assessments[:5]]
+    for batch in (empty, empty + assessments, assessments + empty):
+        check_equivalent(analyze_one_by_one(analyzer, batch), analyzer.analyze_many(batch))
+    print("empty assessments: analyze_many matches the per-assessment path")
+
+def run(n_questions: int) -> None:
+    analyzer = AssessmentAnalyzer()
+    assessments = make_assessments(n_questions)
+
+    start = time.perf_counter()
+    expected = analyze_one_by_one(analyzer, assessments)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = analyzer.analyze_many(assessments)
+    batch_seconds = time.perf_counter() - start
+
+    check_equivalent(expected, actual)
+
+    n = len(assessments)
+    print(
+        f"{n_questions:>9} questions ({n} assessments): "
+        f"loop {loop_seconds / n * 1e6:8.2f} us/assessment, "
+        f"analyze_many {batch_seconds / n * 1e6:8.2f} us/assessment, "
+        f"speedup {loop_seconds / batch_seconds:5.1f}x"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--questions", type=int, nargs="+", default=[10_000, 1_000_000],
+        help="total question counts to benchmark"
+    )
+    args = parser.parse_args()
+    check_empty_assessments()
+    for n_questions in args.questions:
+        run(n_questions)
+
+if __name__ == "__main__":
+    main()
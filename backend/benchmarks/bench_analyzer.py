@@ -0,0 +1,63 @@
+"""Microbenchmarks for AssessmentAnalyzer methods.
+
+Times each public analysis entry point on synthetic assessments from
+benchmarks.synthetic and reports the best-of-N cost per assessment. Batch
+methods are timed over the whole set and divided by its size. Run from the
+backend directory:
+
+    python -m benchmarks.bench_analyzer --assessments 2000
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict
+
+from benchmarks.synthetic import assessment_payload
+
+def best_per_item(fn: Callable[[], object], items: int, repeat: int) -> float:
+    """Best wall time of `repeat` runs of fn, in microseconds per item."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / items * 1e6
+
+def run(n_assessments: int = 2000, questions: int = 10, repeat: int = 5, seed: int = 42) -> Dict[str, Dict[str, float]]:
+    """Returns {method: {"us_per_assessment": ...}}."""
+    from app.schemas import AssessmentCreate
+    from app.services.assessment_analyzer import AssessmentAnalyzer
+
+    rng = random.Random(seed)
+    analyzer = AssessmentAnalyzer()
+    assessments = [
+        AssessmentCreate.model_validate(assessment_payload(rng, student_id, questions))
+        for student_id in range(n_assessments)
+    ]
+    breakdowns = [analyzer._calculate_skill_breakdown(a.questions) for a in assessments]
+    subjects = [a.subject for a in assessments]
+
+    cases = {
+        "analyze_assessment": lambda: [analyzer.analyze_assessment(a) for a in assessments],
+        "predict_learning_style": lambda: [analyzer.predict_learning_style(a) for a in assessments],
+        "calculate_mastery_level": lambda: [analyzer.calculate_mastery_level(a.score) for a in assessments],
+        "analyze_many": lambda: analyzer.analyze_many(assessments),
+        "recommend_many": lambda: analyzer.recommend_many(breakdowns, subjects),
+        "skill_feature_matrix": lambda: analyzer.skill_feature_matrix(breakdowns),
+    }
+    return {
+        name: {"us_per_assessment": round(best_per_item(fn, n_assessments, repeat), 3)}
+        for name, fn in cases.items()
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=10, help="questions per assessment")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for name, result in run(args.assessments, args.questions, args.repeat).items():
+        print(f"{name:<24} {result['us_per_assessment']:10.2f} us/assessment")
+
+if __name__ == "__main__":
+    main()
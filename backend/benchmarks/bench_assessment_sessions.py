@@ -0,0 +1,176 @@
+"""In-progress assessment sessions: answers per second per worker.
+
+Starts --sessions sessions in a migrated SQLite database and has --threads
+threads answer them round-robin, one answer per call as the app posts
+taps. Three ways of keeping answers are compared:
+
+- write-through: update and commit the session row on every answer, the
+  cost of syncing each tap to the database;
+- write-behind: the session store, with its flush thread writing dirty
+  sessions every --flush-interval seconds;
+- write-behind with the local SQLite answer journal.
+
+Also reports the memory of a session record and the size and cost of the
+flushes. The database file lives in a temporary directory, so timings are
+for SQLite on local disk; a networked database widens the gap. Run from the
+backend directory:
+
+    python -m benchmarks.bench_assessment_sessions --sessions 5000 --answers 200000 --threads 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations
+from app.models import AssessmentSession, Difficulty, QuestionBankItem, Student, Subject, User
+from app.services.assessment_sessions import AssessmentSessionStore, SessionRecord
+
+def seed(engine, questions: int) -> list:
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(insert(Student), [{"id": 1, "user_id": 1, "name": "Bench", "grade": 3, "age": 8}])
+        conn.execute(insert(QuestionBankItem), [
+            {
+                "id": i + 1, "content_hash": f"{i:064x}", "subject": Subject.MATHEMATICS,
+                "text": f"Question {i + 1}", "options": ["A", "B", "C", "D"], "correct_answer": i % 4,
+                "explanation": "", "difficulty": Difficulty.BEGINNER, "skill_category": "Number Sense",
+            }
+            for i in range(questions)
+        ])
+    return list(range(1, questions + 1))
+
+def start_sessions(store: AssessmentSessionStore, session_factory, question_ids: list, count: int,
+                   per_session: int, rng: random.Random) -> list:
+    db = session_factory()
+    try:
+        return [
+            store.start(db, 1, 1, Subject.MATHEMATICS, rng.sample(question_ids, per_session))
+            for _ in range(count)
+        ]
+    finally:
+        db.close()
+
+def run_threads(threads: int, answers: int, work) -> float:
+    """Run work(thread index, answer count) on each thread; returns answers per second."""
+    per_thread = answers // threads
+    workers = [threading.Thread(target=work, args=(i, per_thread)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+def write_through(session_factory, records: list, threads: int, answers: int, per_session: int) -> float:
+    """Answers per second when every answer updates and commits its row."""
+    lock = threading.Lock()
+
+    def work(index: int, count: int) -> None:
+        rng = random.Random(index)
+        db = session_factory()
+        try:
+            for i in range(count):
+                record = records[(index + i * threads) % len(records)]
+                with record.lock:
+                    record.record(rng.randrange(per_session), rng.randrange(4))
+                    row = {"answers": record.chosen_options(), "updated_at": datetime.utcnow()}
+                # SQLite allows one writer; the lock keeps threads from failing on "database is locked"
+                with lock:
+                    db.execute(update(AssessmentSession).where(AssessmentSession.id == record.id).values(**row))
+                    db.commit()
+        finally:
+            db.close()
+
+    return run_threads(threads, answers, work)
+
+def write_behind(store: AssessmentSessionStore, session_factory, records: list, threads: int,
+                 answers: int, per_session: int) -> float:
+    """Answers per second through the session store, with its flush thread running."""
+
+    def work(index: int, count: int) -> None:
+        rng = random.Random(index)
+        for i in range(count):
+            record = records[(index + i * threads) % len(records)]
+            store.answer(record, [(rng.randrange(per_session), rng.randrange(4))])
+
+    store.start_flusher(session_factory)
+    rate = run_threads(threads, answers, work)
+    store.stop_flusher(session_factory)
+    return rate
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--questions-per-session", type=int, default=20)
+    parser.add_argument("--answers", type=int, default=200000)
+    parser.add_argument("--write-through-answers", type=int, default=2000,
+                        help="answers for the write-through baseline, which is far slower")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = f"sqlite:///{os.path.join(tmpdir, 'sessions.db')}"
+        migrations.upgrade(url)
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        session_factory = sessionmaker(bind=engine)
+        question_ids = seed(engine, 500)
+
+        store = AssessmentSessionStore(args.sessions, args.flush_interval, ttl=3600)
+        start = time.perf_counter()
+        records = start_sessions(store, session_factory, question_ids, args.sessions, args.questions_per_session, rng)
+        started = (time.perf_counter() - start) / args.sessions * 1e3
+        print(f"started {args.sessions} sessions of {args.questions_per_session} questions, {started:.2f} ms each")
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        sample = [
+            SessionRecord(f"s{i}", 1, 1, Subject.MATHEMATICS, [(q, 0, 4) for q in range(args.questions_per_session)], 0.0)
+            for i in range(1000)
+        ]
+        per_record = (tracemalloc.get_traced_memory()[0] - before) / len(sample)
+        tracemalloc.stop()
+        print(f"session record: {per_record:.0f} bytes")
+
+        through = write_through(session_factory, records, args.threads, args.write_through_answers,
+                                args.questions_per_session)
+        print(f"write-through:             {through:>10,.0f} answers/s")
+
+        behind = write_behind(store, session_factory, records, args.threads, args.answers, args.questions_per_session)
+        stats = store.stats()
+        print(f"write-behind:              {behind:>10,.0f} answers/s ({behind / through:.0f}x), "
+              f"{stats['flushes']} flushes, {stats['flushed'] / max(stats['flushes'], 1):,.0f} rows per flush")
+
+        journaled = AssessmentSessionStore(args.sessions, args.flush_interval, ttl=3600,
+                                           journal_path=os.path.join(tmpdir, "journal.db"))
+        db = session_factory()
+        journaled.recover(db)
+        db.close()
+        behind_journal = write_behind(journaled, session_factory, records, args.threads, args.answers,
+                                      args.questions_per_session)
+        print(f"write-behind with journal: {behind_journal:>10,.0f} answers/s ({behind_journal / through:.0f}x)")
+
+        db = session_factory()
+        store._dirty = {record.id: record for record in records}
+        start = time.perf_counter()
+        flushed = store.flush(db)
+        print(f"flushing {flushed} dirty sessions: {(time.perf_counter() - start) * 1e3:.0f} ms")
+        db.execute(update(AssessmentSession).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+        start = time.perf_counter()
+        expired = store.expire(db)
+        print(f"expiring {expired} sessions: {(time.perf_counter() - start) * 1e3:.0f} ms")
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Compare sync (threadpool) and async database access at high concurrency.
+
+Each simulated request loads a student's latest assessments with their
+responses and bank questions, the same work as GET
+/students/{id}/assessments. The sync path runs through a 40-thread limiter,
+as FastAPI does for `def` endpoints; the async path awaits an AsyncSession
+on the event loop.
+
+Run from the backend directory (SQLite by default, or pass a Postgres URL):
+
+    python -m benchmarks.bench_async_db --database-url postgresql://localhost/tutorkids_bench
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+import anyio
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.database import to_async_url
+from app.models import (
+    Base, Assessment, AssessmentResponse, QuestionBankItem, Student, Subject, Difficulty, ASSESSMENT_LOAD_OPTIONS
+)
+
+# Both paths get the same connection pool so only the concurrency model differs
+THREADPOOL_SIZE = 40
+PAGE_SIZE = 20
+
+def seed(url: str, n_students: int, assessments_per_student: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    bank = [
+        QuestionBankItem(
+            content_hash=f"{q:064x}", subject=Subject.MATHEMATICS, text=f"Question {q}", options=["a", "b"],
+            correct_answer=0, explanation="", difficulty=Difficulty.BEGINNER, skill_category="Number Operations"
+        )
+        for q in range(10)
+    ]
+    db.add_all(bank)
+    for i in range(n_students):
+        student = Student(name=f"Student {i}", grade=4, age=9)
+        for _ in range(assessments_per_student):
+            assessment = Assessment(
+                student=student, subject=Subject.MATHEMATICS, score=7, total_questions=10,
+                skill_breakdown={}, recommendations=[]
+            )
+            for position, question in enumerate(bank):
+                AssessmentResponse(
+                    assessment=assessment, position=position, question=question, chosen_option=0, is_correct=True
+                )
+            db.add(assessment)
+    db.commit()
+    db.close()
+    engine.dispose()
+
+def summarize(label: str, concurrency: int, latencies: List[float], elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:>5} concurrency={concurrency:>5}: {len(latencies) / elapsed:8.0f} req/s, "
+        f"p50 {statistics.median(latencies) * 1e3:7.1f} ms, p99 {p99 * 1e3:7.1f} ms"
+    )
+
+async def run_sync_path(url: str, n_students: int, concurrency: int, requests: int) -> None:
+    engine = create_engine(url, poolclass=QueuePool, pool_size=THREADPOOL_SIZE, max_overflow=0)
+    SessionLocal = sessionmaker(bind=engine)
+    limiter = anyio.CapacityLimiter(THREADPOOL_SIZE)
+    latencies = []
+
+    def handle(student_id: int) -> int:
+        db = SessionLocal()
+        try:
+            rows = db.query(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).filter(
+                Assessment.student_id == student_id
+            ).order_by(Assessment.completed_date.desc(), Assessment.id.desc()).limit(PAGE_SIZE).all()
+            return sum(len(row.responses) for row in rows)
+        finally:
+            db.close()
+
+    async def client(worker: int) -> None:
+        for i in range(worker, requests, concurrency):
+            start = time.perf_counter()
+            await anyio.to_thread.run_sync(handle, i % n_students + 1, limiter=limiter)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+    summarize("sync", concurrency, latencies, time.perf_counter() - start)
+    engine.dispose()
+
+async def run_async_path(url: str, n_students: int, concurrency: int, requests: int) -> None:
+    engine = create_async_engine(
+        to_async_url(url), poolclass=AsyncAdaptedQueuePool, pool_size=THREADPOOL_SIZE, max_overflow=0
+    )
+    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    latencies = []
+
+    async def handle(student_id: int) -> int:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.scalars(
+                select(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).where(
+                    Assessment.student_id == student_id
+                ).order_by(Assessment.completed_date.desc(), Assessment.id.desc()).limit(PAGE_SIZE)
+            )).all()
+            return sum(len(row.responses) for row in rows)
+
+    async def client(worker: int) -> None:
+        for i in range(worker, requests, concurrency):
+            start = time.perf_counter()
+            await handle(i % n_students + 1)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+    summarize("async", concurrency, latencies, time.perf_counter() - start)
+    await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="sync database URL (default: temporary SQLite file)")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--assessments-per-student", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        seed(url, args.students, args.assessments_per_student)
+        for concurrency in args.concurrency:
+            asyncio.run(run_sync_path(url, args.students, concurrency, args.requests))
+            asyncio.run(run_async_path(url, args.students, concurrency, args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Assessments per second: one-at-a-time create vs AssessmentIngester chunks.
+
+The per-item path mirrors create_assessment (analyze, insert, rollup,
+commit per assessment); the bulk path is what POST /assessments/bulk runs
+per chunk. Run from the backend directory:
+
+    python -m benchmarks.bench_bulk_ingest --assessments 5000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Assessment, Student, User, Subject, Difficulty
+from app.services import assessment_rollup
+from app.services.assessment_analyzer import AssessmentAnalyzer
+from app.services.assessment_ingest import AssessmentIngester
+from app.services.question_bank import question_bank
+from app.services.student_clustering import StudentClusterer
+
+N_STUDENTS = 100
+# Distinct questions per subject that tests draw from
+QUESTION_POOL_SIZE = 30
+
+def make_items(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    skills = list(AssessmentAnalyzer().skill_weights)
+    pools = {
+        subject: [
+            {
+                "text": f"Question {q}",
+                "options": ["a", "b", "c", "d"],
+                "correct_answer": rng.randint(0, 3),
+                "explanation": "",
+                "difficulty": rng.choice(list(Difficulty)).value,
+                "skill_category": rng.choice(skills),
+            }
+            for q in range(QUESTION_POOL_SIZE)
+        ]
+        for subject in Subject
+    }
+    items = []
+    for _ in range(n):
+        subject = rng.choice(list(Subject))
+        items.append({
+            "student_id": rng.randint(1, N_STUDENTS),
+            "subject": subject.value,
+            "score": rng.randint(0, 10),
+            "total_questions": 10,
+            "skill_breakdown": {},
+            "recommendations": [],
+            "questions": [
+                {**question, "chosen_option": rng.randint(0, 3)} for question in rng.sample(pools[subject], 10)
+            ],
+        })
+    return items
+
+def fresh_database(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+    # Bank ids cached from the previous database do not exist in the new one
+    question_bank.clear()
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x", full_name="Bench")
+    db.add(user)
+    db.flush()
+    db.add_all(Student(user_id=user.id, name=f"Student {i}", grade=4, age=9) for i in range(N_STUDENTS))
+    db.commit()
+    return engine, SessionLocal, user.id
+
+def run_one_by_one(SessionLocal, items) -> float:
+    from app.schemas import AssessmentCreate
+    analyzer = AssessmentAnalyzer()
+    db = SessionLocal()
+    start = time.perf_counter()
+    for item in items:
+        assessment = AssessmentCreate.model_validate(item)
+        student = db.query(Student).filter(Student.id == assessment.student_id).first()
+        skill_breakdown, recommendations = analyzer.analyze_assessment(assessment)
+        db_assessment = Assessment(
+            student_id=assessment.student_id, subject=assessment.subject, score=assessment.score,
+            total_questions=len(assessment.questions), skill_breakdown=skill_breakdown,
+            recommendations=recommendations, learning_style=analyzer.predict_learning_style(assessment),
+            mastery_level=analyzer.calculate_mastery_level(assessment.score)
+        )
+        db.add(db_assessment)
+        db.flush()
+        question_bank.record_responses(db, db_assessment.id, assessment.subject, assessment.questions)
+        assessment_rollup.record_assessment(db, db_assessment, student.grade)
+        db.commit()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+def run_bulk(SessionLocal, user_id: int, items, chunk_size: int) -> float:
+    analyzer = AssessmentAnalyzer()
+    ingester = AssessmentIngester(analyzer, StudentClusterer(analyzer), cluster_counts=[3], progress_alpha=0.3)
+    db = SessionLocal()
+    start = time.perf_counter()
+    created = 0
+    for offset in range(0, len(items), chunk_size):
+        results = ingester.ingest_chunk(db, user_id, items[offset:offset + chunk_size], offset)
+        created += sum(1 for result in results if result.status == "created")
+    elapsed = time.perf_counter() - start
+    db.close()
+    assert created == len(items), f"only {created} of {len(items)} created"
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    items = make_items(args.assessments)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "bench.db")
+        engine, SessionLocal, _ = fresh_database(path)
+        single = run_one_by_one(SessionLocal, items)
+        engine.dispose()
+
+        engine, SessionLocal, user_id = fresh_database(path)
+        bulk = run_bulk(SessionLocal, user_id, items, args.chunk_size)
+        engine.dispose()
+
+    print(f"one-by-one: {len(items) / single:8.0f} assessments/s")
+    print(f"bulk:       {len(items) / bulk:8.0f} assessments/s ({single / bulk:.1f}x)")
+
+if __name__ == "__main__":
+    main()
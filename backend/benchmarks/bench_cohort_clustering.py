@@ -0,0 +1,91 @@
+"""Per-subject cohort clustering against one fixed-k fit over every skill.
+
+Each subject cohort gets --students synthetic students drawn from a random
+number (2 to 6) of well-separated groups over that subject's skills. Reports:
+
+- the single KMeans(n_clusters=3) fit over all subjects in the full skill
+  space that cluster_students() does, and how well its labels recover each
+  subject's groups (adjusted Rand index);
+- cohort clustering with k chosen by silhouette score, in-process and
+  across --workers processes: wall time, the k chosen against the true k,
+  and the same agreement score.
+
+No database is involved. Run from the backend directory:
+
+    python -m benchmarks.bench_cohort_clustering --students 20000 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score
+
+from app.services.assessment_analyzer import AssessmentAnalyzer
+from app.services.cohort_clustering import Cohort, fit_cohorts
+from benchmarks.synthetic import SUBJECT_SKILLS
+
+def make_cohorts(analyzer: AssessmentAnalyzer, students: int, rng: np.random.Generator):
+    """Cohorts, their full-skill-space rows, and the true group of every student."""
+    cohorts, full_rows, truth = [], [], {}
+    student_id = 0
+    for subject, skills in SUBJECT_SKILLS.items():
+        true_k = int(rng.integers(2, 7))
+        centers = rng.uniform(1, 10, size=(true_k, len(skills)))
+        groups = rng.integers(0, true_k, size=students)
+        scores = np.clip(centers[groups] + rng.normal(0, 0.5, size=(students, len(skills))), 0, 10)
+        breakdowns = [dict(zip(skills, row)) for row in scores.tolist()]
+        ids = list(range(student_id, student_id + students))
+        student_id += students
+        cohorts.append(Cohort(subject, None, ids, list(skills), scores))
+        full_rows.append(analyzer.skill_feature_matrix(breakdowns))
+        truth[subject.value] = (true_k, dict(zip(ids, groups.tolist())))
+    return cohorts, np.vstack(full_rows), truth
+
+def agreement(truth: dict, clusters: dict) -> float:
+    labels = {student_id: label for label, members in clusters.items() for student_id in members}
+    ids = sorted(labels)
+    return adjusted_rand_score([truth[i] for i in ids], [labels[i] for i in ids])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20000, help="students per subject")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--min-clusters", type=int, default=2)
+    parser.add_argument("--max-clusters", type=int, default=8)
+    parser.add_argument("--sample-size", type=int, default=2000)
+    parser.add_argument("--time-budget", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    cohorts, full_features, truth = make_cohorts(AssessmentAnalyzer(), args.students, rng)
+    print(f"{len(cohorts)} cohorts of {args.students} students")
+
+    start = time.perf_counter()
+    global_labels = KMeans(n_clusters=3, random_state=42, n_init=10).fit_predict(full_features)
+    elapsed = time.perf_counter() - start
+    offset = 0
+    scores = []
+    for cohort in cohorts:
+        true_k, groups = truth[cohort.subject.value]
+        labels = global_labels[offset:offset + len(cohort.student_ids)].tolist()
+        offset += len(cohort.student_ids)
+        scores.append(adjusted_rand_score([groups[i] for i in cohort.student_ids], labels))
+    print(f"single fit, k=3 over {full_features.shape[1]} skills: {elapsed:.2f}s, "
+          f"mean ARI {sum(scores) / len(scores):.3f}")
+
+    k_range = (args.min_clusters, args.max_clusters)
+    for label, workers in (("in-process", 1), ("parallel", args.workers)):
+        start = time.perf_counter()
+        results = fit_cohorts(cohorts, k_range, args.sample_size, args.time_budget, workers)
+        elapsed = time.perf_counter() - start
+        print(f"cohorts, {label}: {elapsed:.2f}s")
+        for result in results:
+            true_k, groups = truth[result["subject"]]
+            partial = "" if result["complete"] else " (time budget reached)"
+            print(f"  {result['subject']:<15} k={result['n_clusters']} (true {true_k}) "
+                  f"silhouette {result['silhouette']:.3f} ARI {agreement(groups, result['clusters']):.3f}{partial}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Cold-start budget for `import app.main`.
+
+Runs the import in fresh interpreters under `python -X importtime`, reports
+the best cumulative time and the slowest top-level packages, and fails if
+the time exceeds the budget or if a module that must stay lazy (sklearn,
+alembic) is imported at boot. Importing app.main must not touch the
+database either; DATABASE_URL is pointed at a path that does not exist.
+Run from the backend directory:
+
+    python -m benchmarks.bench_import_time --budget-ms 2500
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+# Only needed by admin clustering and the migrate command
+LAZY_MODULES = ("sklearn", "alembic")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def measure() -> dict:
+    """Return {module: (self_us, cumulative_us, depth)} for one cold import of app.main."""
+    env = dict(os.environ, DATABASE_URL="sqlite:////nonexistent/tutorkids.db", PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    if result.returncode != 0:
+        sys.exit(f"import app.main failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules[module] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=2500.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    best = min(runs, key=lambda modules: modules["app.main"][1])
+    total_ms = best["app.main"][1] / 1e3
+
+    # Attribute self time to top-level packages
+    packages = defaultdict(int)
+    for module, (self_us, _, _) in best.items():
+        packages[module.split(".")[0]] += self_us
+    print(f"import app.main: {total_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1e3:8.1f} ms  {package}")
+
+    failed = False
+    eager = sorted({module.split(".")[0] for module in best} & set(LAZY_MODULES))
+    if eager:
+        print(f"FAIL: imported at boot but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Requests per second and bytes per response for 1k-item assessment lists.
+
+Serves GET /students/{id}/assessments?limit=1000 in-process over ASGI
+(httpx.ASGITransport) three ways:
+
+- the previous path: ORM objects with selectinload, validated into
+  List[AssessmentSchema] by FastAPI and encoded with the stdlib json module,
+  on an engine decoding JSON columns with the stdlib json module;
+- the current path: column rows encoded with orjson, on an engine created
+  with the app's JSON_OPTIONS;
+- the current path behind GZipMiddleware, with the client sending
+  Accept-Encoding: gzip.
+
+The check fails unless both paths produce the same JSON document. Run from
+the backend directory:
+
+    python -m benchmarks.bench_list_responses --assessments 1000 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations
+from app.api.endpoints import assessments
+from app.core.auth import get_current_active_user
+from app.database import JSON_OPTIONS, get_db
+from app.models import Assessment, AssessmentResponse, QuestionBankItem, Student, User, Subject, Difficulty, MasteryLevel, ASSESSMENT_LOAD_OPTIONS
+from app.schemas import Assessment as AssessmentSchema
+
+QUESTIONS_PER_ASSESSMENT = 10
+BANK_QUESTIONS = 100
+
+def seed(engine, n_assessments: int) -> None:
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(insert(Student), [{"id": 1, "user_id": 1, "name": "Student", "grade": 4}])
+        conn.execute(insert(Assessment), [
+            {
+                "id": i,
+                "student_id": 1,
+                "subject": Subject.MATHEMATICS,
+                "score": i % 11,
+                "total_questions": QUESTIONS_PER_ASSESSMENT,
+                "completed_date": start + timedelta(minutes=i, microseconds=i),
+                "skill_breakdown": {"Number Operations": i % 11, "Pattern and Function": 7},
+                "recommendations": ["Practice basic arithmetic operations", "Consider exploring advanced topics"],
+                "learning_style": "Visual",
+                "mastery_level": MasteryLevel.DEVELOPING,
+            }
+            for i in range(1, n_assessments + 1)
+        ])
+        conn.execute(insert(QuestionBankItem), [
+            {
+                "id": k,
+                "content_hash": f"{k:064x}",
+                "subject": Subject.MATHEMATICS,
+                "text": f"What is {k} + {k + 1}?",
+                "options": [str(2 * k + 1), str(2 * k + 2), str(2 * k)],
+                "correct_answer": 0,
+                "explanation": "Add the two numbers.",
+                "difficulty": Difficulty.BEGINNER,
+                "skill_category": "Number Operations",
+            }
+            for k in range(1, BANK_QUESTIONS + 1)
+        ])
+        conn.execute(insert(AssessmentResponse), [
+            {
+                "assessment_id": i,
+                "position": q,
+                "question_id": (i + q) % BANK_QUESTIONS + 1,
+                "chosen_option": (i + q) % 3,
+                "is_correct": (i + q) % 3 == 0,
+            }
+            for i in range(1, n_assessments + 1)
+            for q in range(QUESTIONS_PER_ASSESSMENT)
+        ])
+
+def make_app(SessionLocal, PreviousSessionLocal, user: User, gzip: bool = False) -> FastAPI:
+    app = FastAPI()
+    if gzip:
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+    def get_bench_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/previous/students/{student_id}/assessments", response_model=List[AssessmentSchema])
+    def previous_student_assessments(student_id: int, limit: int = 1000):
+        with PreviousSessionLocal() as db:
+                return db.query(Assessment).options(*ASSESSMENT_LOAD_OPTIONS).filter(
+                Assessment.student_id == student_id
+            ).order_by(Assessment.completed_date.desc(), Assessment.id.desc()).limit(limit).all()
+
+    app.include_router(assessments.router)
+    app.dependency_overrides[get_db] = get_bench_db
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    return app
+
+async def measure(app: FastAPI, path: str, seconds: float, headers=None):
+    """Sequential requests for `seconds`; returns (requests/s, bytes on the wire, decoded body)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        body, wire_bytes = response.content, response.num_bytes_downloaded
+
+        count, start = 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            (await client.get(path, headers=headers)).raise_for_status()
+            count += 1
+        return count / (time.perf_counter() - start), wire_bytes, body
+
+async def run(SessionLocal, PreviousSessionLocal, user: User, limit: int, seconds: float) -> None:
+    plain = make_app(SessionLocal, PreviousSessionLocal, user)
+    compressed = make_app(SessionLocal, PreviousSessionLocal, user, gzip=True)
+    identity = {"Accept-Encoding": "identity"}
+    query = f"/students/1/assessments?limit={limit}"
+
+    cases = [
+        ("pydantic + json", plain, f"/previous{query}", identity),
+        ("rows + orjson", plain, query, identity),
+        ("rows + orjson + gzip", compressed, query, {"Accept-Encoding": "gzip"}),
+    ]
+    results = []
+    for label, app, path, headers in cases:
+        results.append((label, *await measure(app, path, seconds, headers)))
+
+    documents = [json.loads(body) for _, _, _, body in results]
+    assert len(documents[0]) == limit, "expected a full page"
+    assert documents[0] == documents[1] == documents[2], "fast path JSON differs from the schema-validated path"
+
+    baseline = results[0][1]
+    for label, rps, wire_bytes, _ in results:
+        print(f"{label:<22} {rps:8.1f} req/s ({rps / baseline:4.1f}x)  {wire_bytes / 1024:8.1f} KiB/response")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=1000, help="list size per response")
+    parser.add_argument("--seconds", type=float, default=5.0, help="measurement time per case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        migrations.upgrade(database_url)
+        engine = create_engine(database_url, **JSON_OPTIONS)
+        previous_engine = create_engine(database_url)
+        seed(engine, args.assessments)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False)
+        PreviousSessionLocal = sessionmaker(bind=previous_engine, autoflush=False)
+        with SessionLocal() as db:
+            user = db.get(User, 1)
+            db.expunge(user)
+        asyncio.run(run(SessionLocal, PreviousSessionLocal, user, args.assessments, args.seconds))
+        engine.dispose()
+        previous_engine.dispose()
+
+if __name__ == "__main__":
+    main()
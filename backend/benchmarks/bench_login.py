@@ -0,0 +1,101 @@
+"""Login storm benchmark: bcrypt inline vs the bounded password hashing pool.
+
+Simulates FastAPI's 40-thread pool serving a burst of logins alongside a
+steady stream of cheap assessment requests, and reports login throughput,
+rejected logins (503s) and assessment latency. Inline hashing lets the storm
+occupy every worker thread; the bounded pool sheds excess logins so the
+assessment requests keep flowing.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_login --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+
+import anyio
+
+THREADPOOL_SIZE = 40
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+async def run(mode: str, login_clients: int, duration: float) -> None:
+    from app.core import security
+    from app.models import Subject, Difficulty
+    from app.schemas import AssessmentCreate, QuestionCreate
+    from app.services.assessment_analyzer import AssessmentAnalyzer
+
+    analyzer = AssessmentAnalyzer()
+    assessment = AssessmentCreate(
+        student_id=1, subject=Subject.MATHEMATICS, score=7, total_questions=10,
+        skill_breakdown={}, recommendations=[],
+        questions=[
+            QuestionCreate(
+                text="", options=["a", "b"], correct_answer=0, explanation="",
+                difficulty=Difficulty.BEGINNER, skill_category="Number Operations"
+            )
+            for _ in range(10)
+        ]
+    )
+    stored_hash = security.get_password_hash("correct horse battery staple")
+    limiter = anyio.CapacityLimiter(THREADPOOL_SIZE)
+    deadline = time.perf_counter() + duration
+    logins, rejected, assessment_latencies = [], [0], []
+
+    def login() -> None:
+        if mode == "inline":
+            security.verify_and_update_password("correct horse battery staple", stored_hash)
+        else:
+            security.password_hasher.run_sync(
+                security.verify_and_update_password, "correct horse battery staple", stored_hash
+            )
+
+    async def login_client() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await anyio.to_thread.run_sync(login, limiter=limiter)
+            except security.PasswordHasherBusy:
+                rejected[0] += 1
+                await asyncio.sleep(0.5)  # client backs off on 503, as Retry-After asks
+                continue
+            logins.append(time.perf_counter() - start)
+
+    async def assessment_client() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await anyio.to_thread.run_sync(analyzer.analyze_assessment, assessment, limiter=limiter)
+            assessment_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(assessment_client(), *(login_client() for _ in range(login_clients)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{mode:>8}: {len(logins) / elapsed:7.1f} logins/s, {rejected[0] / elapsed:7.1f} rejected/s, "
+        f"login p50 {statistics.median(logins) * 1e3:7.1f} ms | "
+        f"assessment p50 {statistics.median(assessment_latencies) * 1e3:7.2f} ms, "
+        f"p99 {percentile(assessment_latencies, 0.99) * 1e3:7.2f} ms"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--login-clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    args = parser.parse_args()
+
+    # Settings are read at import time
+    os.environ["SECURITY_BCRYPT_ROUNDS"] = str(args.rounds)
+    for mode in ("inline", "pool"):
+        asyncio.run(run(mode, args.login_clients, args.duration))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Plans per second: per-student ORM writes vs bulk writes vs parallel batch mode.
+
+Seeds a SQLite database with students and assessments in every subject,
+then regenerates everyone's plan three ways: one ORM unit of work and
+commit per student, PlanGenerator.generate_many in chunks in-process, and
+regenerate_all across worker processes. SQLite serializes the writers, so
+the parallel speed-up here understates PostgreSQL. Every generated plan is
+checked against the response schema. Run from the backend directory:
+
+    python -m benchmarks.bench_plan_generation --students 5000 --workers 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations
+from app.models import (
+    Assessment, Student, User, LearningPlan, SubjectPlan, FocusArea, LearningActivity, WeeklyGoal,
+    LearningGoal, Milestone, LearningResource, Subject, LEARNING_PLAN_LOAD_OPTIONS
+)
+from app.schemas import LearningPlan as LearningPlanSchema
+from app.services import plan_generator
+from app.services.assessment_analyzer import AssessmentAnalyzer
+
+def seed(database_url: str, n_students: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    analyzer = AssessmentAnalyzer()
+    skills = list(analyzer.skill_weights)
+    styles = [style for style, _ in analyzer.LEARNING_STYLE_SKILLS]
+    start = datetime(2024, 1, 1)
+
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(insert(Student), [
+            {"id": s, "user_id": 1, "name": f"Student {s}", "grade": 4} for s in range(1, n_students + 1)
+        ])
+        conn.execute(insert(Assessment), [
+            {
+                "student_id": s,
+                "subject": subject,
+                "score": score,
+                "total_questions": 10,
+                "completed_date": start + timedelta(minutes=rng.randint(0, 100000)),
+                "skill_breakdown": {skill: rng.randint(3, 10) for skill in rng.sample(skills, 4)},
+                "recommendations": [],
+                "learning_style": rng.choice(styles),
+                "mastery_level": analyzer.calculate_mastery_level(score),
+            }
+            for s in range(1, n_students + 1)
+            for subject in Subject
+            for score in (rng.randint(0, 10),)
+        ])
+    engine.dispose()
+
+def run_per_student_orm(SessionLocal, generator, n_students: int) -> float:
+    """Baseline: build ORM objects for each plan and commit one student at a time."""
+    db = SessionLocal()
+    start = time.perf_counter()
+    for student_id in range(1, n_students + 1):
+        latest = plan_generator.latest_assessments(db, [student_id])
+        plan = generator.build_plan(student_id, latest[student_id])
+        plan_generator.delete_plans(db, [student_id])
+        db.add(LearningPlan(
+            student_id=student_id,
+            target_date=plan["target_date"],
+            subject_plans=[
+                SubjectPlan(
+                    subject=subject_plan["subject"],
+                    progress=subject_plan["progress"],
+                    focus_areas=[
+                        FocusArea(
+                            name=focus_area["name"],
+                            description=focus_area["description"],
+                            mastery_level=focus_area["mastery_level"],
+                            activities=[LearningActivity(**activity) for activity in focus_area["activities"]],
+                        )
+                        for focus_area in subject_plan["focus_areas"]
+                    ],
+                    weekly_goals=[WeeklyGoal(**plan_generator._columns(goal)) for goal in subject_plan["weekly_goals"]],
+                )
+                for subject_plan in plan["subjects"]
+            ],
+            goals=[
+                LearningGoal(
+                    description=goal["description"],
+                    target_date=goal["target_date"],
+                    progress=goal["progress"],
+                    milestones=[Milestone(**plan_generator._columns(milestone)) for milestone in goal["milestones"]],
+                )
+                for goal in plan["goals"]
+            ],
+            resources=[LearningResource(**resource) for resource in plan["resources"]],
+        ))
+        db.commit()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+def run_bulk(SessionLocal, generator, n_students: int, chunk_size: int) -> float:
+    db = SessionLocal()
+    start = time.perf_counter()
+    for first in range(1, n_students + 1, chunk_size):
+        generator.generate_many(db, list(range(first, min(first + chunk_size, n_students + 1))))
+        db.commit()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+def run_parallel(database_url: str, workers: int, chunk_size: int) -> float:
+    start = time.perf_counter()
+    plan_generator.regenerate_all(database_url, workers=workers, chunk_size=chunk_size)
+    return time.perf_counter() - start
+
+def verify(SessionLocal, n_students: int) -> None:
+    db = SessionLocal()
+    try:
+        assert db.query(func.count(LearningPlan.id)).scalar() == n_students, "expected one plan per student"
+        for plan in db.query(LearningPlan).options(*LEARNING_PLAN_LOAD_OPTIONS).limit(100):
+            LearningPlanSchema.model_validate(plan)
+            assert len(plan.subject_plans) == len(Subject)
+    finally:
+        db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        migrations.upgrade(database_url)
+        seed(database_url, args.students)
+        engine = create_engine(database_url)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False)
+        generator = plan_generator.PlanGenerator(AssessmentAnalyzer())
+
+        timings = [
+            ("per-student ORM", run_per_student_orm(SessionLocal, generator, args.students)),
+            ("bulk, 1 process", run_bulk(SessionLocal, generator, args.students, args.chunk_size)),
+        ]
+        verify(SessionLocal, args.students)
+        timings.append((
+            f"bulk, {args.workers} workers", run_parallel(database_url, args.workers, args.chunk_size)
+        ))
+        verify(SessionLocal, args.students)
+        engine.dispose()
+
+    baseline = timings[0][1]
+    for label, seconds in timings:
+        print(f"{label:<18} {args.students / seconds:8.0f} plans/s ({baseline / seconds:.1f}x)")
+
+if __name__ == "__main__":
+    main()
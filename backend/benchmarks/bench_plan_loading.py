@@ -0,0 +1,111 @@
+"""Count queries and time for serializing learning plan trees.
+
+Compares default lazy loading with LEARNING_PLAN_LOAD_OPTIONS on an
+in-memory SQLite database and fails if the preset's query count grows
+with the number of plans. Run from the backend directory:
+
+    python -m benchmarks.bench_plan_loading
+"""
+import argparse
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import (
+    Base, Student, LearningPlan, SubjectPlan, FocusArea, LearningActivity, WeeklyGoal,
+    LearningGoal, Milestone, LearningResource, Subject, Difficulty, MasteryLevel, ResourceType,
+    LEARNING_PLAN_LOAD_OPTIONS
+)
+from app.schemas import LearningPlan as LearningPlanSchema
+
+# One query per level: plans, subject plans, focus areas, activities,
+# weekly goals, goals, milestones, resources
+EXPECTED_PRESET_QUERIES = 8
+
+@contextmanager
+def count_queries(engine):
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def seed(db: Session, n_plans: int) -> None:
+    """Create n_plans learning plans with two entries at every level of the tree."""
+    target = datetime.utcnow() + timedelta(days=30)
+    student = Student(name="Benchmark Student", grade=4, age=9)
+    db.add(student)
+    for _ in range(n_plans):
+        plan = LearningPlan(student=student, target_date=target)
+        for subject in (Subject.MATHEMATICS, Subject.ENGLISH):
+            subject_plan = SubjectPlan(learning_plan=plan, subject=subject, progress=0.5)
+            for i in range(2):
+                focus_area = FocusArea(
+                    subject_plan=subject_plan, name=f"Focus {i}", description="",
+                    mastery_level=MasteryLevel.DEVELOPING
+                )
+                for j in range(2):
+                    LearningActivity(
+                        focus_area=focus_area, title=f"Activity {j}", description="", duration=600,
+                        difficulty=Difficulty.BEGINNER, resource_type=ResourceType.PRACTICE
+                    )
+                WeeklyGoal(subject_plan=subject_plan, description=f"Week {i}", target_date=target)
+        for i in range(2):
+            goal = LearningGoal(learning_plan=plan, description=f"Goal {i}", target_date=target, progress=0.0)
+            for j in range(2):
+                Milestone(learning_goal=goal, description=f"Milestone {j}", target_date=target)
+            LearningResource(
+                learning_plan=plan, title=f"Resource {i}", description="", type=ResourceType.VIDEO,
+                url="https://example.com", subject=Subject.MATHEMATICS, difficulty=Difficulty.BEGINNER
+            )
+        db.add(plan)
+    db.commit()
+
+def load_plans(engine, options) -> tuple:
+    db = sessionmaker(bind=engine)()
+    try:
+        with count_queries(engine) as counter:
+            start = time.perf_counter()
+            plans = db.query(LearningPlan).options(*options).all()
+            payload = [LearningPlanSchema.model_validate(plan).model_dump() for plan in plans]
+            elapsed = time.perf_counter() - start
+        return counter["queries"], elapsed, len(payload)
+    finally:
+        db.close()
+
+def run(n_plans: int) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, n_plans)
+    db.close()
+
+    lazy_queries, lazy_seconds, _ = load_plans(engine, ())
+    preset_queries, preset_seconds, loaded = load_plans(engine, LEARNING_PLAN_LOAD_OPTIONS)
+    assert loaded == n_plans
+    assert preset_queries == EXPECTED_PRESET_QUERIES, (
+        f"expected {EXPECTED_PRESET_QUERIES} queries with presets, got {preset_queries}"
+    )
+
+    print(
+        f"{n_plans:>5} plans: lazy {lazy_queries:>6} queries {lazy_seconds * 1e3:8.1f} ms, "
+        f"presets {preset_queries:>2} queries {preset_seconds * 1e3:8.1f} ms"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plans", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+    for n_plans in args.plans:
+        run(n_plans)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Re-scoring stored skill breakdowns: the compiled rule table vs the old if/elif chain.
+
+Generates random skill breakdowns, produces recommendations with the
+hand-written chain the rule table replaced (kept here as the reference)
+and with AssessmentAnalyzer.recommend_many and the per-assessment path.
+The check fails unless all three yield the same messages; the rule engine
+additionally has to give the same order on every run and however the
+batch is made up, including for skills outside the analyzer's table. Run from the
+backend directory:
+
+    python -m benchmarks.bench_recommendation_rules --assessments 100000
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.models import Subject
+from app.services.assessment_analyzer import AssessmentAnalyzer
+
+def legacy_recommendations(skill_breakdown: Dict[str, int], subject: Subject) -> List[str]:
+    """The recommendation logic before the rule table, minus the order-scrambling list(set())."""
+    recommendations = []
+    avg_score = np.mean(list(skill_breakdown.values()))
+    if avg_score < 5:
+        recommendations += ["Focus on strengthening fundamental concepts", "Consider additional support in core areas"]
+    elif avg_score < 7:
+        recommendations += ["Continue practicing to maintain current level", "Challenge yourself with more advanced problems"]
+    else:
+        recommendations += ["Excellent work! Keep up the good performance", "Consider exploring advanced topics"]
+
+    subject_rules = {
+        Subject.MATHEMATICS: (("Number Operations", "Practice basic arithmetic operations"),
+                              ("Pattern and Function", "Work on identifying patterns and sequences")),
+        Subject.ENGLISH: (("Reading", "Read more age-appropriate books"),
+                          ("Writing", "Practice writing short stories and essays")),
+        Subject.SCIENCE: (("Living Things", "Study basic biology concepts"),
+                          ("Forces and Energy", "Learn about basic physics principles")),
+    }
+    for skill, message in subject_rules.get(subject, ()):
+        if skill in skill_breakdown and skill_breakdown[skill] < 7:
+            recommendations.append(message)
+
+    for skill, score in skill_breakdown.items():
+        if score < 6:
+            recommendations.append(f"Focus on improving {skill} skills")
+            recommendations.append(f"Practice more {skill} exercises")
+    return recommendations
+
+# Skills outside the analyzer's table, mixed into some breakdowns
+UNKNOWN_SKILLS = ["Robotics", "Coding", "Astronomy", "Chess"]
+
+def make_breakdowns(n: int, skills: List[str], seed: int = 42):
+    rng = random.Random(seed)
+    subjects = list(Subject)
+    breakdowns = []
+    for _ in range(n):
+        chosen = rng.sample(skills, rng.randint(1, 6))
+        if rng.random() < 0.1:
+            chosen += rng.sample(UNKNOWN_SKILLS, 2)
+            rng.shuffle(chosen)
+        breakdowns.append({skill: rng.randint(0, 12) for skill in chosen})
+    return breakdowns, [rng.choice(subjects) for _ in range(n)]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=100000)
+    args = parser.parse_args()
+
+    analyzer = AssessmentAnalyzer()
+    breakdowns, subjects = make_breakdowns(args.assessments, analyzer.skill_features)
+
+    start = time.perf_counter()
+    expected = [legacy_recommendations(b, s) for b, s in zip(breakdowns, subjects)]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [analyzer._generate_recommendations(b, s) for b, s in zip(breakdowns, subjects)]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = analyzer.recommend_many(breakdowns, subjects)
+    batch_seconds = time.perf_counter() - start
+
+    assert batch == single, "batch and per-assessment rule evaluation disagree"
+    assert batch == analyzer.recommend_many(breakdowns, subjects), "rule engine order is not stable"
+    # Unknown skills must not order messages by where they first appear in a batch
+    assert batch[::-1] == analyzer.recommend_many(breakdowns[::-1], subjects[::-1]), "order depends on the batch"
+    for old, new in zip(expected, batch):
+        assert set(old) == set(new) and len(new) == len(set(new)), (old, new)
+
+    n = args.assessments
+    print(f"if/elif chain:     {legacy_seconds / n * 1e6:7.2f} us/assessment")
+    print(f"rules, one by one: {single_seconds / n * 1e6:7.2f} us/assessment")
+    print(f"rules, batched:    {batch_seconds / n * 1e6:7.2f} us/assessment ({legacy_seconds / batch_seconds:.1f}x)")
+    fired = analyzer.rules.stats()["fired"]
+    print("fired:", ", ".join(f"{rule_id}={count}" for rule_id, count in fired.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Top-N resource lookups: in-memory ResourceCatalog vs the equivalent SQL query.
+
+Seeds a migrated SQLite database with catalog resources spread over every
+subject, skill, difficulty and type, then answers the same random "top-N
+resources for these weak skills" queries both ways. The check fails if the
+two disagree. Run from the backend directory:
+
+    python -m benchmarks.bench_resource_index --resources 100000 --queries 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import case, create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations
+from app.models import LearningResource, Subject, Difficulty, ResourceType
+from app.services.assessment_analyzer import AssessmentAnalyzer
+from app.services.resource_catalog import CATALOG_COLUMNS, ResourceCatalogIndex
+
+def seed(engine, n_resources: int, skills: list, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    rows = [
+        {
+            "title": f"Resource {i}",
+            "description": "",
+            "type": rng.choice(list(ResourceType)),
+            "url": f"/resources/{i}",
+            "subject": rng.choice(list(Subject)),
+            "difficulty": rng.choice(list(Difficulty)),
+            "skill_category": rng.choice(skills),
+        }
+        for i in range(n_resources)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(LearningResource.__table__), rows)
+
+def make_queries(n: int, skills: list, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        (
+            rng.choice(list(Subject)),
+            rng.sample(skills, 3),
+            rng.sample(list(Difficulty), 2),
+            rng.sample(list(ResourceType), 3),
+            rng.choice((5, 10, 20)),
+        )
+        for _ in range(n)
+    ]
+
+def preference(column, values):
+    """CASE ranking column values by their position in values; comparisons bind with the column's type."""
+    return case(*[(column == value, i) for i, value in enumerate(values)])
+
+def sql_top_n(db, subject, skills, difficulties, resource_types, n) -> list:
+    """The SQL equivalent of ResourceCatalog.top_n without a per-skill cap."""
+    stmt = select(*CATALOG_COLUMNS).where(
+        LearningResource.learning_plan_id.is_(None),
+        LearningResource.subject == subject,
+        LearningResource.skill_category.in_(skills),
+        LearningResource.difficulty.in_(difficulties),
+        LearningResource.type.in_(resource_types),
+    ).order_by(
+        preference(LearningResource.skill_category, skills),
+        preference(LearningResource.difficulty, difficulties),
+        preference(LearningResource.type, resource_types),
+        LearningResource.id,
+    ).limit(n)
+    return [row.id for row in db.execute(stmt)]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resources", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    skills = list(AssessmentAnalyzer().skill_weights)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        migrations.upgrade(database_url)
+        engine = create_engine(database_url)
+        seed(engine, args.resources, skills)
+        db = sessionmaker(bind=engine)()
+
+        index = ResourceCatalogIndex(refresh_interval=60.0)
+        start = time.perf_counter()
+        index.load(db)
+        load_seconds = time.perf_counter() - start
+        catalog = index.catalog
+
+        queries = make_queries(args.queries, skills)
+        start = time.perf_counter()
+        sql_results = [sql_top_n(db, *query) for query in queries]
+        sql_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index_results = [
+            [resource.id for resource in catalog.top_n(subject, skills_, difficulties, types, n=n)]
+            for subject, skills_, difficulties, types, n in queries
+        ]
+        index_seconds = time.perf_counter() - start
+
+        db.close()
+        engine.dispose()
+
+    assert index_results == sql_results, "index and SQL disagree"
+    print(f"load {len(catalog)} resources: {load_seconds * 1e3:.0f} ms")
+    print(f"SQL:   {sql_seconds / args.queries * 1e6:8.1f} us/query")
+    print(f"index: {index_seconds / args.queries * 1e6:8.1f} us/query ({sql_seconds / index_seconds:.0f}x)")
+
+if __name__ == "__main__":
+    main()
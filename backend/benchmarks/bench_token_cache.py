@@ -0,0 +1,92 @@
+"""Token verification: full JWT decode vs the verified-token cache.
+
+Issues a pool of access tokens and authenticates random ones from it, once
+by decoding and verifying every token and once through the cache plus the
+revocation filter, as core.auth does. A share of the tokens is revoked
+first and the check fails unless both paths reject exactly those tokens.
+The revocation filter is loaded from a migrated SQLite database. Run from
+the backend directory:
+
+    python -m benchmarks.bench_token_cache --tokens 1000 --revoked 5000 --revoked-in-use 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations
+from app.core.security import create_access_token, verify_token
+from app.core.token_cache import TokenRevocations, VerifiedTokenCache, token_digest
+from app.models import RevokedToken
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct tokens in use")
+    parser.add_argument("--revoked", type=int, default=5000, help="revocations in the table")
+    parser.add_argument("--revoked-in-use", type=int, default=10, help="how many of the tokens in use are revoked")
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    tokens = [create_access_token(data={"sub": str(rng.randint(1, 10**6))}) for _ in range(args.tokens)]
+    revoked_in_use = set(rng.sample(range(args.tokens), min(args.tokens, args.revoked, args.revoked_in_use)))
+    revoked_digests = [token_digest(tokens[i]) for i in revoked_in_use]
+    revoked_digests += [os.urandom(32) for _ in range(args.revoked - len(revoked_digests))]
+    lookups = [rng.randrange(args.tokens) for _ in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = f"sqlite:///{os.path.join(tmpdir, 'tokens.db')}"
+        migrations.upgrade(url)
+        engine = create_engine(url)
+        expires_at = datetime.utcfromtimestamp(verify_token(tokens[0])["exp"])
+        with engine.begin() as conn:
+            conn.execute(insert(RevokedToken), [
+                {"token_digest": digest.hex(), "expires_at": expires_at}
+                for digest in revoked_digests
+            ])
+        db = sessionmaker(bind=engine)()
+
+        revocations = TokenRevocations(refresh_interval=3600, capacity=args.revoked, error_rate=0.001)
+        start = time.perf_counter()
+        revocations.load(db)
+        print(f"loaded {args.revoked} revocations in {(time.perf_counter() - start) * 1e3:.1f} ms "
+              f"({revocations.filter.size // 8 // 1024} KiB filter)")
+
+        start = time.perf_counter()
+        rejected_full = set()
+        for i in lookups:
+            payload = verify_token(tokens[i])
+            if revocations.is_revoked(db, token_digest(tokens[i]), int(payload["sub"]), payload["iat"]):
+                rejected_full.add(i)
+        full = (time.perf_counter() - start) / args.lookups * 1e6
+
+        cache = VerifiedTokenCache(max_size=args.tokens)
+        start = time.perf_counter()
+        rejected_cached = set()
+        for i in lookups:
+            digest = token_digest(tokens[i])
+            payload = cache.get(digest)
+            if payload is None:
+                payload = verify_token(tokens[i])
+                cache.put(digest, payload)
+            if revocations.is_revoked(db, digest, int(payload["sub"]), payload["iat"]):
+                rejected_cached.add(i)
+        cached = (time.perf_counter() - start) / args.lookups * 1e6
+        db.close()
+        engine.dispose()
+
+    expected = revoked_in_use & set(lookups)
+    assert rejected_full == expected and rejected_cached == expected, "revocation results differ"
+    stats = revocations.stats()
+    print(f"full verify:   {full:8.2f} us/request")
+    print(f"cached verify: {cached:8.2f} us/request ({full / cached:.1f}x), "
+          f"cache hit ratio {cache.stats()['hit_ratio']:.1%}")
+    print(f"filter confirmations {stats['confirmations']}, false positives {stats['false_positives']}")
+
+if __name__ == "__main__":
+    main()
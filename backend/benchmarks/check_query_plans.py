@@ -0,0 +1,225 @@
+"""Fail if any endpoint query falls back to a sequential scan.
+
+Migrates a database to head, seeds a large synthetic dataset, runs ANALYZE,
+then drives the read endpoints' query paths while recording every SELECT
+they issue. Each recorded statement is re-run under EXPLAIN and the check
+exits non-zero if a plan scans a whole table that is not on the small-table
+allow list. Uses a temporary SQLite database unless --database-url points at
+a (disposable) PostgreSQL database. Run from the backend directory:
+
+    python -m benchmarks.check_query_plans
+    python -m benchmarks.check_query_plans --database-url postgresql://.../tutorkids_explain
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations
+from app.api.endpoints import assessments, learning_plans
+from app.models import (
+    User, Student, Assessment, AssessmentResponse, QuestionBankItem, LearningPlan, SubjectPlan, FocusArea, LearningActivity,
+    WeeklyGoal, LearningGoal, Milestone, LearningResource, Subject, Difficulty, MasteryLevel, ResourceType
+)
+from app.services import assessment_rollup, student_progress
+from app.services.question_bank import question_bank
+
+# Bank questions per subject in the seeded data
+QUESTIONS_PER_SUBJECT = 300
+
+# Tables bounded by configuration rather than data volume; scanning them is expected
+SMALL_TABLES = {"assessment_rollups", "student_cluster_models", "alembic_version"}
+
+@contextmanager
+def record_selects(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def seed(engine, n_users: int, students_per_user: int, assessments_per_student: int, seed: int = 42) -> None:
+    """Bulk insert users, students, assessments with responses to bank questions, and one plan tree per student."""
+    rng = random.Random(seed)
+    subjects = list(Subject)
+    start = datetime(2024, 1, 1)
+    n_students = n_users * students_per_user
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": u, "email": f"user{u}@example.com", "hashed_password": "x", "is_active": True, "is_admin": False}
+            for u in range(1, n_users + 1)
+        ])
+        conn.execute(insert(Student), [
+            {"id": s, "user_id": (s - 1) // students_per_user + 1, "name": f"Student {s}", "grade": rng.randint(1, 8)}
+            for s in range(1, n_students + 1)
+        ])
+
+        difficulties = list(Difficulty)
+        conn.execute(insert(QuestionBankItem), [
+            {"id": s * QUESTIONS_PER_SUBJECT + q + 1, "content_hash": f"{s:032x}{q:032x}", "subject": subject,
+             "text": f"Q{q}", "options": [], "correct_answer": 0, "difficulty": difficulties[q % len(difficulties)],
+             "skill_category": "problem_solving"}
+            for s, subject in enumerate(subjects) for q in range(QUESTIONS_PER_SUBJECT)
+        ])
+
+        assessment_id = 0
+        for first in range(1, n_students + 1, 500):
+            rows, responses = [], []
+            for student_id in range(first, min(first + 500, n_students + 1)):
+                for _ in range(assessments_per_student):
+                    assessment_id += 1
+                    subject = rng.randrange(len(subjects))
+                    rows.append({
+                        "id": assessment_id,
+                        "student_id": student_id,
+                        "subject": subjects[subject],
+                        "score": rng.randint(0, 10),
+                        "total_questions": 2,
+                        "completed_date": start + timedelta(minutes=rng.randint(0, 500000)),
+                        "skill_breakdown": {},
+                        "recommendations": [],
+                        "learning_style": "visual",
+                        "mastery_level": MasteryLevel.DEVELOPING,
+                    })
+                    responses.extend(
+                        {"assessment_id": assessment_id, "position": position,
+                         "question_id": subject * QUESTIONS_PER_SUBJECT + rng.randrange(QUESTIONS_PER_SUBJECT) + 1,
+                         "chosen_option": 0, "is_correct": True}
+                        for position in range(2)
+                    )
+            conn.execute(insert(Assessment), rows)
+            conn.execute(insert(AssessmentResponse), responses)
+
+        # Plan tree: ids line up with student ids to keep the seeding flat
+        ids = range(1, n_students + 1)
+        target = start + timedelta(days=30)
+        conn.execute(insert(LearningPlan), [{"id": i, "student_id": i, "created_at": start, "target_date": target} for i in ids])
+        conn.execute(insert(SubjectPlan), [
+            {"id": i, "learning_plan_id": i, "subject": Subject.MATHEMATICS, "progress": 0.0} for i in ids
+        ])
+        conn.execute(insert(FocusArea), [
+            {"id": i, "subject_plan_id": i, "name": "Focus", "mastery_level": MasteryLevel.DEVELOPING} for i in ids
+        ])
+        conn.execute(insert(LearningActivity), [
+            {"focus_area_id": i, "title": "Activity", "duration": 600, "difficulty": Difficulty.BEGINNER,
+             "resource_type": ResourceType.PRACTICE} for i in ids
+        ])
+        conn.execute(insert(WeeklyGoal), [{"subject_plan_id": i, "description": "Week", "target_date": target} for i in ids])
+        conn.execute(insert(LearningGoal), [
+            {"id": i, "learning_plan_id": i, "description": "Goal", "target_date": target, "progress": 0.0} for i in ids
+        ])
+        conn.execute(insert(Milestone), [{"learning_goal_id": i, "description": "Milestone", "target_date": target} for i in ids])
+        conn.execute(insert(LearningResource), [
+            {"learning_plan_id": i, "title": "Resource", "type": ResourceType.VIDEO, "url": "https://example.com",
+             "subject": Subject.MATHEMATICS, "difficulty": Difficulty.BEGINNER} for i in ids
+        ])
+
+    db = sessionmaker(bind=engine)()
+    try:
+        student_progress.rebuild_progress(db, alpha=0.3)
+    finally:
+        db.close()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+def exercise_endpoints(db, user_id: int, student_id: int) -> None:
+    """Call the read endpoints the way FastAPI would, as the given user."""
+    user = db.get(User, user_id)
+    assessment_id = db.query(Assessment.id).filter(Assessment.student_id == student_id).first()[0]
+
+    assessments.get_assessment(assessment_id, db=db, current_user=user)
+    response = assessments.get_student_assessments(student_id, limit=20, cursor=None, stream=False, db=db, current_user=user)
+    next_cursor = response.headers.get("X-Next-Cursor")
+    if next_cursor:
+        assessments.get_student_assessments(student_id, limit=20, cursor=next_cursor, stream=False, db=db, current_user=user)
+    assessments.get_subject_assessments(
+        Subject.MATHEMATICS, limit=20, cursor=None, stream=False, db=db, current_user=user
+    )
+    assessments.get_student_progress(student_id, subject=None, since=None, period="week", db=db, current_user=user)
+    question_bank.load_set(db, Subject.MATHEMATICS, Difficulty.BEGINNER)
+    student_progress.record_scores(db, [
+        student_progress.ScoreEvent(student_id, Subject.MATHEMATICS, 7.0, MasteryLevel.PROFICIENT, datetime.utcnow())
+    ], alpha=0.3)
+    db.rollback()
+    learning_plans.get_learning_plan(student_id, db=db, current_user=user)
+    learning_plans.get_student_learning_plans(student_id, db=db, current_user=user)
+    assessments.clusterer.get_clusters(db, 3)
+    assessment_rollup.get_distribution(db, "learning_style", Subject.MATHEMATICS)
+    db.query(User).filter(User.email == user.email).first()
+
+def full_scans(conn, statement: str, parameters) -> list:
+    """Tables the plan reads end to end."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+        scans = []
+        for row in rows:
+            detail = row[-1]
+            # "SCAN t" is a table scan; "SCAN t USING [COVERING] INDEX" walks an index in order
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                scans.append(detail.split()[1])
+        return scans
+
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", ()))
+    return scans
+
+def run(database_url: str, n_users: int, students_per_user: int, assessments_per_student: int) -> int:
+    migrations.upgrade(database_url)
+    engine = create_engine(database_url)
+    seed(engine, n_users, students_per_user, assessments_per_student)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        with record_selects(engine) as statements:
+            exercise_endpoints(db, user_id=n_users // 2, student_id=(n_users // 2) * students_per_user)
+    finally:
+        db.close()
+
+    failures = 0
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            scans = [table for table in full_scans(conn, statement, parameters) if table not in SMALL_TABLES]
+            if scans:
+                failures += 1
+                print(f"SEQ SCAN on {', '.join(scans)}:\n    {' '.join(statement.split())}\n")
+    print(f"{len(statements)} queries checked, {failures} with sequential scans")
+    return failures
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="empty database to migrate and seed (default: temporary SQLite)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--students-per-user", type=int, default=4)
+    parser.add_argument("--assessments-per-student", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'explain.db')}"
+        failures = run(database_url, args.users, args.students_per_user, args.assessments_per_student)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""In-process HTTP load test of the API.
+
+Migrates a database (a temporary SQLite file unless --database-url names
+an empty, disposable PostgreSQL database), fills it with
+benchmarks.synthetic, then drives the real app.main application through
+httpx.ASGITransport. Concurrent virtual clients log in and then issue a
+weighted mix of requests:
+
+- assessment creation;
+- question set fetches;
+- student and subject listings;
+- progress reads;
+- the admin analytics endpoints;
+- repeat logins.
+
+Per-endpoint throughput and latency percentiles are reported. No network
+or external service is involved. Run from the backend directory:
+
+    python -m benchmarks.load_test --users 50 --concurrency 8 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# (action, weight) for the request mix after each client's first login
+MIX = (
+    ("create_assessment", 20),
+    ("question_set", 10),
+    ("list_student_assessments", 25),
+    ("list_subject_assessments", 10),
+    ("student_progress", 10),
+    ("analytics_learning_styles", 10),
+    ("analytics_mastery_levels", 5),
+    ("analytics_clusters", 5),
+    ("login", 5),
+)
+
+def prepare_environment(database_url: str, bcrypt_rounds: Optional[int] = None) -> None:
+    """Point the app's settings at the benchmark database; must run before any app module is imported."""
+    if "app.core.config" in sys.modules:
+        raise RuntimeError("prepare_environment() must be called before importing app modules")
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["DATABASE_ASYNC"] = os.environ.get("DATABASE_ASYNC", "false")
+    if bcrypt_rounds is not None:
+        os.environ["SECURITY_BCRYPT_ROUNDS"] = str(bcrypt_rounds)
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, Dict]:
+    results = {}
+    everything = []
+    for action in sorted(latencies):
+        samples = latencies[action]
+        everything.extend(samples)
+        results[action] = {
+            "requests": len(samples),
+            "errors": errors.get(action, 0),
+            "requests_per_s": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(samples, 0.50) * 1e3, 2),
+            "p95_ms": round(percentile(samples, 0.95) * 1e3, 2),
+            "p99_ms": round(percentile(samples, 0.99) * 1e3, 2),
+        }
+    results["total"] = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "requests_per_s": round(len(everything) / elapsed, 2),
+        "p50_ms": round(percentile(everything, 0.50) * 1e3, 2),
+        "p95_ms": round(percentile(everything, 0.95) * 1e3, 2),
+        "p99_ms": round(percentile(everything, 0.99) * 1e3, 2),
+    }
+    return results
+
+async def run_load(dataset, concurrency: int, duration: float, seed: int = 7) -> Dict[str, Dict]:
+    """Drive app.main with `concurrency` clients for `duration` seconds; returns per-action statistics."""
+    import httpx
+    from app.core.config import settings
+    from app.main import app
+    from app.models import Difficulty, Subject
+    from benchmarks.synthetic import assessment_payload
+
+    prefix = settings.API_V1_PREFIX
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    actions = [action for action, _ in MIX]
+    weights = [weight for _, weight in MIX]
+
+    async def call(client, action: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies[action].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors[action] += 1
+        return response
+
+    async def login(client, email: str) -> Dict[str, str]:
+        # A saturated password hashing pool sheds logins with 503; those count
+        # as errors and the client retries after Retry-After
+        while True:
+            response = await call(client, "login", "POST", f"{prefix}/auth/login",
+                                  data={"username": email, "password": dataset.password})
+            if response.status_code != 503:
+                response.raise_for_status()
+                return {"Authorization": f"Bearer {response.json()['access_token']}"}
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    async def virtual_client(client, index: int, deadline: float, admin_headers: Dict[str, str]) -> None:
+        rng = random.Random(seed * 1000 + index)
+        user_id = index % len(dataset.emails) + 1
+        email = dataset.emails[user_id - 1]
+        student_ids = dataset.students_by_user[user_id]
+        headers = await login(client, email)
+
+        while time.perf_counter() < deadline:
+            action = rng.choices(actions, weights)[0]
+            student_id = rng.choice(student_ids)
+            if action == "create_assessment":
+                await call(client, action, "POST", f"{prefix}/assessments/",
+                           json=assessment_payload(rng, student_id), headers=headers)
+            elif action == "question_set":
+                await call(client, action, "GET",
+                           f"{prefix}/question-sets/{rng.choice(list(Subject)).value}/{rng.choice(list(Difficulty)).value}",
+                           headers=headers)
+            elif action == "list_student_assessments":
+                await call(client, action, "GET", f"{prefix}/students/{student_id}/assessments",
+                           params={"limit": 20}, headers=headers)
+            elif action == "list_subject_assessments":
+                await call(client, action, "GET", f"{prefix}/assessments/subject/{rng.choice(list(Subject)).value}",
+                           params={"limit": 20}, headers=headers)
+            elif action == "student_progress":
+                await call(client, action, "GET", f"{prefix}/students/{student_id}/progress",
+                           params={"period": "week"}, headers=headers)
+            elif action == "analytics_learning_styles":
+                await call(client, action, "GET", f"{prefix}/assessments/analysis/learning-styles",
+                           headers=admin_headers)
+            elif action == "analytics_mastery_levels":
+                await call(client, action, "GET", f"{prefix}/assessments/analysis/mastery-levels",
+                           params={"subject": rng.choice(list(Subject)).value}, headers=admin_headers)
+            elif action == "analytics_clusters":
+                await call(client, action, "GET", f"{prefix}/assessments/analysis/clusters", headers=admin_headers)
+            else:
+                await login(client, email)
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            admin_headers = await login(client, dataset.emails[0])
+            start = time.perf_counter()
+            deadline = start + duration
+            await asyncio.gather(*(
+                virtual_client(client, index, deadline, admin_headers) for index in range(concurrency)
+            ))
+            elapsed = time.perf_counter() - start
+    finally:
+        await app.router.shutdown()
+    return summarize(latencies, errors, elapsed)
+
+def seed_database(database_url: str, users: int, students_per_user: int, assessments_per_student: int, seed: int):
+    """Migrate and fill the benchmark database; returns the SyntheticDataset."""
+    from sqlalchemy import create_engine
+    from app import migrations
+    from benchmarks import synthetic
+
+    migrations.upgrade(database_url)
+    engine = create_engine(database_url)
+    try:
+        return synthetic.generate(engine, users, students_per_user, assessments_per_student, seed=seed)
+    finally:
+        engine.dispose()
+
+def print_results(results: Dict[str, Dict]) -> None:
+    print(f"{'endpoint':<28} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for action, stats in results.items():
+        print(
+            f"{action:<28} {stats['requests']:>8} {stats['errors']:>6} {stats['requests_per_s']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--database-url", help="empty PostgreSQL database to use instead of a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--students-per-user", type=int, default=2)
+    parser.add_argument("--assessments-per-student", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load")
+    parser.add_argument("--bcrypt-rounds", type=int, help="override SECURITY_BCRYPT_ROUNDS for the run")
+    parser.add_argument("--seed", type=int, default=42)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'loadtest.db')}"
+        prepare_environment(database_url, args.bcrypt_rounds)
+        dataset = seed_database(database_url, args.users, args.students_per_user, args.assessments_per_student, args.seed)
+        results = asyncio.run(run_load(dataset, args.concurrency, args.duration, args.seed))
+        from app.database import engine
+        engine.dispose()
+    print_results(results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Run the analyzer microbenchmarks and the HTTP load test and write a JSON results file.
+
+The file records the git commit and machine next to every metric, so runs
+from different commits can be compared:
+
+    python -m benchmarks.run_suite --output results/HEAD.json
+    python -m benchmarks.run_suite --output results/branch.json --compare results/HEAD.json
+
+With --compare, any metric more than --tolerance worse than the baseline is
+listed, and the exit status is non-zero. Metrics ending in _per_s count as
+worse when lower; all other timing metrics count as worse when higher.
+Everything runs in-process against a temporary SQLite database unless
+--database-url names an empty PostgreSQL database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional
+
+from benchmarks import load_test
+
+# Flattened metric names compared across runs; counts and error totals are informational
+COMPARED_SUFFIXES = ("us_per_assessment", "requests_per_s", "p50_ms", "p95_ms", "p99_ms")
+
+def git_revision() -> Dict[str, Optional[str]]:
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and name.endswith(COMPARED_SUFFIXES):
+            flat[name] = value
+    return flat
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> int:
+    """Print metric changes against a baseline run; returns the number of regressions."""
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    regressions = 0
+    print(f"\nvs {baseline['meta'].get('commit') or 'baseline'} (tolerance {tolerance:.0%})")
+    for name in sorted(now.keys() & before.keys()):
+        if not before[name]:
+            continue
+        change = now[name] / before[name] - 1
+        worse = -change if name.endswith("_per_s") else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"  {name:<58} {before[name]:>10.2f} -> {now[name]:>10.2f} ({change:+.1%}){flag}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load_test.add_arguments(parser)
+    parser.add_argument("--analyzer-assessments", type=int, default=2000)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="results file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown per metric")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'suite.db')}"
+        load_test.prepare_environment(database_url, args.bcrypt_rounds)
+        from benchmarks import bench_analyzer
+
+        analyzer_results = bench_analyzer.run(args.analyzer_assessments, seed=args.seed)
+        dataset = load_test.seed_database(
+            database_url, args.users, args.students_per_user, args.assessments_per_student, args.seed
+        )
+        load_results = asyncio.run(load_test.run_load(dataset, args.concurrency, args.duration, args.seed))
+        from app.database import engine
+        engine.dispose()
+
+    document = {
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": "postgresql" if args.database_url else "sqlite",
+            "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "database_url")},
+        },
+        "results": {"analyzer": analyzer_results, "load_test": load_results},
+    }
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w") as output:
+        json.dump(document, output, indent=2)
+
+    for name, result in analyzer_results.items():
+        print(f"{name:<24} {result['us_per_assessment']:10.2f} us/assessment")
+    print()
+    load_test.print_results(load_results)
+    print(f"\nwrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(document, json.load(baseline_file), args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
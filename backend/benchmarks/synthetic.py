@@ -0,0 +1,171 @@
+"""Seeded synthetic dataset for benchmarks and load tests.
+
+Creates users, students and assessments whose subjects and skill categories
+match the analyzer's skill table, answering questions drawn from a fixed
+per-subject pool as real tests do, so the question bank stays small while
+response rows grow with every assessment. Analyzes the assessments with
+AssessmentAnalyzer.analyze_many so every derived column is what the API
+would have stored, and backfills the rollup, progress and cluster tables the
+read endpoints serve from. The same seed always yields the same data.
+
+Import app modules only after the database settings are in place; see
+benchmarks.load_test.prepare_environment.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Subject, Difficulty
+
+SUBJECT_SKILLS = {
+    Subject.MATHEMATICS: ("Number Operations", "Pattern and Function", "Shape and Space", "Data Handling"),
+    Subject.ENGLISH: ("Reading", "Writing", "Speaking", "Listening", "Viewing", "Presenting"),
+    Subject.SCIENCE: ("Living Things", "Materials and Matter", "Forces and Energy", "Earth and Space"),
+    Subject.SOCIAL_STUDIES: ("Human Systems", "Social Organization", "Culture", "Time, Continuity and Change"),
+    Subject.ARTS: ("Visual Arts", "Music", "Drama", "Dance"),
+}
+
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 2000
+# Distinct questions per subject that tests draw from
+QUESTION_POOL_SIZE = 30
+
+class SyntheticDataset(NamedTuple):
+    """What the load test needs to know about the generated data."""
+    emails: List[str]           # index 0 is the admin user
+    password: str
+    students_by_user: Dict[int, List[int]]
+    n_assessments: int
+
+def _question_pool(subject: Subject) -> List[Dict]:
+    rng = random.Random(subject.name)
+    skills = SUBJECT_SKILLS[subject]
+    difficulties = list(Difficulty)
+    return [
+        {
+            "text": f"{subject.value} question {q + 1}",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": rng.randrange(4),
+            "explanation": "",
+            "difficulty": difficulties[q % len(difficulties)].value,
+            "skill_category": skills[q % len(skills)],
+        }
+        for q in range(QUESTION_POOL_SIZE)
+    ]
+
+QUESTION_POOLS = {subject: _question_pool(subject) for subject in SUBJECT_SKILLS}
+
+def assessment_payload(rng: random.Random, student_id: int, questions: int = 10) -> Dict:
+    """A JSON body for POST /assessments/ on one random subject, answering questions from its pool."""
+    subject = rng.choice(list(SUBJECT_SKILLS))
+    return {
+        "student_id": student_id,
+        "subject": subject.value,
+        "score": rng.randint(0, 10),
+        "total_questions": questions,
+        "skill_breakdown": {},
+        "recommendations": [],
+        "questions": [
+            {**question, "chosen_option": rng.randrange(4)}
+            for question in rng.sample(QUESTION_POOLS[subject], min(questions, QUESTION_POOL_SIZE))
+        ],
+    }
+
+def generate(
+    engine,
+    n_users: int,
+    students_per_user: int = 2,
+    assessments_per_student: int = 5,
+    questions_per_assessment: int = 10,
+    seed: int = 42,
+    now: Optional[datetime] = None
+) -> SyntheticDataset:
+    """Fill a migrated, empty database; user 1 is an admin."""
+    from app.core.config import settings
+    from app.core.security import get_password_hash
+    from app.models import Assessment, AssessmentResponse, QuestionBankItem, Student, User
+    from app.schemas import AssessmentCreate
+    from app.services import assessment_rollup, student_progress
+    from app.services.assessment_analyzer import AssessmentAnalyzer
+    from app.services.question_bank import CONTENT_FIELDS, content_hash, response_rows
+    from app.services.student_clustering import StudentClusterer
+
+    analyzer = AssessmentAnalyzer()
+    assert set(analyzer.skill_weights) == {skill for skills in SUBJECT_SKILLS.values() for skill in skills}
+
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    # One hash at the configured cost; logins verify it without a rehash
+    hashed_password = get_password_hash(PASSWORD)
+    emails = [f"user{u}@example.com" for u in range(1, n_users + 1)]
+    students_by_user = {
+        u: list(range((u - 1) * students_per_user + 1, u * students_per_user + 1)) for u in range(1, n_users + 1)
+    }
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": u, "email": email, "hashed_password": hashed_password, "full_name": f"User {u}",
+             "is_active": True, "is_admin": u == 1}
+            for u, email in enumerate(emails, start=1)
+        ])
+        conn.execute(insert(Student), [
+            {"id": s, "user_id": u, "name": f"Student {s}", "grade": rng.randint(1, 8), "age": rng.randint(6, 14)}
+            for u, student_ids in students_by_user.items() for s in student_ids
+        ])
+
+        student_ids = [s for ids in students_by_user.values() for s in ids]
+        pairs = [(s, i) for s in student_ids for i in range(assessments_per_student)]
+        assessment_id = 0
+        bank_ids = {}
+        for first in range(0, len(pairs), BATCH_SIZE):
+            payloads = [
+                assessment_payload(rng, student_id, questions_per_assessment)
+                for student_id, _ in pairs[first:first + BATCH_SIZE]
+            ]
+            assessments = [AssessmentCreate.model_validate(payload) for payload in payloads]
+            rows, bank_items, responses = [], [], []
+            for assessment, analysis in zip(assessments, analyzer.analyze_many(assessments)):
+                assessment_id += 1
+                rows.append({
+                    "id": assessment_id,
+                    "student_id": assessment.student_id,
+                    "subject": assessment.subject,
+                    "score": assessment.score,
+                    "total_questions": len(assessment.questions),
+                    "completed_date": now - timedelta(minutes=rng.randint(1, 90 * 24 * 60)),
+                    "skill_breakdown": analysis.skill_breakdown,
+                    "recommendations": analysis.recommendations,
+                    "learning_style": analysis.learning_style,
+                    "mastery_level": analysis.mastery_level,
+                })
+                question_ids = []
+                for question in assessment.questions:
+                    digest = content_hash(assessment.subject, question)
+                    if digest not in bank_ids:
+                        bank_ids[digest] = len(bank_ids) + 1
+                        bank_items.append({
+                            "id": bank_ids[digest], "content_hash": digest, "subject": assessment.subject,
+                            **question.model_dump(include=set(CONTENT_FIELDS)),
+                        })
+                    question_ids.append(bank_ids[digest])
+                responses.extend(response_rows(assessment_id, assessment.questions, question_ids))
+            conn.execute(insert(Assessment), rows)
+            if bank_items:
+                conn.execute(insert(QuestionBankItem), bank_items)
+            conn.execute(insert(AssessmentResponse), responses)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        assessment_rollup.rebuild_rollup(db)
+        student_progress.rebuild_progress(db, settings.PROGRESS_EWMA_ALPHA)
+        clusterer = StudentClusterer(analyzer, batch_size=settings.CLUSTER_BATCH_SIZE)
+        for n_clusters in settings.CLUSTER_COUNTS:
+            clusterer.update(db, n_clusters)
+            clusterer.reassign_all(db, n_clusters)
+    finally:
+        db.close()
+
+    return SyntheticDataset(emails, PASSWORD, students_by_user, assessment_id)
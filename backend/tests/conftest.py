@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+import pytest
+
+# app.database builds its engine at import time; point it at a scratch
+# SQLite file before any test module imports the app
+_scratch = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch.name, 'tutorkids.db')}")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import JSON_OPTIONS  # noqa: E402
+from app.models import Base  # noqa: E402
+
+@pytest.fixture
+def database_url(tmp_path) -> str:
+    """URL of an empty SQLite database that lives for one test."""
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+@pytest.fixture
+def engine(database_url):
+    """Engine on a fresh SQLite database with every table created from the models."""
+    engine = create_engine(database_url, **JSON_OPTIONS)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,161 @@
+import random
+
+import pytest
+
+from app.models import Assessment, AssessmentResponse, Difficulty, QuestionBankItem, Student, StudentProgress, Subject
+from app.schemas import QuestionCreate
+from app.services.adaptive_testing import AdaptiveTester, ItemBankIndex, ItemIndex, information
+from app.services.assessment_analyzer import AssessmentAnalyzer
+from app.services.assessment_ingest import AssessmentIngester
+from app.services.question_bank import content_hash
+from app.services.student_clustering import StudentClusterer
+from benchmarks.bench_adaptive import make_items
+from benchmarks.synthetic import SUBJECT_SKILLS
+
+ITEMS_PER_SKILL = 200
+
+@pytest.fixture(scope="module")
+def items():
+    return make_items(ITEMS_PER_SKILL, random.Random(42))
+
+@pytest.fixture(scope="module")
+def index(items):
+    return ItemIndex(items)
+
+def scan(index, items, subject, skill, theta, exclude):
+    """Best information over every matching item; None when all are excluded."""
+    candidates = [
+        information(theta, *index.parameters(item.id)) for item in items
+        if item.subject == subject and skill in (None, item.skill_category) and item.id not in exclude
+    ]
+    return max(candidates, default=None)
+
+def keys():
+    return [(subject, skill) for subject, skills in SUBJECT_SKILLS.items() for skill in (None, *skills[:2])]
+
+@pytest.mark.parametrize("subject,skill", keys())
+def test_next_item_matches_scan_with_unbounded_window(index, items, subject, skill):
+    rng = random.Random(7)
+    pool = [item.id for item in items if item.subject == subject and skill in (None, item.skill_category)]
+    for _ in range(50):
+        theta = rng.uniform(-3.5, 3.5)
+        exclude = set(rng.sample(pool, rng.randrange(0, 40)))
+
+        chosen = index.next_item(subject, skill, theta, exclude, window=len(items))
+
+        assert chosen not in exclude
+        # Compare information rather than ids: equally informative items may tie
+        assert information(theta, *index.parameters(chosen)) == pytest.approx(
+            scan(index, items, subject, skill, theta, exclude)
+        )
+
+def test_next_item_with_default_window_is_close_to_scan(index, items):
+    rng = random.Random(11)
+    subject, skills = next(iter(SUBJECT_SKILLS.items()))
+    pool = [item.id for item in items if item.skill_category == skills[0]]
+    for _ in range(200):
+        theta = rng.uniform(-3.0, 3.0)
+        exclude = set(rng.sample(pool, 20))
+
+        chosen = index.next_item(subject, skills[0], theta, exclude, window=16)
+
+        assert chosen in pool and chosen not in exclude
+        best = scan(index, items, subject, skills[0], theta, exclude)
+        assert information(theta, *index.parameters(chosen)) >= 0.9 * best
+
+def test_next_item_none_when_every_item_excluded(index, items):
+    subject, skills = next(iter(SUBJECT_SKILLS.items()))
+    pool = {item.id for item in items if item.skill_category == skills[0]}
+
+    assert index.next_item(subject, skills[0], 0.0, pool, window=16) is None
+
+def test_next_item_none_for_unknown_key(index):
+    subject = next(iter(SUBJECT_SKILLS))
+
+    assert index.next_item(subject, "no_such_skill", 0.0, set(), window=16) is None
+    assert not index.has_items(subject, "no_such_skill")
+
+def test_merged_index_selects_new_item(items):
+    index = ItemIndex(items[:ITEMS_PER_SKILL])
+    subject, skill = items[0].subject, items[0].skill_category
+    # A very discriminating item right at theta beats everything already indexed
+    added = items[0]._replace(id=index.last_id + 1, irt_difficulty=0.0, irt_discrimination=5.0)
+
+    merged = index.merged([added])
+
+    assert merged.next_item(subject, skill, 0.0, set(), window=16) == added.id
+    assert merged.last_id == added.id
+    assert len(merged) == len(index) + 1
+
+@pytest.fixture
+def bank(db):
+    """An owned student and a bank of 30 scored Mathematics items; returns (student id, item index)."""
+    db.add(Student(id=1, user_id=1, name="Student", grade=3))
+    rng = random.Random(3)
+    for i in range(30):
+        question = QuestionCreate(
+            text=f"Question {i}", options=["A", "B", "C", "D"], correct_answer=i % 4, explanation="",
+            difficulty=Difficulty.INTERMEDIATE, skill_category="Number Operations",
+        )
+        db.add(QuestionBankItem(
+            id=i + 1, content_hash=content_hash(Subject.MATHEMATICS, question), subject=Subject.MATHEMATICS,
+            irt_difficulty=rng.uniform(-2, 2), irt_discrimination=1.2, **question.model_dump(exclude={"chosen_option"}),
+        ))
+    db.commit()
+    return 1, ItemIndex(ItemBankIndex._fetch(db, after_id=0))
+
+@pytest.fixture
+def ingester():
+    analyzer = AssessmentAnalyzer()
+    return AssessmentIngester(analyzer, StudentClusterer(analyzer), [], progress_alpha=0.3)
+
+def test_finished_session_is_recorded_and_dropped(db, bank, ingester):
+    student_id, index = bank
+    tester = AdaptiveTester(max_items=5, target_se=0.0, window=16, session_ttl=3600, max_sessions=10)
+    session = tester.start(index, 1, student_id, Subject.MATHEMATICS, "Number Operations")
+    while not session.finished:
+        tester.answer(session, session.current, index.get(session.current).correct_answer)
+
+    result = tester.finish(db, session, ingester)
+
+    assert result.status == "created"
+    assessment = db.get(Assessment, result.assessment_id)
+    assert (assessment.student_id, assessment.total_questions, assessment.score) == (student_id, 5, 10)
+    responses = db.query(AssessmentResponse).filter_by(assessment_id=assessment.id).order_by(AssessmentResponse.position)
+    assert [(row.question_id, row.is_correct) for row in responses] == [
+        (item_id, True) for item_id, _, _ in session.responses
+    ]
+    assert db.query(StudentProgress).filter_by(student_id=student_id).count() == 1
+    assert tester.get(session.id, 1) is None
+    assert tester.stats()["sessions"] == 0
+    assert tester.stats()["answers"] == 5
+    assert tester.stats()["finished"] == 1
+
+def test_finish_ends_running_test_early(db, bank, ingester):
+    student_id, index = bank
+    tester = AdaptiveTester(max_items=20, target_se=0.0, window=16, session_ttl=3600, max_sessions=10)
+    session = tester.start(index, 1, student_id, Subject.MATHEMATICS, "Number Operations")
+    assert tester.finish(db, session, ingester) is None
+
+    tester.answer(session, session.current, 0)
+    tester.answer(session, session.current, 0)
+    result = tester.finish(db, session, ingester)
+
+    assert result.status == "created"
+    assert db.get(Assessment, result.assessment_id).total_questions == 2
+    assert session.finished and session.current is None
+    assert tester.stats()["finished"] == 1
+
+def test_failed_submission_keeps_session(db, bank, ingester):
+    student_id, index = bank
+    tester = AdaptiveTester(max_items=1, target_se=0.0, window=16, session_ttl=3600, max_sessions=10)
+    # Started for a student the user does not own, so ingestion rejects it
+    session = tester.start(index, 2, student_id, Subject.MATHEMATICS, "Number Operations")
+    tester.answer(session, session.current, 0)
+
+    result = tester.finish(db, session, ingester)
+
+    assert result.status_code == 404
+    assert tester.get(session.id, 2) is session
+    assert not session.submitting
+    assert db.query(Assessment).count() == 0
@@ -0,0 +1,44 @@
+import logging
+
+import pytest
+
+from app.models import Assessment, Student, Subject
+from app.services.assessment_analyzer import AssessmentAnalyzer
+from app.services.assessment_ingest import AssessmentIngester
+from app.services.student_clustering import StudentClusterer
+
+def payload(student_id, text):
+    return {
+        "student_id": student_id, "subject": Subject.MATHEMATICS, "score": 5, "total_questions": 1,
+        "skill_breakdown": {}, "recommendations": [],
+        "questions": [{
+            "text": text, "options": ["A", "B"], "correct_answer": 0, "explanation": "",
+            "difficulty": "beginner", "skill_category": "Number Operations", "chosen_option": 0,
+        }],
+    }
+
+@pytest.fixture
+def ingester():
+    analyzer = AssessmentAnalyzer()
+    return AssessmentIngester(analyzer, StudentClusterer(analyzer), [], progress_alpha=0.3)
+
+def test_batch_analysis_failure_is_logged_and_items_retried(db, ingester, monkeypatch, caplog):
+    db.add(Student(id=1, user_id=1, name="Student", grade=3))
+    db.commit()
+    analyze_many = ingester.analyzer.analyze_many
+
+    def fail_on_bad_item(assessments):
+        if any(assessment.questions[0].text == "bad" for assessment in assessments):
+            raise ValueError("bad question")
+        return analyze_many(assessments)
+
+    monkeypatch.setattr(ingester.analyzer, "analyze_many", fail_on_bad_item)
+    with caplog.at_level(logging.ERROR, logger="app.services.assessment_ingest"):
+        results = ingester.ingest_chunk(db, 1, [payload(1, "good"), payload(1, "bad")], 0)
+
+    assert [result.status for result in results] == ["created", "error"]
+    assert results[1].detail == "Analysis failed: ValueError"
+    assert db.query(Assessment).count() == 1
+    [record] = caplog.records
+    assert "Batch analysis of 2 assessments failed" in record.getMessage()
+    assert record.exc_info[0] is ValueError
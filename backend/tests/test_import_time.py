@@ -0,0 +1,22 @@
+import pytest
+
+from benchmarks.bench_import_time import LAZY_MODULES, measure
+
+# Matches the benchmark's default --budget-ms
+BUDGET_MS = 2500.0
+
+@pytest.fixture(scope="module")
+def import_times():
+    """Cumulative import times of the fastest of three cold imports of app.main."""
+    runs = [measure() for _ in range(3)]
+    return min(runs, key=lambda modules: modules["app.main"][1])
+
+@pytest.mark.slow
+def test_import_within_budget(import_times):
+    assert import_times["app.main"][1] / 1e3 <= BUDGET_MS
+
+@pytest.mark.slow
+def test_heavy_modules_stay_lazy(import_times):
+    eager = sorted({module.split(".")[0] for module in import_times} & set(LAZY_MODULES))
+
+    assert not eager, f"imported at boot but should be lazy: {', '.join(eager)}"
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import create_engine, event, update
+
+from app.models import Job, JobStatus
+from app.services import job_queue
+
+class NoopJob(BaseModel):
+    count: int = 1
+
+@pytest.fixture(autouse=True)
+def job_types(monkeypatch):
+    for name in ("noop", "other"):
+        monkeypatch.setitem(job_queue.JOB_TYPES, name, job_queue.JobType(lambda db, params, context: None, NoopJob))
+
+def enqueue(db, job_type="noop"):
+    return job_queue.enqueue(db, job_type, {}, user_id=None).id
+
+def statuses(db):
+    db.expire_all()
+    return {job.id: job.status for job in db.query(Job)}
+
+def test_claim_takes_oldest_jobs_within_capacity_and_slots(db):
+    noop = [enqueue(db) for _ in range(3)]
+    other = [enqueue(db, "other") for _ in range(2)]
+
+    assert job_queue.claim(db, {"noop": 2, "other": 1}, slots=10) == [
+        (noop[0], "noop"), (noop[1], "noop"), (other[0], "other")
+    ]
+    assert job_queue.claim(db, {"noop": 5, "other": 5}, slots=1) == [(noop[2], "noop")]
+    assert job_queue.claim(db, {"noop": 5, "other": 0}, slots=5) == []
+
+    job = db.get(Job, noop[0], populate_existing=True)
+    assert job.status == JobStatus.RUNNING
+    assert job.attempts == 1
+    assert job.heartbeat_at is not None
+
+def test_claim_is_compare_and_set(db, database_url):
+    first, second = enqueue(db), enqueue(db)
+    rival = create_engine(database_url)
+
+    raced = []
+
+    # Another runner claims the first job between this runner's select and its update
+    @event.listens_for(db.get_bind(), "before_cursor_execute")
+    def race(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE jobs") and not raced:
+            raced.append(statement)
+            with rival.begin() as other:
+                other.execute(update(Job).where(Job.id == first).values(status=JobStatus.RUNNING, attempts=1))
+
+    try:
+        claimed = job_queue.claim(db, {"noop": 2}, slots=2)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", race)
+
+    assert raced
+    assert claimed == [(second, "noop")]
+    assert db.get(Job, first, populate_existing=True).attempts == 1
+    rival.dispose()
+
+def test_claimed_job_not_claimed_again(db):
+    job_id = enqueue(db)
+
+    assert job_queue.claim(db, {"noop": 1}, slots=1) == [(job_id, "noop")]
+    assert job_queue.claim(db, {"noop": 1}, slots=1) == []
+
+def test_release_requeues_fails_or_cancels(db):
+    requeued, failed, cancelled, untouched = (enqueue(db) for _ in range(4))
+    job_queue.claim(db, {"noop": 4}, slots=4)
+    db.execute(update(Job).where(Job.id == failed).values(attempts=3))
+    db.execute(update(Job).where(Job.id == cancelled).values(cancel_requested=True))
+    db.commit()
+
+    released = job_queue.release(db, Job.id.in_([requeued, failed, cancelled]), max_attempts=3, error="lost")
+
+    assert released == 3
+    assert statuses(db) == {
+        requeued: JobStatus.QUEUED, failed: JobStatus.FAILED,
+        cancelled: JobStatus.CANCELLED, untouched: JobStatus.RUNNING,
+    }
+    assert db.get(Job, failed).error == "lost"
+    assert db.get(Job, requeued).started_at is None
+
+def test_release_ignores_jobs_that_are_not_running(db):
+    job_id = enqueue(db)
+
+    assert job_queue.release(db, Job.id == job_id, max_attempts=3, error="lost") == 0
+    assert statuses(db) == {job_id: JobStatus.QUEUED}
+
+def test_job_fails_after_max_attempts(db):
+    job_id = enqueue(db)
+    for attempt in range(1, 4):
+        assert job_queue.claim(db, {"noop": 1}, slots=1) == [(job_id, "noop")]
+        job_queue.release(db, Job.id == job_id, max_attempts=3, error="Worker process exited with code 1")
+        expected = JobStatus.QUEUED if attempt < 3 else JobStatus.FAILED
+        assert statuses(db) == {job_id: expected}
+
+    job = db.get(Job, job_id)
+    assert job.attempts == 3
+    assert job.finished_at is not None
+    assert job_queue.claim(db, {"noop": 1}, slots=1) == []
+
+def test_stale_heartbeat_condition_releases_only_stale_jobs(db):
+    stale, fresh = enqueue(db), enqueue(db)
+    job_queue.claim(db, {"noop": 2}, slots=2)
+    db.execute(update(Job).where(Job.id == stale).values(heartbeat_at=datetime(2000, 1, 1)))
+    db.commit()
+
+    job_queue.release(db, Job.heartbeat_at < datetime(2001, 1, 1), max_attempts=3, error="lost")
+
+    assert statuses(db) == {stale: JobStatus.QUEUED, fresh: JobStatus.RUNNING}
+
+def test_cancel_queued_job_ends_it_and_running_job_is_asked_to_stop(db):
+    running, queued = enqueue(db), enqueue(db)
+    job_queue.claim(db, {"noop": 1}, slots=1)
+
+    assert job_queue.cancel(db, queued).status == JobStatus.CANCELLED
+    job = job_queue.cancel(db, running)
+    assert job.status == JobStatus.RUNNING
+    assert job.cancel_requested is True
+    assert job_queue.cancel(db, 999) is None
+
+def test_enqueue_rejects_unknown_type_and_invalid_params(db):
+    with pytest.raises(ValueError):
+        job_queue.enqueue(db, "missing", {}, user_id=None)
+    with pytest.raises(ValueError):
+        job_queue.enqueue(db, "noop", {"count": "many"}, user_id=None)
@@ -0,0 +1,23 @@
+import pytest
+
+from app.models import LEARNING_PLAN_LOAD_OPTIONS
+from benchmarks.bench_plan_loading import EXPECTED_PRESET_QUERIES, load_plans, seed
+
+@pytest.mark.parametrize("n_plans", [1, 10, 50])
+def test_plan_tree_loads_in_fixed_query_count(engine, db, n_plans):
+    seed(db, n_plans)
+    db.close()
+
+    queries, _, loaded = load_plans(engine, LEARNING_PLAN_LOAD_OPTIONS)
+
+    assert loaded == n_plans
+    assert queries == EXPECTED_PRESET_QUERIES
+
+def test_lazy_loading_query_count_grows_with_plans(engine, db):
+    # Guards the test above: without the presets the same serialization is N+1
+    seed(db, 10)
+    db.close()
+
+    lazy_queries, _, _ = load_plans(engine, ())
+
+    assert lazy_queries > EXPECTED_PRESET_QUERIES
@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks import check_query_plans
+
+@pytest.mark.slow
+def test_endpoint_queries_use_indexes(database_url, capsys):
+    failures = check_query_plans.run(database_url, n_users=200, students_per_user=4, assessments_per_student=25)
+
+    assert failures == 0, capsys.readouterr().out
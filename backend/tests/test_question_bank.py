@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Difficulty, QuestionBankItem, Subject
+from app.schemas import QuestionCreate
+from app.services import question_bank as question_bank_module
+from app.services.question_bank import QuestionBank, content_hash
+
+def question(text):
+    return QuestionCreate(
+        text=text, options=["A", "B"], correct_answer=0, explanation="",
+        difficulty=Difficulty.BEGINNER, skill_category="Number Operations",
+    )
+
+@pytest.fixture
+def bank(monkeypatch):
+    # The commit hooks report to the module's instance
+    bank = QuestionBank(id_cache_size=100, set_size=10, refresh_interval=60.0)
+    monkeypatch.setattr(question_bank_module, "question_bank", bank)
+    return bank
+
+@pytest.fixture(params=["upsert", "insert"])
+def dialect(request, monkeypatch):
+    if request.param == "insert":
+        monkeypatch.setattr(question_bank_module, "dialect_insert", lambda db: None)
+    return request.param
+
+def test_inserted_counts_committed_new_rows_only(db, bank, dialect):
+    items = [(Subject.MATHEMATICS, question(text)) for text in ("one", "two", "one")]
+
+    ids = bank.intern(db, items)
+    assert bank.stats()["inserted"] == 0
+    db.commit()
+
+    assert ids[0] == ids[2] != ids[1]
+    assert bank.stats()["inserted"] == 2
+
+def test_inserted_skips_rolled_back_rows(db, bank, dialect):
+    bank.intern(db, [(Subject.MATHEMATICS, question("one"))])
+    db.rollback()
+
+    assert bank.stats()["inserted"] == 0
+
+def test_inserted_skips_rows_a_concurrent_transaction_won(db, engine, bank):
+    other = sessionmaker(bind=engine)()
+    item = question("raced")
+    other.add(QuestionBankItem(
+        content_hash=content_hash(Subject.MATHEMATICS, item), subject=Subject.MATHEMATICS,
+        **item.model_dump(exclude={"chosen_option"}),
+    ))
+    other.commit()
+    winner = other.query(QuestionBankItem.id).scalar()
+    other.close()
+    lookup = bank._lookup
+    lookups = []
+
+    def stale_first_lookup(db, hashes):
+        # As if the first lookup ran before the other transaction committed
+        lookups.append(set(hashes))
+        return {} if len(lookups) == 1 else lookup(db, hashes)
+
+    bank._lookup = stale_first_lookup
+
+    ids = bank.intern(db, [(Subject.MATHEMATICS, item), (Subject.MATHEMATICS, question("new"))])
+    db.commit()
+
+    assert ids[0] == winner
+    assert bank.stats()["inserted"] == 1
+    # Only the row that lost the race is read back
+    assert lookups[1] == {content_hash(Subject.MATHEMATICS, item)}
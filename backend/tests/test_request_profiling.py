@@ -0,0 +1,48 @@
+import threading
+import time
+
+from app.core import request_profiling
+from app.core.request_profiling import RequestTimings, SlowRequestSampler
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+def test_sampler_survives_a_failed_sample(monkeypatch):
+    fold = request_profiling._fold
+    calls = []
+
+    def flaky_fold(frame):
+        calls.append(frame)
+        if len(calls) == 1:
+            raise RuntimeError("Set changed size during iteration")
+        return fold(frame)
+
+    monkeypatch.setattr(request_profiling, "_fold", flaky_fold)
+    sampler = SlowRequestSampler(threshold=0.0, interval=0.001)
+    timings = RequestTimings(time.perf_counter())
+    timings.threads.add(threading.get_ident())
+    sampler.start(timings)
+
+    assert wait_for(lambda: sum(timings.samples.values()) > 0)
+    sampler.finish("GET", "/slow", timings, wall=1.0)
+    assert sampler._thread.is_alive()
+
+def test_sampler_tolerates_threads_changing_while_sampling():
+    sampler = SlowRequestSampler(threshold=0.0, interval=0.0001)
+    timings = RequestTimings(time.perf_counter())
+    timings.threads.add(threading.get_ident())
+    sampler.start(timings)
+    # Endpoint wrappers add and discard thread ids without the sampler's lock
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        for thread_id in range(1, 200):
+            timings.threads.add(-thread_id)
+        for thread_id in range(1, 200):
+            timings.threads.discard(-thread_id)
+
+    sampler.finish("GET", "/slow", timings, wall=1.0)
+    assert sampler._thread.is_alive()
+    assert sum(timings.samples.values()) > 0
@@ -0,0 +1,59 @@
+import pytest
+
+from app.models import Assessment, StudentCluster, Subject
+from app.services import student_clustering
+from app.services.assessment_analyzer import AssessmentAnalyzer
+from app.services.student_clustering import StudentClusterer
+
+# Two well-separated groups of students
+STRONG_NUMBERS = {"Number Operations": 9.0, "Reading": 1.0}
+STRONG_READING = {"Number Operations": 1.0, "Reading": 9.0}
+
+def add_assessment(db, assessment_id, student_id, skill_breakdown):
+    db.add(Assessment(
+        id=assessment_id, student_id=student_id, subject=Subject.MATHEMATICS,
+        score=5, total_questions=10, skill_breakdown=skill_breakdown,
+    ))
+    db.commit()
+
+def assignment(db, student_id):
+    db.expire_all()
+    return db.query(StudentCluster.assessment_id, StudentCluster.cluster_id).filter_by(
+        student_id=student_id, n_clusters=2
+    ).one()
+
+@pytest.fixture(params=["upsert", "merge"])
+def clusterer(request, monkeypatch):
+    if request.param == "merge":
+        monkeypatch.setattr(student_clustering, "dialect_insert", lambda db: None)
+    return StudentClusterer(AssessmentAnalyzer())
+
+@pytest.fixture
+def fitted(db, clusterer):
+    for assessment_id in range(1, 41):
+        add_assessment(db, assessment_id, assessment_id, STRONG_NUMBERS if assessment_id % 2 else STRONG_READING)
+    assert clusterer.update(db, 2) == 40
+    return clusterer
+
+def test_late_gap_row_keeps_newer_assignment(db, fitted):
+    # Assessment 42 commits first and moves the watermark past 41
+    add_assessment(db, 42, 1, STRONG_NUMBERS)
+    assert fitted.update(db, 2) == 1
+    newer = assignment(db, 1)
+    assert newer.assessment_id == 42
+
+    # 41 commits late, for the same student, and lands in the other cluster
+    add_assessment(db, 41, 1, STRONG_READING)
+    assert fitted.update(db, 2) == 1
+
+    assert assignment(db, 1) == newer
+
+def test_newer_assessment_replaces_assignment(db, fitted):
+    before = assignment(db, 1)
+
+    add_assessment(db, 41, 1, STRONG_READING)
+    fitted.update(db, 2)
+
+    after = assignment(db, 1)
+    assert after.assessment_id == 41
+    assert after.cluster_id != before.cluster_id
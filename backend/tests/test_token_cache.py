@@ -0,0 +1,177 @@
+import time
+from datetime import datetime, timedelta
+
+from app.core.token_cache import BloomFilter, TokenRevocations, _epoch, token_digest
+from app.models import RevokedToken
+
+def digests(prefix: str, count: int):
+    return [token_digest(f"{prefix}-{i}") for i in range(count)]
+
+def revocations() -> TokenRevocations:
+    # refresh_interval=0 makes every refresh() read the table
+    return TokenRevocations(refresh_interval=0.0, capacity=1000, error_rate=0.01)
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = digests("revoked", 1000)
+    for digest in added:
+        bloom.add(digest)
+
+    assert all(digest in bloom for digest in added)
+    assert bloom.count == 1000
+
+def test_bloom_filter_false_positive_rate_near_target():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for digest in digests("revoked", 1000):
+        bloom.add(digest)
+
+    false_positives = sum(digest in bloom for digest in digests("valid", 20000))
+
+    assert false_positives / 20000 < 0.02
+
+def test_empty_bloom_filter_contains_nothing():
+    bloom = BloomFilter(capacity=0, error_rate=0.01)
+
+    assert token_digest("anything") not in bloom
+
+def test_user_cutoff_rejects_tokens_issued_up_to_it(db):
+    TokenRevocations.revoke_user(db, user_id=7)
+    db.commit()
+    cutoff = _epoch(db.query(RevokedToken.revoked_before).scalar())
+    cache = revocations()
+    cache.load(db)
+    digest = token_digest("token")
+
+    assert cache.check(digest, user_id=7, issued_at=cutoff - 1) is True
+    assert cache.check(digest, user_id=7, issued_at=cutoff) is True
+    assert cache.check(digest, user_id=7, issued_at=cutoff + 1) is False
+    # Other users are unaffected
+    assert cache.check(digest, user_id=8, issued_at=cutoff - 1) is False
+
+def test_later_user_cutoff_wins(db):
+    early = datetime.utcnow() - timedelta(hours=1)
+    late = datetime.utcnow()
+    expires = late + timedelta(hours=1)
+    db.add_all([
+        RevokedToken(user_id=7, revoked_before=late, expires_at=expires),
+        RevokedToken(user_id=7, revoked_before=early, expires_at=expires),
+    ])
+    db.commit()
+    cache = revocations()
+    cache.load(db)
+
+    assert cache.user_cutoffs[7] == _epoch(late)
+
+def test_token_revocation_needs_confirmation_then_is_remembered(db):
+    digest = token_digest("revoked")
+    TokenRevocations.revoke_token(db, digest, expires_at=time.time() + 3600)
+    db.commit()
+    cache = revocations()
+    cache.load(db)
+
+    assert cache.check(digest, user_id=1, issued_at=time.time()) is None
+    assert cache.confirm(db, digest) is True
+    assert cache.check(digest, user_id=1, issued_at=time.time()) is True
+    assert cache.confirmations == 1
+    assert cache.false_positives == 0
+
+def test_filter_false_positive_is_confirmed_valid(db):
+    cache = revocations()
+    cache.load(db)
+    digest = token_digest("valid")
+    # A filter hit with no matching row is what a false positive looks like
+    cache.filter.add(digest)
+
+    assert cache.check(digest, user_id=1, issued_at=time.time()) is None
+    assert cache.is_revoked(db, digest, user_id=1, issued_at=time.time()) is False
+    assert cache.false_positives == 1
+    assert digest not in cache.confirmed
+
+def test_expired_revocations_are_not_loaded(db):
+    digest = token_digest("expired")
+    db.add(RevokedToken(token_digest=digest.hex(), expires_at=datetime.utcnow() - timedelta(minutes=1)))
+    db.commit()
+    cache = revocations()
+
+    assert cache.load(db) == 0
+    assert digest not in cache.filter
+
+def test_refresh_picks_up_row_committed_after_later_rows(db):
+    cache = revocations()
+    cache.load(db)
+    digest = token_digest("late-commit")
+    # Stamped before the load, as a transaction that started earlier but committed later would be
+    db.add(RevokedToken(
+        token_digest=digest.hex(),
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        created_at=datetime.utcnow() - timedelta(seconds=30),
+    ))
+    db.commit()
+
+    assert cache.refresh(db) == 1
+    assert digest in cache.filter
+
+def test_refresh_overlap_does_not_count_rows_twice(db):
+    TokenRevocations.revoke_token(db, token_digest("revoked"), expires_at=time.time() + 3600)
+    db.commit()
+    cache = revocations()
+    cache.load(db)
+
+    # The row is inside the overlap window, so both refreshes read it again
+    assert cache.refresh(db) == 1
+    assert cache.refresh(db) == 1
+    assert cache.filter.count == 1
+
+def test_refresh_skipped_until_stale(db):
+    cache = TokenRevocations(refresh_interval=3600.0, capacity=1000, error_rate=0.01)
+    cache.load(db)
+    TokenRevocations.revoke_token(db, token_digest("revoked"), expires_at=time.time() + 3600)
+    db.commit()
+
+    assert cache.refresh(db) == 0
+
+def test_refresh_in_progress_does_not_block_other_callers(db):
+    cache = revocations()
+    cache.load(db)
+    TokenRevocations.revoke_token(db, token_digest("revoked"), expires_at=time.time() + 3600)
+    db.commit()
+
+    # Another caller is mid-refresh; this one goes on with the current filter
+    with cache._refresh_lock:
+        assert cache.refresh(db) == 0
+        assert cache.check(token_digest("revoked"), user_id=1, issued_at=time.time()) is False
+    assert cache.refresh(db) == 1
+
+def test_checks_run_while_refresh_queries(db, monkeypatch):
+    cache = revocations()
+    cache.load(db)
+    fetch = TokenRevocations._fetch
+    checked = []
+
+    def slow_fetch(db, condition):
+        # Stands in for a slow query: checks must not wait on it
+        checked.append(cache._lock.acquire(blocking=False))
+        cache._lock.release()
+        return fetch(db, condition)
+
+    monkeypatch.setattr(cache, "_fetch", slow_fetch)
+    cache.refresh(db)
+
+    assert checked == [True]
+
+def test_revocation_applied_during_load_survives_it(db, monkeypatch):
+    cache = revocations()
+    fetch = TokenRevocations._fetch
+    digest = token_digest("committed-during-load")
+
+    def fetch_then_commit(db, condition):
+        rows = fetch(db, condition)
+        # This worker commits a revocation after the load's query has run
+        cache.apply(99, digest.hex(), None, None, datetime.utcnow())
+        return rows
+
+    monkeypatch.setattr(cache, "_fetch", fetch_then_commit)
+    cache.load(db)
+
+    assert digest in cache.filter
+    assert cache._pending is None